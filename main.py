@@ -1,19 +1,49 @@
 # coding=utf-8
 
+import argparse
+import copy
+import csv
+import hashlib
+import gzip
+import io
 import json
+import math
+import mmap
 import os
 import random
 import re
+import socket
+import sqlite3
+import struct
+import sys
+import threading
 import time
 import webbrowser
-from datetime import datetime
+import zipfile
+from collections import Counter
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Callable, Dict, Iterator, List, Tuple, Optional, Union
+from urllib.parse import parse_qs, urlparse
 
 import pytz
 import requests
 import yaml
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 VERSION = "2.0.3"
 
@@ -35,6 +65,9 @@ def load_config():
     config = {
         "VERSION_CHECK_URL": config_data["app"]["version_check_url"],
         "SHOW_VERSION_UPDATE": config_data["app"]["show_version_update"],
+        "FSYNC_WRITES": config_data["app"].get("fsync_writes", False),
+        "SNAPSHOT_FORMAT": config_data["app"].get("snapshot_format", "txt"),
+        "DELTA_KEYFRAME_INTERVAL": config_data["app"].get("delta_keyframe_interval", 12),
         "REQUEST_INTERVAL": config_data["crawler"]["request_interval"],
         "REPORT_MODE": config_data["report"]["mode"],
         "RANK_THRESHOLD": config_data["report"]["rank_threshold"],
@@ -43,7 +76,6 @@ def load_config():
         "ENABLE_CRAWLER": config_data["crawler"]["enable_crawler"],
         "ENABLE_NOTIFICATION": config_data["notification"]["enable_notification"],
         "MESSAGE_BATCH_SIZE": config_data["notification"]["message_batch_size"],
-        "BATCH_SEND_INTERVAL": config_data["notification"]["batch_send_interval"],
         "FEISHU_MESSAGE_SEPARATOR": config_data["notification"][
             "feishu_message_separator"
         ],
@@ -55,6 +87,78 @@ def load_config():
         "PLATFORMS": config_data["platforms"],
     }
 
+    # 熔斷和爬取時限配置（可選，缺省時使用默認值）
+    breaker_config = config_data["crawler"].get("circuit_breaker") or {}
+    config["CIRCUIT_BREAKER"] = {
+        "ENABLED": breaker_config.get("enabled", True),
+        "WINDOW": breaker_config.get("window", 10),
+        "MIN_REQUESTS": breaker_config.get("min_requests", 3),
+        "FAILURE_RATE": breaker_config.get("failure_rate", 0.6),
+        "COOLDOWN_MINUTES": breaker_config.get("cooldown_minutes", 30),
+        "MAX_COOLDOWN_MINUTES": breaker_config.get("max_cooldown_minutes", 360),
+    }
+    config["CRAWL_DEADLINE"] = config_data["crawler"].get("crawl_deadline", 120)
+
+    # 歷史數據壓縮配置（可選，缺省時關閉）
+    compaction_config = config_data["app"].get("compaction") or {}
+    config["COMPACTION"] = {
+        "ENABLED": compaction_config.get("enabled", False),
+        "DROP_RUN_REPORTS": compaction_config.get("drop_run_reports", False),
+        "FORMAT": compaction_config.get("format", "zip"),
+        "AGGREGATE": compaction_config.get("aggregate", True),
+    }
+
+    # 運行鎖配置（可選，缺省時跳過重疊運行）
+    run_lock_config = config_data["app"].get("run_lock") or {}
+    config["RUN_LOCK"] = {
+        "POLICY": run_lock_config.get("policy", "skip"),
+        "WAIT_TIMEOUT": run_lock_config.get("wait_timeout", 600),
+        "STALE_MINUTES": run_lock_config.get("stale_minutes", 60),
+    }
+
+    # 對沖請求配置（可選，缺省時關閉）
+    hedge_config = config_data["crawler"].get("hedge") or {}
+    config["HEDGE"] = {
+        "ENABLED": hedge_config.get("enabled", False),
+        "PERCENTILE": hedge_config.get("percentile", 90),
+        "MIN_DELAY": hedge_config.get("min_delay", 1.0),
+        "DEFAULT_DELAY": hedge_config.get("default_delay", 3.0),
+        "BUDGET": hedge_config.get("budget", 0.2),
+    }
+
+    # 自適應爬取調度配置（可選，缺省時關閉）
+    schedule_config = config_data["crawler"].get("adaptive_schedule") or {}
+    config["ADAPTIVE_SCHEDULE"] = {
+        "ENABLED": schedule_config.get("enabled", False),
+        "MIN_INTERVAL": schedule_config.get("min_interval", 5),
+        "MAX_INTERVAL": schedule_config.get("max_interval", 120),
+        "TARGET_CHURN": schedule_config.get("target_churn", 0.2),
+    }
+
+    # 推送限流配置（可選，按渠道覆蓋默認的平台限制）
+    config["WEBHOOK_RATE_LIMITS"] = config_data["notification"].get("rate_limits") or {}
+
+    # 推送去重配置（可選，缺省時關閉）
+    dedup_config = config_data["notification"].get("dedup") or {}
+    config["PUSH_DEDUP"] = {
+        "ENABLED": dedup_config.get("enabled", False),
+        "WINDOW_MINUTES": dedup_config.get("window_minutes", 60),
+        "RANK_IMPROVEMENT": dedup_config.get("rank_improvement", 3),
+    }
+
+    # 報告輸出格式（可選，缺省時使用默認值）
+    config["REPORT_FORMAT"] = config_data["report"].get("format", "html")
+    config["REPORT_COMPRESSION"] = config_data["report"].get("compression", "none")
+    if config["REPORT_COMPRESSION"] == "brotli":
+        # 查看頁只能解壓 gzip，靜態托管下 brotli 報告無法打開
+        print("JSON 報告不支持 brotli 壓縮，改用 gzip 壓縮")
+        config["REPORT_COMPRESSION"] = "gzip"
+
+    # 索引配置（可選，缺省時使用默認值）
+    index_config = config_data.get("index", {})
+    config["ENABLE_KEYWORD_SERIES"] = index_config.get("enable_keyword_series", False)
+    config["ENABLE_SEARCH_INDEX"] = index_config.get("enable_search", False)
+
     # Webhook配置（環境變量優先）
     notification = config_data.get("notification", {})
     webhooks = notification.get("webhooks", {})
@@ -123,13 +227,21 @@ def format_time_filename():
     return get_beijing_time().strftime("%H時%M分")
 
 
+CLEANED_TITLE_CACHE = {}
+CLEANED_TITLE_CACHE_LIMIT = 50000
+
+
 def clean_title(title: str) -> str:
-    """清理標題中的特殊字符"""
+    """清理標題中的特殊字符，同一標題只清理一次"""
     if not isinstance(title, str):
         title = str(title)
-    cleaned_title = title.replace("\n", " ").replace("\r", " ")
-    cleaned_title = re.sub(r"\s+", " ", cleaned_title)
-    cleaned_title = cleaned_title.strip()
+    cleaned_title = CLEANED_TITLE_CACHE.get(title)
+    if cleaned_title is None:
+        if len(CLEANED_TITLE_CACHE) >= CLEANED_TITLE_CACHE_LIMIT:
+            CLEANED_TITLE_CACHE.clear()
+        cleaned_title = title.replace("\n", " ").replace("\r", " ")
+        cleaned_title = re.sub(r"\s+", " ", cleaned_title)
+        cleaned_title = CLEANED_TITLE_CACHE[title] = cleaned_title.strip()
     return cleaned_title
 
 
@@ -138,10 +250,109 @@ def ensure_directory_exists(directory: str):
     Path(directory).mkdir(parents=True, exist_ok=True)
 
 
-def get_output_path(subfolder: str, filename: str) -> str:
+def date_folder_to_iso(date_folder: str) -> str:
+    """日期文件夾名轉換為 YYYY-MM-DD"""
+    return datetime.strptime(date_folder, "%Y年%m月%d日").strftime("%Y-%m-%d")
+
+
+def get_state_path(filename: str, output_root: str = "output") -> Path:
+    """獲取跨運行持久化的狀態文件路徑（位於 output/.state）"""
+    state_dir = Path(output_root) / ".state"
+    ensure_directory_exists(str(state_dir))
+    return state_dir / filename
+
+
+def fsync_directory(directory: Union[str, Path]) -> None:
+    """刷新目錄項到磁盤，保證重命名在斷電後仍然有效（Windows 不支持，忽略）"""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(
+    file_path: Union[str, Path],
+    mode: str = "w",
+    fsync: Optional[bool] = None,
+    **open_kwargs,
+):
+    """原子寫入：先寫同目錄臨時文件再重命名，讀者只會看到舊文件或完整的新文件
+
+    fsync 缺省時按配置 app.fsync_writes 決定是否在重命名前刷盤
+    """
+    if fsync is None:
+        fsync = CONFIG["FSYNC_WRITES"]
+    if "b" not in mode:
+        open_kwargs.setdefault("encoding", "utf-8")
+
+    file_path = Path(file_path)
+    temp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+    f = open(temp_path, mode, **open_kwargs)
+    try:
+        yield f
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+        f.close()
+        os.replace(temp_path, file_path)
+        if fsync:
+            fsync_directory(file_path.parent)
+    except BaseException:
+        f.close()
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def json_loads(data: Union[str, bytes]):
+    """解析 JSON，可直接傳入字節；安裝 orjson 時使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(data, indent: bool = False) -> bytes:
+    """序列化為 UTF-8 JSON 字節（保留中文），indent 為 True 時縮進兩格，否則緊湊輸出"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def read_json_file(file_path: Union[str, Path]):
+    """讀取 JSON 文件"""
+    with open(file_path, "rb") as f:
+        return json_loads(f.read())
+
+
+def write_json_file(file_path: Union[str, Path], data, indent: bool = False) -> None:
+    """原子寫入 JSON 文件"""
+    with atomic_write(file_path, "wb") as f:
+        f.write(json_dumps(data, indent))
+
+
+def get_output_path(
+    subfolder: str,
+    filename: str,
+    date_folder: Optional[str] = None,
+    output_root: str = "output",
+) -> str:
     """獲取輸出路徑"""
-    date_folder = format_date_folder()
-    output_dir = Path("output") / date_folder / subfolder
+    date_folder = date_folder or format_date_folder()
+    output_dir = Path(output_root) / date_folder / subfolder
     ensure_directory_exists(str(output_dir))
     return str(output_dir / filename)
 
@@ -190,16 +401,12 @@ def check_version_update(
         return False, None
 
 
-def is_first_crawl_today() -> bool:
+def is_first_crawl_today(
+    date_folder: Optional[str] = None, output_root: str = "output"
+) -> bool:
     """檢測是否是當天第一次爬取"""
-    date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
-
-    if not txt_dir.exists():
-        return True
-
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
-    return len(files) <= 1
+    date_folder = date_folder or format_date_folder()
+    return len(list_snapshot_files(date_folder, output_root)) <= 1
 
 
 def html_escape(text: str) -> str:
@@ -216,12 +423,578 @@ def html_escape(text: str) -> str:
     )
 
 
+# === 數據結構 ===
+class TitleRecord:
+    """標題記錄：解析、合併、統計全程共用同一對象"""
+
+    __slots__ = (
+        "ranks",
+        "url",
+        "mobile_url",
+        "first_time",
+        "last_time",
+        "count",
+        "last_rank",
+    )
+
+    def __init__(
+        self,
+        ranks: List[int],
+        url: str = "",
+        mobile_url: str = "",
+        first_time: str = "",
+        last_time: str = "",
+        count: int = 1,
+        last_rank: Optional[int] = None,
+    ):
+        self.ranks = ranks
+        self.url = url
+        self.mobile_url = mobile_url
+        self.first_time = first_time
+        self.last_time = last_time
+        self.count = count
+        # 最後一次出現時的排名（ranks 為當天出現過的全部排名，不反映當前位置）
+        self.last_rank = last_rank
+
+    def to_dict(self) -> Dict:
+        """轉換為可 JSON 序列化的字典"""
+        return {
+            "ranks": self.ranks,
+            "url": self.url,
+            "mobile_url": self.mobile_url,
+            "first_time": self.first_time,
+            "last_time": self.last_time,
+            "count": self.count,
+            "last_rank": self.last_rank,
+        }
+
+
+class ReportTitle:
+    """報告中的單條新聞，供統計結果和各渲染器直接使用"""
+
+    __slots__ = (
+        "title",
+        "source_name",
+        "first_time",
+        "last_time",
+        "time_display",
+        "count",
+        "ranks",
+        "rank_threshold",
+        "url",
+        "mobile_url",
+        "is_new",
+        "current_rank",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        source_name: str,
+        ranks: List[int],
+        rank_threshold: int,
+        url: str = "",
+        mobile_url: str = "",
+        first_time: str = "",
+        last_time: str = "",
+        time_display: str = "",
+        count: int = 1,
+        is_new: bool = False,
+        current_rank: Optional[int] = None,
+    ):
+        self.title = title
+        self.source_name = source_name
+        self.first_time = first_time
+        self.last_time = last_time
+        self.time_display = time_display
+        self.count = count
+        self.ranks = ranks
+        self.rank_threshold = rank_threshold
+        self.url = url
+        self.mobile_url = mobile_url
+        self.is_new = is_new
+        self.current_rank = current_rank
+
+    def to_dict(self) -> Dict:
+        """轉換為可 JSON 序列化的字典"""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def copy(self, **changes) -> "ReportTitle":
+        """複製並覆蓋部分字段"""
+        new_title = copy.copy(self)
+        for field, value in changes.items():
+            setattr(new_title, field, value)
+        return new_title
+
+
+# === 標題字典 ===
+# 派生的緩存文件放在 output/.state/titles 下（不提交），按日期命名，只保留最近幾天
+TITLE_DICTIONARY_DIR = "titles"
+TITLE_DICTIONARY_SUFFIX = ".dict"
+TITLE_MATCH_CACHE_SUFFIX = ".match.json"
+TITLE_DICTIONARY_KEEP_DAYS = 3
+
+
+def get_word_list_version(word_groups: List[Dict], filter_words: List[str]) -> str:
+    """頻率詞配置的版本號，內容不變則版本不變"""
+    payload = json.dumps(
+        [word_groups, filter_words], ensure_ascii=False, sort_keys=True
+    ).encode("utf-8")
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+class TitleDictionary:
+    """標題字典：為清理後的標題分配當天內穩定的整數 ID
+
+    按天保存在 output/.state/titles/<日期>.dict，第 n 行即 ID 為 n 的標題，只追加不修改；
+    最近使用的詞表版本的匹配結果保存在同目錄的 <日期>.match.json。
+    ID 用於新增標題檢測和頻率詞匹配緩存；當日匯總與推送去重仍以駐留（sys.intern）的標題字符串為鍵，
+    報告結構不變，推送去重需跨天比較，也不能使用按天分配的 ID
+    """
+
+    def __init__(self, dictionary_path: Optional[Path] = None):
+        self.dictionary_path = dictionary_path
+        self.titles = []
+        self.ids = {}
+        self.saved_count = 0
+        # saved_size 為完整行的字節數，disk_size 為文件實際大小（尾部不完整時兩者不同）
+        self.saved_size = 0
+        self.disk_size = 0
+        # {詞表版本: {title_id: group_key 或 None}}
+        self.match_results = {}
+        self.match_version = None
+        self.match_dirty = False
+        self.match_hits = 0
+        self.match_misses = 0
+
+        if dictionary_path is not None and dictionary_path.exists():
+            data = dictionary_path.read_bytes()
+            self.disk_size = len(data)
+            # 最後一行可能寫到一半
+            data = data[: data.rfind(b"\n") + 1]
+            for title in data.decode("utf-8").split("\n")[:-1]:
+                self.get_id(sys.intern(title))
+            self.saved_count = len(self.titles)
+            self.saved_size = len(data)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def get_id(self, title: str) -> int:
+        """獲取標題 ID，新標題分配下一個 ID（標題須已清理）"""
+        title_id = self.ids.get(title)
+        if title_id is None:
+            title_id = self.ids[title] = len(self.titles)
+            self.titles.append(title)
+        return title_id
+
+    def title(self, title_id: int) -> str:
+        return self.titles[title_id]
+
+    def is_stale(self) -> bool:
+        """文件已被其他進程追加"""
+        if self.dictionary_path is None or not self.dictionary_path.exists():
+            return False
+        return self.dictionary_path.stat().st_size != self.disk_size
+
+    def titles_digest(self, count: int) -> str:
+        """前 count 個標題的摘要，用於確認匹配緩存對應同一份字典"""
+        digest = hashlib.sha1()
+        for title in self.titles[:count]:
+            digest.update(title.encode("utf-8") + b"\n")
+        return digest.hexdigest()
+
+    @property
+    def match_cache_path(self) -> Optional[Path]:
+        if self.dictionary_path is None:
+            return None
+        return self.dictionary_path.with_suffix(TITLE_MATCH_CACHE_SUFFIX)
+
+    def load_match_results(self, version: str) -> Dict[int, Optional[str]]:
+        """讀取已保存的匹配結果，詞表版本不同則作廢"""
+        cache_path = self.match_cache_path
+        if cache_path is None or not cache_path.exists():
+            return {}
+        try:
+            data = read_json_file(cache_path)
+        except Exception as e:
+            print(f"匹配緩存讀取失敗，將重新匹配: {e}")
+            return {}
+        if data.get("version") != version:
+            return {}
+        # 字典被其他進程重寫後 ID 可能對應不同標題，緩存作廢
+        dictionary_count = data.get("dictionary_count", -1)
+        if not 0 <= dictionary_count <= self.saved_count or data.get(
+            "dictionary_digest"
+        ) != self.titles_digest(dictionary_count):
+            return {}
+        return {
+            int(title_id): group_key
+            for title_id, group_key in data.get("results", {}).items()
+            if int(title_id) < dictionary_count
+        }
+
+    def matcher(
+        self, word_groups: List[Dict], filter_words: List[str]
+    ) -> Callable[[str], Optional[str]]:
+        """返回按標題 ID 記憶結果的 find_matched_group，詞表變化時使用新的結果表"""
+        version = get_word_list_version(word_groups, filter_words)
+        if version not in self.match_results:
+            self.match_results[version] = self.load_match_results(version)
+        if version != self.match_version:
+            self.match_version = version
+            self.match_dirty = False
+        results = self.match_results[version]
+        ids = self.ids
+
+        def match(title: str) -> Optional[str]:
+            title_id = ids.get(title)
+            if title_id is None:
+                if clean_title(title) != title:
+                    # 未清理的標題不進入字典
+                    return find_matched_group(title, word_groups, filter_words)
+                title_id = self.get_id(title)
+            group_key = results.get(title_id, False)
+            if group_key is False:
+                group_key = results[title_id] = find_matched_group(
+                    title, word_groups, filter_words
+                )
+                self.match_misses += 1
+                if self.match_version == version:
+                    self.match_dirty = True
+            else:
+                self.match_hits += 1
+            return group_key
+
+        return match
+
+    def save(self) -> None:
+        """追加保存新分配的標題，並保存當前詞表版本的匹配結果"""
+        self.save_titles()
+        if self.match_dirty and self.match_cache_path is not None:
+            results = self.match_results[self.match_version]
+            write_json_file(
+                self.match_cache_path,
+                {
+                    "version": self.match_version,
+                    "dictionary_count": self.saved_count,
+                    "dictionary_digest": self.titles_digest(self.saved_count),
+                    "results": {
+                        str(title_id): group_key
+                        for title_id, group_key in results.items()
+                        if title_id < self.saved_count
+                    },
+                },
+            )
+            self.match_dirty = False
+
+    def save_titles(self) -> None:
+        if self.dictionary_path is None:
+            return
+        ensure_directory_exists(str(self.dictionary_path.parent))
+        # 加載時尾部不完整，即使沒有新標題也要修復
+        needs_repair = self.disk_size != self.saved_size
+        if self.saved_count == len(self.titles) and not needs_repair:
+            return
+
+        data = "".join(
+            title + "\n" for title in self.titles[self.saved_count :]
+        ).encode("utf-8")
+        disk_size = (
+            self.dictionary_path.stat().st_size
+            if self.dictionary_path.exists()
+            else 0
+        )
+        if needs_repair or disk_size != self.saved_size:
+            # 文件尾部不完整或已被其他進程改動，整體重寫
+            with atomic_write(self.dictionary_path, "wb") as f:
+                f.write("".join(title + "\n" for title in self.titles).encode("utf-8"))
+            self.saved_size = self.dictionary_path.stat().st_size
+        else:
+            with open(self.dictionary_path, "ab") as f:
+                f.write(data)
+                f.flush()
+                if CONFIG["FSYNC_WRITES"]:
+                    os.fsync(f.fileno())
+            self.saved_size += len(data)
+        self.disk_size = self.saved_size
+        self.saved_count = len(self.titles)
+
+
+TITLE_DICTIONARIES = {}
+TITLE_DICTIONARIES_LIMIT = 4
+
+
+def get_title_dictionary_path(date_folder: str, output_root: str = "output") -> Path:
+    """某天標題字典的文件路徑（不創建目錄，讀取歷史數據時不改動原目錄）"""
+    return (
+        Path(output_root)
+        / ".state"
+        / TITLE_DICTIONARY_DIR
+        / f"{date_folder}{TITLE_DICTIONARY_SUFFIX}"
+    )
+
+
+def prune_title_dictionaries(
+    output_root: str = "output", keep_days: int = TITLE_DICTIONARY_KEEP_DAYS
+) -> None:
+    """刪除較早日期的標題字典和匹配緩存"""
+    dictionary_dir = Path(output_root) / ".state" / TITLE_DICTIONARY_DIR
+    if not dictionary_dir.exists():
+        return
+    dates = sorted(
+        {path.name.split(".", 1)[0] for path in dictionary_dir.iterdir()}
+    )
+    expired = set(dates[:-keep_days]) if keep_days > 0 else set(dates)
+    for path in dictionary_dir.iterdir():
+        if path.name.split(".", 1)[0] in expired:
+            path.unlink()
+
+
+def get_title_dictionary(
+    date_folder: Optional[str] = None, output_root: str = "output"
+) -> TitleDictionary:
+    """獲取某天的標題字典（進程內共用，文件被其他進程更新後重新加載）"""
+    date_folder = date_folder or format_date_folder()
+    dictionary_path = get_title_dictionary_path(date_folder, output_root)
+    cache_key = str(dictionary_path)
+
+    dictionary = TITLE_DICTIONARIES.get(cache_key)
+    if dictionary is None or dictionary.is_stale():
+        if len(TITLE_DICTIONARIES) >= TITLE_DICTIONARIES_LIMIT:
+            TITLE_DICTIONARIES.clear()
+        dictionary = TITLE_DICTIONARIES[cache_key] = TitleDictionary(dictionary_path)
+    return dictionary
+
+
 # === 數據獲取 ===
+FETCH_STATE_FILE = "fetch_state.json"
+# 各平台上次的解析結果，與 fetch_state.json 中的響應指紋配對，定時任務每次新開進程也能複用
+PARSED_CACHE_DIR = "parsed"
+
+
 class DataFetcher:
     """數據獲取器"""
 
-    def __init__(self, proxy_url: Optional[str] = None):
+    def __init__(self, proxy_url: Optional[str] = None, output_root: str = "output"):
         self.proxy_url = proxy_url
+        self.state_path = get_state_path(FETCH_STATE_FILE, output_root)
+        self.fetch_state = {}
+        if self.state_path.exists():
+            try:
+                self.fetch_state = read_json_file(self.state_path)
+            except Exception as e:
+                print(f"抓取狀態讀取失敗，將重新建立: {e}")
+
+        # 上次的解析結果 {id: {"hash", "titles": [[標題, 排名, url, mobile_url]]}}
+        # 按需從 output/.state/parsed 加載，解析新響應後寫回
+        self.parsed_dir = get_state_path(PARSED_CACHE_DIR, output_root)
+        self.parsed_cache = {}
+        self.reused_ids = set()
+        # 因本輪爬取時限放棄的平台，不計入熔斷統計
+        self.deadline_aborted_ids = set()
+
+        self.hedge_executor = None
+        self.hedge_budget = 0
+        self.hedge_used = 0
+        # 對沖勝出時仍在進行的主請求 [(future, platform_state, started_at)]
+        self.pending_primaries = []
+
+    def record_latency(self, platform_state: Dict, latency: float) -> None:
+        """記錄主請求耗時（只在主線程調用）"""
+        latencies = platform_state.setdefault("latencies", [])
+        latencies.append(round(latency, 3))
+        del latencies[:-20]
+
+    def close_hedge_executor(self) -> None:
+        """等待對沖落敗的主請求結束並記錄其耗時，再關閉線程池
+
+        主請求自帶超時，等待時間有上限；落敗的對沖請求不影響狀態，不必等待
+        """
+        if self.pending_primaries:
+            wait([future for future, _, _ in self.pending_primaries])
+            for future, platform_state, started_at in self.pending_primaries:
+                if future.exception() is None:
+                    self.record_latency(platform_state, future.result()[1] - started_at)
+            self.pending_primaries = []
+        if self.hedge_executor is not None:
+            self.hedge_executor.shutdown(wait=False)
+            self.hedge_executor = None
+
+    def get_parsed_cache(self, id_value: str) -> Optional[Dict]:
+        """獲取平台上次的解析結果，本進程內沒有時從磁盤加載"""
+        if id_value not in self.parsed_cache:
+            cached = None
+            cache_path = self.parsed_dir / f"{id_value}.json"
+            if cache_path.exists():
+                try:
+                    cached = read_json_file(cache_path)
+                except Exception as e:
+                    print(f"{id_value} 解析緩存讀取失敗，將重新解析: {e}")
+            self.parsed_cache[id_value] = cached
+        return self.parsed_cache[id_value]
+
+    def save_parsed_cache(self, id_value: str, payload_hash: str, titles: Dict) -> None:
+        """保存平台本次的解析結果"""
+        cached = {
+            "hash": payload_hash,
+            "titles": [
+                [title, list(record.ranks), record.url, record.mobile_url]
+                for title, record in titles.items()
+            ],
+        }
+        self.parsed_cache[id_value] = cached
+        try:
+            ensure_directory_exists(str(self.parsed_dir))
+            write_json_file(self.parsed_dir / f"{id_value}.json", cached)
+        except Exception as e:
+            print(f"{id_value} 解析緩存保存失敗: {e}")
+
+    def save_fetch_state(self) -> None:
+        """保存各平台的響應指紋和統計"""
+        write_json_file(self.state_path, self.fetch_state, indent=True)
+
+    def get_platform_state(self, id_value: str) -> Dict:
+        """獲取平台的抓取狀態"""
+        platform_state = self.fetch_state.setdefault(
+            id_value, {"fetched": 0, "unchanged": 0, "reused": 0}
+        )
+        platform_state.setdefault(
+            "breaker", {"state": "closed", "outcomes": [], "opened_at": 0, "cooldown": 0}
+        )
+        return platform_state
+
+    def get_hedge_delay(self, platform_state: Dict) -> float:
+        """對沖延遲：該平台最近成功的主請求耗時的分位數"""
+        latencies = sorted(platform_state.get("latencies", []))
+        if len(latencies) < 5:
+            return CONFIG["HEDGE"]["DEFAULT_DELAY"]
+        index = max(0, math.ceil(CONFIG["HEDGE"]["PERCENTILE"] / 100 * len(latencies)) - 1)
+        return max(CONFIG["HEDGE"]["MIN_DELAY"], latencies[index])
+
+    def request_with_hedge(
+        self,
+        id_value: str,
+        url: str,
+        proxies: Optional[Dict],
+        headers: Dict,
+        timeout: float,
+    ) -> requests.Response:
+        """發送請求；啟用對沖時主請求超過延遲分位數仍未返回則補發一次，取先成功者"""
+        platform_state = self.get_platform_state(id_value)
+        started_at = time.monotonic()
+
+        def timed_get() -> Tuple[requests.Response, float]:
+            # 線程池中只返回完成時間，耗時統一由主線程記錄
+            response = requests.get(
+                url, proxies=proxies, headers=headers, timeout=timeout
+            )
+            return response, time.monotonic()
+
+        # 只記錄主請求的耗時，對沖請求勝出時的耗時更短，計入會使分位數持續下降
+        delay = self.get_hedge_delay(platform_state)
+        if (
+            not CONFIG["HEDGE"]["ENABLED"]
+            or self.hedge_used >= self.hedge_budget
+            or delay >= timeout
+        ):
+            response = requests.get(
+                url, proxies=proxies, headers=headers, timeout=timeout
+            )
+            self.record_latency(platform_state, time.monotonic() - started_at)
+        else:
+            if self.hedge_executor is None:
+                self.hedge_executor = ThreadPoolExecutor(max_workers=4)
+
+            primary = self.hedge_executor.submit(timed_get)
+            done, _ = wait([primary], timeout=delay)
+            if done:
+                response, finished_at = primary.result()
+                self.record_latency(platform_state, finished_at - started_at)
+            else:
+                self.hedge_used += 1
+                hedge_stats = platform_state.setdefault("hedge", {"sent": 0, "won": 0})
+                hedge_stats["sent"] += 1
+                print(f"{id_value} 超過 {delay:.1f} 秒未響應，發送對沖請求")
+
+                hedge = self.hedge_executor.submit(
+                    requests.get,
+                    url,
+                    proxies=proxies,
+                    headers=headers,
+                    timeout=max(0.1, timeout - delay),
+                )
+                pending = {primary, hedge}
+                response = None
+                error = None
+                while pending and response is None:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            response = future.result()
+                        except Exception as e:
+                            error = e
+                            continue
+                        if future is hedge:
+                            hedge_stats["won"] += 1
+                        else:
+                            response = response[0]
+                        break
+
+                if not primary.done():
+                    # 對沖勝出，主請求結束後在 close_hedge_executor 中記錄耗時
+                    self.pending_primaries.append((primary, platform_state, started_at))
+                elif primary.exception() is None:
+                    self.record_latency(platform_state, primary.result()[1] - started_at)
+                if response is None:
+                    raise error
+
+        return response
+
+    def check_breaker(self, id_value: str, now: float) -> str:
+        """返回熔斷器狀態：closed 正常請求，half_open 試探一次，open 跳過"""
+        breaker = self.get_platform_state(id_value)["breaker"]
+        if not CONFIG["CIRCUIT_BREAKER"]["ENABLED"] or breaker["state"] == "closed":
+            return "closed"
+        if now - breaker["opened_at"] >= breaker["cooldown"] * 60:
+            breaker["state"] = "half_open"
+            return "half_open"
+        return "open"
+
+    def record_outcome(self, id_value: str, success: bool, now: float) -> None:
+        """記錄請求結果，失敗率超過閾值時熔斷，試探失敗時加倍冷卻時間"""
+        breaker_config = CONFIG["CIRCUIT_BREAKER"]
+        breaker = self.get_platform_state(id_value)["breaker"]
+        outcomes = breaker["outcomes"] = (breaker["outcomes"] + [int(success)])[
+            -breaker_config["WINDOW"] :
+        ]
+
+        if breaker["state"] == "half_open":
+            if success:
+                breaker.update(state="closed", outcomes=[1], cooldown=0)
+                print(f"{id_value} 試探請求成功，恢復正常")
+            else:
+                breaker.update(
+                    state="open",
+                    opened_at=now,
+                    cooldown=min(
+                        breaker["cooldown"] * 2, breaker_config["MAX_COOLDOWN_MINUTES"]
+                    ),
+                )
+                print(f"{id_value} 試探請求失敗，{breaker['cooldown']} 分鐘後再試")
+            return
+
+        failure_rate = 1 - sum(outcomes) / len(outcomes)
+        if (
+            len(outcomes) >= breaker_config["MIN_REQUESTS"]
+            and failure_rate >= breaker_config["FAILURE_RATE"]
+        ):
+            breaker.update(
+                state="open", opened_at=now, cooldown=breaker_config["COOLDOWN_MINUTES"]
+            )
+            print(
+                f"{id_value} 最近失敗率 {failure_rate:.0%}，熔斷 {breaker['cooldown']} 分鐘"
+            )
 
     def fetch_data(
         self,
@@ -229,8 +1002,12 @@ class DataFetcher:
         max_retries: int = 2,
         min_retry_wait: int = 3,
         max_retry_wait: int = 5,
-    ) -> Tuple[Optional[str], str, str]:
-        """獲取指定ID數據，支持重試"""
+        deadline: Optional[float] = None,
+    ) -> Tuple[Optional[Dict], str, str]:
+        """獲取指定ID數據並解析，支持重試，不超過 deadline（time.monotonic 時間）
+
+        響應未變化時返回上次的解析結果（見 get_parsed_cache）
+        """
         if isinstance(id_info, tuple):
             id_value, alias = id_info
         else:
@@ -251,16 +1028,57 @@ class DataFetcher:
             "Cache-Control": "no-cache",
         }
 
+        # 有與上次響應對應的解析結果時發送條件請求
+        platform_state = self.get_platform_state(id_value)
+        cached = self.get_parsed_cache(id_value)
+        if cached and cached["hash"] != platform_state.get("hash"):
+            cached = None
+        if cached:
+            if platform_state.get("etag"):
+                headers["If-None-Match"] = platform_state["etag"]
+            if platform_state.get("last_modified"):
+                headers["If-Modified-Since"] = platform_state["last_modified"]
+
         retries = 0
         while retries <= max_retries:
+            timeout = 10
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    print(f"請求 {id_value} 超出本輪爬取時限，放棄")
+                    self.deadline_aborted_ids.add(id_value)
+                    return None, id_value, alias
             try:
-                response = requests.get(
-                    url, proxies=proxies, headers=headers, timeout=10
+                response = self.request_with_hedge(
+                    id_value, url, proxies, headers, timeout
                 )
-                response.raise_for_status()
+                if response.status_code == 304 and cached:
+                    platform_state["fetched"] += 1
+                    platform_state["unchanged"] += 1
+                    self.reused_ids.add(id_value)
+                    print(f"獲取 {id_value} 成功（未修改，複用上次數據）")
+                    return cached, id_value, alias
 
-                data_text = response.text
-                data_json = json.loads(data_text)
+                response.raise_for_status()
+                platform_state["fetched"] += 1
+
+                if response.headers.get("ETag"):
+                    platform_state["etag"] = response.headers["ETag"]
+                if response.headers.get("Last-Modified"):
+                    platform_state["last_modified"] = response.headers["Last-Modified"]
+
+                # 響應與上次完全相同時跳過解析
+                payload_hash = hashlib.sha1(response.content).hexdigest()
+                if payload_hash == platform_state.get("hash"):
+                    platform_state["unchanged"] += 1
+                    if cached and cached["hash"] == payload_hash:
+                        self.reused_ids.add(id_value)
+                        print(f"獲取 {id_value} 成功（與上次相同，複用上次數據）")
+                        return cached, id_value, alias
+                platform_state["hash"] = payload_hash
+
+                # 直接從字節解析，不經過 response.text 的編碼探測和二次解碼
+                data_json = json_loads(response.content)
 
                 status = data_json.get("status", "未知")
                 if status not in ["success", "cache"]:
@@ -268,7 +1086,7 @@ class DataFetcher:
 
                 status_info = "最新數據" if status == "success" else "緩存數據"
                 print(f"獲取 {id_value} 成功（{status_info}）")
-                return data_text, id_value, alias
+                return data_json, id_value, alias
 
             except Exception as e:
                 retries += 1
@@ -276,6 +1094,13 @@ class DataFetcher:
                     base_wait = random.uniform(min_retry_wait, max_retry_wait)
                     additional_wait = (retries - 1) * random.uniform(1, 2)
                     wait_time = base_wait + additional_wait
+                    if (
+                        deadline is not None
+                        and time.monotonic() + wait_time >= deadline
+                    ):
+                        print(f"請求 {id_value} 失敗: {e}，剩餘時間不足，不再重試")
+                        self.deadline_aborted_ids.add(id_value)
+                        return None, id_value, alias
                     print(f"請求 {id_value} 失敗: {e}. {wait_time:.2f}秒後重試...")
                     time.sleep(wait_time)
                 else:
@@ -287,11 +1112,22 @@ class DataFetcher:
         self,
         ids_list: List[Union[str, Tuple[str, str]]],
         request_interval: int = CONFIG["REQUEST_INTERVAL"],
+        snapshot_writer: Optional["SnapshotWriter"] = None,
     ) -> Tuple[Dict, Dict, List]:
-        """爬取多個網站數據"""
+        """爬取多個網站數據，跳過熔斷中的平台，總耗時不超過配置的爬取時限
+
+        傳入 snapshot_writer 時每個平台完成後立即寫入快照
+        """
         results = {}
         id_to_name = {}
         failed_ids = []
+        deadline = None
+        if CONFIG["CRAWL_DEADLINE"]:
+            deadline = time.monotonic() + CONFIG["CRAWL_DEADLINE"]
+
+        # 每輪對沖請求數不超過請求數的一定比例
+        self.hedge_budget = max(1, int(len(ids_list) * CONFIG["HEDGE"]["BUDGET"]))
+        self.hedge_used = 0
 
         for i, id_info in enumerate(ids_list):
             if isinstance(id_info, tuple):
@@ -301,98 +1137,336 @@ class DataFetcher:
                 name = id_value
 
             id_to_name[id_value] = name
-            response, _, _ = self.fetch_data(id_info)
 
-            if response:
+            now = time.time()
+            breaker_state = self.check_breaker(id_value, now)
+            if breaker_state == "open":
+                print(f"{id_value} 熔斷中，跳過本輪請求")
+                failed_ids.append(id_value)
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                print(f"已超出本輪爬取時限，跳過 {id_value}")
+                failed_ids.append(id_value)
+                continue
+
+            # 試探請求不重試，失敗後立即恢復熔斷
+            response, _, _ = self.fetch_data(
+                id_info,
+                max_retries=0 if breaker_state == "half_open" else 2,
+                deadline=deadline,
+            )
+
+            if response and id_value in self.reused_ids:
+                # 每次重建記錄，避免下游修改影響緩存
+                results[id_value] = {
+                    sys.intern(title): TitleRecord(
+                        list(ranks), sys.intern(url), sys.intern(mobile_url)
+                    )
+                    for title, ranks, url, mobile_url in response["titles"]
+                }
+                self.fetch_state[id_value]["reused"] += 1
+            elif response:
                 try:
-                    data = json.loads(response)
                     results[id_value] = {}
-                    for index, item in enumerate(data.get("items", []), 1):
-                        title = item["title"]
-                        url = item.get("url", "")
-                        mobile_url = item.get("mobileUrl", "")
+                    for index, item in enumerate(response.get("items", []), 1):
+                        title = sys.intern(item["title"])
+                        url = sys.intern(item.get("url", "") or "")
+                        mobile_url = sys.intern(item.get("mobileUrl", "") or "")
 
                         if title in results[id_value]:
-                            results[id_value][title]["ranks"].append(index)
+                            results[id_value][title].ranks.append(index)
                         else:
-                            results[id_value][title] = {
-                                "ranks": [index],
-                                "url": url,
-                                "mobileUrl": mobile_url,
-                            }
-                except json.JSONDecodeError:
-                    print(f"解析 {id_value} 響應失敗")
-                    failed_ids.append(id_value)
+                            results[id_value][title] = TitleRecord(
+                                [index], url, mobile_url
+                            )
+                    self.save_parsed_cache(
+                        id_value, self.fetch_state[id_value]["hash"], results[id_value]
+                    )
                 except Exception as e:
                     print(f"處理 {id_value} 數據出錯: {e}")
                     failed_ids.append(id_value)
             else:
                 failed_ids.append(id_value)
 
+            if id_value in self.deadline_aborted_ids:
+                # 整輪爬取過慢導致的放棄不代表平台異常
+                self.deadline_aborted_ids.discard(id_value)
+            else:
+                self.record_outcome(id_value, id_value not in failed_ids, now)
+            if snapshot_writer and id_value in results:
+                snapshot_writer.write_section(id_value, name, results[id_value])
+
             if i < len(ids_list) - 1:
                 actual_interval = request_interval + random.randint(-10, 20)
                 actual_interval = max(50, actual_interval)
                 time.sleep(actual_interval / 1000)
 
         print(f"成功: {list(results.keys())}, 失敗: {failed_ids}")
+        self.close_hedge_executor()
+        self.report_reuse(ids_list)
+        self.save_fetch_state()
         return results, id_to_name, failed_ids
 
+    def report_reuse(self, ids_list: List[Union[str, Tuple[str, str]]]) -> None:
+        """輸出本輪複用情況和各平台累計的響應未變化比例"""
+        current_ids = [
+            id_info[0] if isinstance(id_info, tuple) else id_info
+            for id_info in ids_list
+        ]
+        reused = [id_value for id_value in current_ids if id_value in self.reused_ids]
+        print(f"本輪複用上次解析結果: {len(reused)}/{len(current_ids)} {reused}")
+
+        ratios = []
+        for id_value in current_ids:
+            platform_state = self.fetch_state.get(id_value)
+            if platform_state and platform_state["fetched"]:
+                ratios.append(
+                    f"{id_value} {platform_state['unchanged']}/{platform_state['fetched']}"
+                )
+        if ratios:
+            print(f"累計響應未變化: {', '.join(ratios)}")
+        self.reused_ids.clear()
+
+        if CONFIG["HEDGE"]["ENABLED"]:
+            hedge_summary = [
+                f"{id_value} {stats['won']}/{stats['sent']}"
+                for id_value in current_ids
+                for stats in [self.fetch_state.get(id_value, {}).get("hedge")]
+                if stats
+            ]
+            print(
+                f"本輪對沖請求 {self.hedge_used}/{self.hedge_budget}"
+                + (f"，累計對沖勝出: {', '.join(hedge_summary)}" if hedge_summary else "")
+            )
 
-# === 數據處理 ===
-def save_titles_to_file(results: Dict, id_to_name: Dict, failed_ids: List) -> str:
-    """保存標題到文件"""
-    file_path = get_output_path("txt", f"{format_time_filename()}.txt")
-
-    with open(file_path, "w", encoding="utf-8") as f:
-        for id_value, title_data in results.items():
-            # id | name 或 id
-            name = id_to_name.get(id_value)
-            if name and name != id_value:
-                f.write(f"{id_value} | {name}\n")
+
+CRAWL_SCHEDULE_FILE = "crawl_schedule.json"
+
+
+class CrawlScheduler:
+    """按各平台標題的變化速度自適應調整爬取間隔"""
+
+    def __init__(self, platforms: List[Dict], output_root: str = "output"):
+        self.state_path = get_state_path(CRAWL_SCHEDULE_FILE, output_root)
+        self.state = {}
+        if self.state_path.exists():
+            try:
+                self.state = read_json_file(self.state_path)
+            except Exception as e:
+                print(f"爬取調度狀態讀取失敗，將重新建立: {e}")
+
+        schedule_config = CONFIG["ADAPTIVE_SCHEDULE"]
+        self.limits = {
+            platform["id"]: (
+                platform.get("min_interval", schedule_config["MIN_INTERVAL"]),
+                platform.get("max_interval", schedule_config["MAX_INTERVAL"]),
+            )
+            for platform in platforms
+        }
+        self.target_churn = schedule_config["TARGET_CHURN"]
+
+    def is_due(self, id_value: str, now: float) -> bool:
+        """是否到了該平台的下次爬取時間（允許 1 分鐘的調度誤差）"""
+        platform_state = self.state.get(id_value)
+        if not platform_state:
+            return True
+        next_fetch = platform_state["last_fetch"] + platform_state["interval"] * 60
+        return now >= next_fetch - 60
+
+    def record(
+        self,
+        id_value: str,
+        previous_titles: Optional[Dict],
+        current_titles: Dict,
+        now: float,
+    ) -> None:
+        """根據相鄰兩次快照的 Jaccard 距離更新變化速度和爬取間隔"""
+        min_interval, max_interval = self.limits.get(
+            id_value,
+            (
+                CONFIG["ADAPTIVE_SCHEDULE"]["MIN_INTERVAL"],
+                CONFIG["ADAPTIVE_SCHEDULE"]["MAX_INTERVAL"],
+            ),
+        )
+        platform_state = self.state.get(id_value)
+
+        if platform_state and previous_titles is not None:
+            previous_set = set(previous_titles)
+            current_set = set(current_titles)
+            union = previous_set | current_set
+            churn = 1 - len(previous_set & current_set) / len(union) if union else 0.0
+            elapsed_minutes = max(1.0, (now - platform_state["last_fetch"]) / 60)
+
+            # 每分鐘變化率的指數平滑
+            churn_rate = churn / elapsed_minutes
+            churn_rate = 0.5 * churn_rate + 0.5 * platform_state["churn_rate"]
+
+            # 預計列表變化達到 target_churn 時再爬取
+            if churn_rate > 0:
+                interval = self.target_churn / churn_rate
             else:
-                f.write(f"{id_value}\n")
-
-            # 按排名排序標題
-            sorted_titles = []
-            for title, info in title_data.items():
-                cleaned_title = clean_title(title)
-                if isinstance(info, dict):
-                    ranks = info.get("ranks", [])
-                    url = info.get("url", "")
-                    mobile_url = info.get("mobileUrl", "")
-                else:
-                    ranks = info if isinstance(info, list) else []
-                    url = ""
-                    mobile_url = ""
+                interval = max_interval
+        else:
+            churn_rate = self.target_churn / min_interval
+            interval = min_interval
 
-                rank = ranks[0] if ranks else 1
-                sorted_titles.append((rank, cleaned_title, url, mobile_url))
+        self.state[id_value] = {
+            "interval": round(min(max_interval, max(min_interval, interval)), 1),
+            "churn_rate": churn_rate,
+            "last_fetch": now,
+        }
 
-            sorted_titles.sort(key=lambda x: x[0])
+    def save(self) -> None:
+        write_json_file(self.state_path, self.state, indent=True)
 
-            for rank, cleaned_title, url, mobile_url in sorted_titles:
-                line = f"{rank}. {cleaned_title}"
 
-                if url:
-                    line += f" [URL:{url}]"
-                if mobile_url:
-                    line += f" [MOBILE:{mobile_url}]"
-                f.write(line + "\n")
+# === 數據處理 ===
+FAILED_IDS_MARKER = "==== 以下ID請求失敗 ===="
 
-            f.write("\n")
 
+def format_snapshot_section(id_value: str, name: Optional[str], title_data: Dict) -> str:
+    """格式化單個平台在快照文件中的段落"""
+    # id | name 或 id
+    if name and name != id_value:
+        lines = [f"{id_value} | {name}"]
+    else:
+        lines = [id_value]
+
+    # 按排名排序標題
+    sorted_titles = []
+    for title, info in title_data.items():
+        cleaned_title = clean_title(title)
+        if isinstance(info, TitleRecord):
+            ranks = info.ranks
+            url = info.url
+            mobile_url = info.mobile_url
+        else:
+            ranks = info if isinstance(info, list) else []
+            url = ""
+            mobile_url = ""
+
+        rank = ranks[0] if ranks else 1
+        sorted_titles.append((rank, cleaned_title, url, mobile_url))
+
+    sorted_titles.sort(key=lambda x: x[0])
+
+    for rank, cleaned_title, url, mobile_url in sorted_titles:
+        line = f"{rank}. {cleaned_title}"
+
+        if url:
+            line += f" [URL:{url}]"
+        if mobile_url:
+            line += f" [MOBILE:{mobile_url}]"
+        lines.append(line)
+
+    return "\n".join(lines) + "\n\n"
+
+
+PARTIAL_SNAPSHOT_SUFFIX = ".partial"
+# 超過該時間未更新的 .partial 文件視為崩潰遺留（寫入中的文件每個平台都會刷新修改時間）
+PARTIAL_SNAPSHOT_STALE_SECONDS = 600
+
+
+class SnapshotWriter:
+    """快照流式寫入：每個平台完成即追加到 .partial 文件，全部完成後原子重命名為正式快照"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.partial_path = file_path + PARTIAL_SNAPSHOT_SUFFIX
+        self.file = open(self.partial_path, "w", encoding="utf-8")
+
+    def write_section(self, id_value: str, name: Optional[str], title_data: Dict) -> None:
+        """追加一個平台的數據並立即刷新，中途崩潰也能保留已完成的平台"""
+        self.file.write(format_snapshot_section(id_value, name, title_data))
+        self.file.flush()
+
+    def finalize(self, failed_ids: List) -> str:
+        """寫入失敗列表並重命名為正式快照"""
         if failed_ids:
-            f.write("==== 以下ID請求失敗 ====\n")
+            self.file.write(FAILED_IDS_MARKER + "\n")
             for id_value in failed_ids:
-                f.write(f"{id_value}\n")
+                self.file.write(f"{id_value}\n")
+        self.file.flush()
+        if CONFIG["FSYNC_WRITES"]:
+            os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.partial_path, self.file_path)
+        if CONFIG["FSYNC_WRITES"]:
+            fsync_directory(Path(self.file_path).parent)
+        return self.file_path
+
+
+class DeltaSnapshotWriter(SnapshotWriter):
+    """增量快照寫入：爬取過程仍流式寫入 .partial 以防崩潰丟數據，完成後追加為增量日誌的一條記錄"""
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self.titles_by_id = {}
+        self.id_to_name = {}
+
+    def write_section(self, id_value: str, name: Optional[str], title_data: Dict) -> None:
+        super().write_section(id_value, name, title_data)
+        self.titles_by_id[id_value] = title_data
+        self.id_to_name[id_value] = name
+
+    def finalize(self, failed_ids: List) -> str:
+        self.file.close()
+        snapshot_path = Path(self.file_path)
+        log_path = append_delta_snapshot(
+            snapshot_path.parent.parent,
+            snapshot_path.stem,
+            self.titles_by_id,
+            self.id_to_name,
+            failed_ids,
+        )
+        os.remove(self.partial_path)
+        return str(log_path)
 
-    return file_path
+
+def recover_partial_snapshots(output_root: str = "output") -> List[str]:
+    """恢復崩潰遺留的 .partial 快照：保留完整的平台段落並轉為正式快照"""
+    recovered = []
+    now = time.time()
+    for partial_path in Path(output_root).glob(f"*/txt/*.txt{PARTIAL_SNAPSHOT_SUFFIX}"):
+        try:
+            if now - partial_path.stat().st_mtime < PARTIAL_SNAPSHOT_STALE_SECONDS:
+                continue
+
+            file_path = partial_path.with_suffix("")
+            content = partial_path.read_text(encoding="utf-8")
+            # 最後一段可能寫到一半，截斷到最後一個完整段落
+            complete_end = content.rfind("\n\n")
+            if file_path.exists() or complete_end < 0:
+                partial_path.unlink()
+                continue
+
+            with atomic_write(file_path) as f:
+                f.write(content[: complete_end + 2])
+            partial_path.unlink()
+            recovered.append(str(file_path))
+        except Exception as e:
+            print(f"恢復未完成快照 {partial_path} 失敗: {e}")
+
+    if recovered:
+        print(f"已恢復未完成的快照: {recovered}")
+    return recovered
+
+
+def save_titles_to_file(results: Dict, id_to_name: Dict, failed_ids: List) -> str:
+    """保存標題到文件"""
+    writer = SnapshotWriter(get_output_path("txt", f"{format_time_filename()}.txt"))
+    for id_value, title_data in results.items():
+        writer.write_section(id_value, id_to_name.get(id_value), title_data)
+    return writer.finalize(failed_ids)
+
+
+FREQUENCY_WORDS_CACHE = {}
 
 
 def load_frequency_words(
     frequency_file: Optional[str] = None,
 ) -> Tuple[List[Dict], List[str]]:
-    """加載頻率詞配置"""
+    """加載頻率詞配置，文件未修改時返回緩存結果"""
     if frequency_file is None:
         frequency_file = os.environ.get(
             "FREQUENCY_WORDS_PATH", "config/frequency_words.txt"
@@ -402,6 +1476,12 @@ def load_frequency_words(
     if not frequency_path.exists():
         raise FileNotFoundError(f"頻率詞文件 {frequency_file} 不存在")
 
+    file_stat = frequency_path.stat()
+    signature = (file_stat.st_mtime_ns, file_stat.st_size)
+    cached = FREQUENCY_WORDS_CACHE.get(str(frequency_path))
+    if cached and cached[0] == signature:
+        return cached[1]
+
     with open(frequency_path, "r", encoding="utf-8") as f:
         content = f.read()
 
@@ -440,97 +1520,546 @@ def load_frequency_words(
                 }
             )
 
+    FREQUENCY_WORDS_CACHE[str(frequency_path)] = (
+        signature,
+        (processed_groups, filter_words),
+    )
     return processed_groups, filter_words
 
 
+SNAPSHOT_ARCHIVE_FILE = "txt.zip"
+
+
+class ArchivedSnapshot:
+    """已壓縮歸檔的快照，提供與 Path 相同的 name/stem/read_text 接口
+
+    只記錄歸檔路徑，讀取時打開並隨即關閉，不長期佔用文件句柄
+    """
+
+    __slots__ = ("archive_path", "name", "stem")
+
+    def __init__(self, archive_path: Path, name: str):
+        self.archive_path = archive_path
+        self.name = name
+        self.stem = name.rsplit(".", 1)[0]
+
+    def read_text(self, encoding: str = "utf-8") -> str:
+        with zipfile.ZipFile(self.archive_path) as archive:
+            return archive.read(self.name).decode(encoding)
+
+    def __repr__(self) -> str:
+        return f"ArchivedSnapshot({str(self.archive_path)!r}, {self.name!r})"
+
+
+DELTA_LOG_FILE = "snapshots.delta"
+
+
+def build_snapshot_state(titles_by_id: Dict, id_to_name: Dict) -> Tuple[Dict, Dict]:
+    """快照數據轉換為增量編碼的狀態 {id: {title: (rank, url, mobile_url)}} 和非默認名稱
+
+    與寫入 txt 後再解析得到的結果一致：標題經過清理，按排名排序，無標題的平台不保留
+    """
+    state = {}
+    names = {}
+    for id_value, title_data in titles_by_id.items():
+        entries = []
+        for title, info in title_data.items():
+            if isinstance(info, TitleRecord):
+                rank = info.ranks[0] if info.ranks else 1
+                entries.append((rank, clean_title(title), info.url, info.mobile_url))
+            else:
+                rank = info[0] if isinstance(info, list) and info else 1
+                entries.append((rank, clean_title(title), "", ""))
+        entries.sort(key=lambda x: x[0])
+
+        platform_state = {}
+        for rank, title, url, mobile_url in entries:
+            platform_state[sys.intern(title)] = (rank, url, mobile_url)
+        if not platform_state:
+            continue
+
+        state[id_value] = platform_state
+        name = id_to_name.get(id_value)
+        if name and name != id_value:
+            names[id_value] = name
+    return state, names
+
+
+class DeltaLog:
+    """某天的增量快照日誌（JSON Lines，每行一個快照）
+
+    關鍵幀保存各平台完整列表，其餘記錄只保存與上一快照的差異：
+    s 新增或鏈接變化的標題、r 僅排名變化、d 移除的標題。
+    標題文本只在首次出現時寫入，之後以編號引用；編號在每個關鍵幀重新分配，從任一關鍵幀即可獨立重建
+    """
+
+    def __init__(self, log_path: Optional[Path] = None):
+        self.log_path = log_path
+        self.records = []
+        self.valid_size = 0
+        if log_path is not None and log_path.exists():
+            with open(log_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json_loads(line)
+                    except ValueError:
+                        # 最後一行可能寫到一半
+                        break
+                    self.records.append(record)
+                    self.valid_size += len(line)
+
+        self.cursor = -1
+        self.state = {}
+        self.titles = {}
+
+    def apply(self, index: int) -> None:
+        """在當前狀態上應用第 index 條記錄"""
+        record = self.records[index]
+        if record.get("k"):
+            self.state = {}
+            self.titles = {}
+
+        changes_by_id = record.get("p", {})
+        new_state = {}
+        for id_value in record["o"]:
+            changes = changes_by_id.get(id_value)
+            if not changes:
+                # 無變化的平台直接沿用同一對象
+                new_state[id_value] = self.state[id_value]
+                continue
+
+            platform_state = dict(self.state.get(id_value, {}))
+            for tid in changes.get("d", []):
+                del platform_state[self.titles[tid]]
+            for tid, rank in changes.get("r", []):
+                _, url, mobile_url = platform_state[self.titles[tid]]
+                platform_state[self.titles[tid]] = (rank, url, mobile_url)
+            for entry in changes.get("s", []):
+                if len(entry) == 5:
+                    tid, title, rank, url, mobile_url = entry
+                    self.titles[tid] = sys.intern(title)
+                else:
+                    tid, rank, url, mobile_url = entry
+                platform_state[self.titles[tid]] = (
+                    rank,
+                    sys.intern(url),
+                    sys.intern(mobile_url),
+                )
+            new_state[id_value] = dict(
+                sorted(platform_state.items(), key=lambda item: item[1][0])
+            )
+
+        self.state = new_state
+        self.cursor = index
+
+    def seek(self, index: int) -> Dict:
+        """重建第 index 條記錄時的狀態，順序讀取時只應用一條差異"""
+        if index != self.cursor:
+            start = index
+            while start > 0 and not self.records[start].get("k"):
+                start -= 1
+            if start <= self.cursor < index:
+                start = self.cursor + 1
+            for i in range(start, index + 1):
+                self.apply(i)
+        return self.state
+
+    def snapshot(self, index: int) -> Tuple[Dict, Dict]:
+        """重建第 index 條快照，返回與 parse_file_titles 相同的 (titles_by_id, id_to_name)"""
+        state = self.seek(index)
+        names = self.records[index].get("n", {})
+        titles_by_id = {
+            id_value: {
+                title: TitleRecord([rank], url, mobile_url)
+                for title, (rank, url, mobile_url) in platform_state.items()
+            }
+            for id_value, platform_state in state.items()
+        }
+        id_to_name = {id_value: names.get(id_value, id_value) for id_value in state}
+        return titles_by_id, id_to_name
+
+    def encode(
+        self,
+        time_info: str,
+        state: Dict,
+        names: Dict,
+        failed_ids: List,
+        keyframe_interval: int,
+    ) -> Dict:
+        """編碼一條相對於日誌末尾的新記錄並追加到 records"""
+        since_keyframe = 0
+        for record in reversed(self.records):
+            since_keyframe += 1
+            if record.get("k"):
+                break
+
+        keyframe = not self.records or since_keyframe >= keyframe_interval
+        if keyframe:
+            previous = {}
+            title_ids = {}
+        else:
+            previous = self.seek(len(self.records) - 1)
+            title_ids = {title: tid for tid, title in self.titles.items()}
+
+        changes_by_id = {}
+        for id_value, platform_state in state.items():
+            previous_platform = previous.get(id_value, {})
+            changes = {"s": [], "r": [], "d": []}
+            for title, (rank, url, mobile_url) in platform_state.items():
+                old = previous_platform.get(title)
+                if old == (rank, url, mobile_url):
+                    continue
+                tid = title_ids.get(title)
+                if old is not None and old[1:] == (url, mobile_url):
+                    changes["r"].append([tid, rank])
+                elif tid is None:
+                    tid = title_ids[title] = len(title_ids)
+                    changes["s"].append([tid, title, rank, url, mobile_url])
+                else:
+                    changes["s"].append([tid, rank, url, mobile_url])
+            changes["d"] = [
+                title_ids[title]
+                for title in previous_platform
+                if title not in platform_state
+            ]
+            changes = {key: value for key, value in changes.items() if value}
+            if changes:
+                changes_by_id[id_value] = changes
+
+        record = {"t": time_info, "o": list(state), "p": changes_by_id}
+        if keyframe:
+            record["k"] = 1
+        if names:
+            record["n"] = names
+        if failed_ids:
+            record["f"] = list(failed_ids)
+
+        self.records.append(record)
+        return record
+
+    def drop_last(self) -> None:
+        """移除最後一條記錄（同一分鐘重複運行時覆蓋）"""
+        self.records.pop()
+        self.cursor = -1
+
+    def write(self, log_path: Path) -> None:
+        """原子重寫整個日誌"""
+        with atomic_write(log_path, "wb") as f:
+            for record in self.records:
+                f.write(json_dumps(record) + b"\n")
+
+
+class DeltaSnapshot:
+    """增量日誌中的一個快照，提供與 Path 相同的 name/stem/read_text 接口"""
+
+    __slots__ = ("log", "index", "name", "stem")
+
+    def __init__(self, log: DeltaLog, index: int):
+        self.log = log
+        self.index = index
+        self.stem = log.records[index]["t"]
+        self.name = self.stem + ".txt"
+
+    def load(self) -> Tuple[Dict, Dict]:
+        return self.log.snapshot(self.index)
+
+    def read_text(self, encoding: str = "utf-8") -> str:
+        """還原為 txt 快照格式"""
+        titles_by_id, id_to_name = self.load()
+        content = "".join(
+            format_snapshot_section(id_value, id_to_name.get(id_value), title_data)
+            for id_value, title_data in titles_by_id.items()
+        )
+        failed_ids = self.log.records[self.index].get("f")
+        if failed_ids:
+            content += FAILED_IDS_MARKER + "\n" + "".join(
+                f"{id_value}\n" for id_value in failed_ids
+            )
+        return content
+
+    def __repr__(self) -> str:
+        return f"DeltaSnapshot({self.log.log_path!r}, {self.stem!r})"
+
+
+def append_delta_snapshot(
+    day_dir: Path,
+    time_info: str,
+    titles_by_id: Dict,
+    id_to_name: Dict,
+    failed_ids: List,
+) -> Path:
+    """把一次快照追加到當天的增量日誌"""
+    log_path = day_dir / DELTA_LOG_FILE
+    log = DeltaLog(log_path)
+    rewrite = log.log_path.exists() and log.valid_size != log_path.stat().st_size
+    if log.records and log.records[-1]["t"] == time_info:
+        log.drop_last()
+        rewrite = True
+
+    state, names = build_snapshot_state(titles_by_id, id_to_name)
+    record = log.encode(
+        time_info, state, names, failed_ids, CONFIG["DELTA_KEYFRAME_INTERVAL"]
+    )
+
+    if rewrite:
+        log.write(log_path)
+    else:
+        with open(log_path, "ab") as f:
+            f.write(json_dumps(record) + b"\n")
+            f.flush()
+            if CONFIG["FSYNC_WRITES"]:
+                os.fsync(f.fileno())
+    return log_path
+
+
+def aggregate_delta_log(
+    log: DeltaLog, current_platform_ids: Optional[List[str]] = None
+) -> Tuple[Dict, Dict, Dict]:
+    """直接從增量日誌構建當天聚合，結果與逐個快照 process_source_data 相同
+
+    只處理有變化的標題，連續出現的標題在消失或日終時一次性累計出現次數
+    """
+    all_results = {}
+    final_id_to_name = {}
+    title_info = {}
+    times = []
+    run_starts = {}
+    previous = {}
+
+    def close_run(id_value: str, title: str, end: int) -> None:
+        record = all_results[id_value][title]
+        record.count += end - run_starts[id_value].pop(title)
+        record.last_time = times[end - 1]
+
+    for index, log_record in enumerate(log.records):
+        time_info = sys.intern(log_record["t"])
+        times.append(time_info)
+        state = log.seek(index)
+        names = log_record.get("n", {})
+
+        current = {}
+        for id_value, platform_state in state.items():
+            if current_platform_ids is not None and id_value not in current_platform_ids:
+                continue
+            final_id_to_name[id_value] = names.get(id_value, id_value)
+            current[id_value] = platform_state
+
+            previous_platform = previous.get(id_value)
+            if platform_state is previous_platform:
+                continue
+            previous_platform = previous_platform or {}
+
+            source_results = all_results.setdefault(id_value, {})
+            source_info = title_info.setdefault(id_value, {})
+            starts = run_starts.setdefault(id_value, {})
+            for title, entry in platform_state.items():
+                old = previous_platform.get(title)
+                if old == entry:
+                    continue
+
+                rank, url, mobile_url = entry
+                record = source_results.get(title)
+                if record is None:
+                    record = TitleRecord(
+                        [rank], url, mobile_url, time_info, time_info, 0, rank
+                    )
+                    source_results[title] = record
+                    source_info[title] = record
+                else:
+                    record.last_rank = rank
+                    if rank not in record.ranks:
+                        record.ranks.append(rank)
+                    if not record.url:
+                        record.url = url
+                    if not record.mobile_url:
+                        record.mobile_url = mobile_url
+                if old is None:
+                    starts[title] = index
+
+            for title in previous_platform:
+                if title not in platform_state:
+                    close_run(id_value, title, index)
+
+        for id_value in previous:
+            if id_value not in current:
+                for title in list(run_starts[id_value]):
+                    close_run(id_value, title, index)
+        previous = current
+
+    for id_value, starts in run_starts.items():
+        for title in list(starts):
+            close_run(id_value, title, len(times))
+
+    return all_results, final_id_to_name, title_info
+
+
+def has_snapshot_data(day_dir: Path) -> bool:
+    """日期文件夾內是否有快照（未壓縮、已歸檔或增量日誌）"""
+    return (
+        (day_dir / "txt").exists()
+        or (day_dir / SNAPSHOT_ARCHIVE_FILE).exists()
+        or (day_dir / DELTA_LOG_FILE).exists()
+    )
+
+
+def list_snapshot_files(
+    date_folder: str, output_root: str = "output"
+) -> List[Union[Path, ArchivedSnapshot]]:
+    """按時間順序列出某天的全部快照，透明合併增量日誌、txt.zip 歸檔和 txt 目錄，同名時以未壓縮文件為準"""
+    day_dir = Path(output_root) / date_folder
+    files = {}
+
+    log_path = day_dir / DELTA_LOG_FILE
+    if log_path.exists():
+        log = DeltaLog(log_path)
+        for index in range(len(log.records)):
+            snapshot = DeltaSnapshot(log, index)
+            files[snapshot.name] = snapshot
+
+    archive_path = day_dir / SNAPSHOT_ARCHIVE_FILE
+    if archive_path.exists():
+        # zip 中央目錄即索引，單個快照可直接定位讀取
+        with zipfile.ZipFile(archive_path) as archive:
+            for name in archive.namelist():
+                if name.endswith(".txt"):
+                    files[name] = ArchivedSnapshot(archive_path, name)
+
+    txt_dir = day_dir / "txt"
+    if txt_dir.exists():
+        for file_path in txt_dir.iterdir():
+            if file_path.suffix == ".txt":
+                files[file_path.name] = file_path
+
+    return [files[name] for name in sorted(files)]
+
+
+def parse_failed_ids(file_path: Path) -> List[str]:
+    """解析快照末尾的請求失敗 ID 列表"""
+    if isinstance(file_path, DeltaSnapshot):
+        return list(file_path.log.records[file_path.index].get("f") or [])
+
+    content = file_path.read_text(encoding="utf-8")
+    marker_pos = content.find(FAILED_IDS_MARKER)
+    if marker_pos < 0:
+        return []
+    return [
+        line.strip()
+        for line in content[marker_pos + len(FAILED_IDS_MARKER) :].split("\n")
+        if line.strip()
+    ]
+
+
 def parse_file_titles(file_path: Path) -> Tuple[Dict, Dict]:
-    """解析單個txt文件的標題數據，返回(titles_by_id, id_to_name)"""
+    """解析單個快照文件（txt 文件或歸檔內的快照）的標題數據，返回(titles_by_id, id_to_name)"""
+    if isinstance(file_path, DeltaSnapshot):
+        return file_path.load()
+
     titles_by_id = {}
     id_to_name = {}
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-        sections = content.split("\n\n")
+    content = file_path.read_text(encoding="utf-8")
+    sections = content.split("\n\n")
 
-        for section in sections:
-            if not section.strip() or "==== 以下ID請求失敗 ====" in section:
-                continue
+    for section in sections:
+        if not section.strip() or FAILED_IDS_MARKER in section:
+            continue
 
-            lines = section.strip().split("\n")
-            if len(lines) < 2:
-                continue
+        lines = section.strip().split("\n")
+        if len(lines) < 2:
+            continue
 
-            # id | name 或 id
-            header_line = lines[0].strip()
-            if " | " in header_line:
-                parts = header_line.split(" | ", 1)
-                source_id = parts[0].strip()
-                name = parts[1].strip()
-                id_to_name[source_id] = name
-            else:
-                source_id = header_line
-                id_to_name[source_id] = source_id
+        # id | name 或 id
+        header_line = lines[0].strip()
+        if " | " in header_line:
+            parts = header_line.split(" | ", 1)
+            source_id = sys.intern(parts[0].strip())
+            name = parts[1].strip()
+            id_to_name[source_id] = name
+        else:
+            source_id = sys.intern(header_line)
+            id_to_name[source_id] = source_id
 
-            titles_by_id[source_id] = {}
+        titles_by_id[source_id] = {}
 
-            for line in lines[1:]:
-                if line.strip():
-                    try:
-                        title_part = line.strip()
-                        rank = None
-
-                        # 提取排名
-                        if ". " in title_part and title_part.split(". ")[0].isdigit():
-                            rank_str, title_part = title_part.split(". ", 1)
-                            rank = int(rank_str)
-
-                        # 提取 MOBILE URL
-                        mobile_url = ""
-                        if " [MOBILE:" in title_part:
-                            title_part, mobile_part = title_part.rsplit(" [MOBILE:", 1)
-                            if mobile_part.endswith("]"):
-                                mobile_url = mobile_part[:-1]
-
-                        # 提取 URL
-                        url = ""
-                        if " [URL:" in title_part:
-                            title_part, url_part = title_part.rsplit(" [URL:", 1)
-                            if url_part.endswith("]"):
-                                url = url_part[:-1]
-
-                        title = clean_title(title_part.strip())
-                        ranks = [rank] if rank is not None else [1]
-
-                        titles_by_id[source_id][title] = {
-                            "ranks": ranks,
-                            "url": url,
-                            "mobileUrl": mobile_url,
-                        }
+        for line in lines[1:]:
+            if line.strip():
+                try:
+                    title_part = line.strip()
+                    rank = None
+
+                    # 提取排名
+                    if ". " in title_part and title_part.split(". ")[0].isdigit():
+                        rank_str, title_part = title_part.split(". ", 1)
+                        rank = int(rank_str)
+
+                    # 提取 MOBILE URL
+                    mobile_url = ""
+                    if " [MOBILE:" in title_part:
+                        title_part, mobile_part = title_part.rsplit(" [MOBILE:", 1)
+                        if mobile_part.endswith("]"):
+                            mobile_url = mobile_part[:-1]
 
-                    except Exception as e:
-                        print(f"解析標題行出錯: {line}, 錯誤: {e}")
+                    # 提取 URL
+                    url = ""
+                    if " [URL:" in title_part:
+                        title_part, url_part = title_part.rsplit(" [URL:", 1)
+                        if url_part.endswith("]"):
+                            url = url_part[:-1]
+
+                    title = sys.intern(clean_title(title_part.strip()))
+                    ranks = [rank] if rank is not None else [1]
+
+                    titles_by_id[source_id][title] = TitleRecord(
+                        ranks, sys.intern(url), sys.intern(mobile_url)
+                    )
+
+                except Exception as e:
+                    print(f"解析標題行出錯: {line}, 錯誤: {e}")
 
     return titles_by_id, id_to_name
 
 
+def read_latest_snapshot_titles(
+    date_folder: Optional[str] = None, output_root: str = "output"
+) -> Tuple[Dict, Dict]:
+    """讀取當天（或指定日期）最新一次快照，返回(titles_by_id, id_to_name)"""
+    date_folder = date_folder or format_date_folder()
+    files = list_snapshot_files(date_folder, output_root)
+    if not files:
+        return {}, {}
+    return parse_file_titles(files[-1])
+
+
 def read_all_today_titles(
     current_platform_ids: Optional[List[str]] = None,
+    date_folder: Optional[str] = None,
+    output_root: str = "output",
 ) -> Tuple[Dict, Dict, Dict]:
-    """讀取當天所有標題文件，支持按當前監控平台過濾"""
-    date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
+    """讀取當天（或指定日期）所有標題文件，支持按當前監控平台過濾"""
+    date_folder = date_folder or format_date_folder()
 
-    if not txt_dir.exists():
+    # 已生成聚合側車文件的日期直接按需讀取
+    aggregate = open_day_aggregate(date_folder, output_root)
+    if aggregate is not None:
+        with aggregate:
+            return aggregate.load(current_platform_ids)
+
+    files = list_snapshot_files(date_folder, output_root)
+    if not files:
         return {}, {}, {}
 
+    # 全部來自同一增量日誌時直接按差異構建聚合
+    if isinstance(files[0], DeltaSnapshot) and [
+        getattr(f, "index", None) for f in files
+    ] == list(range(len(files[0].log.records))):
+        return aggregate_delta_log(files[0].log, current_platform_ids)
+
     all_results = {}
     final_id_to_name = {}
     title_info = {}
 
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
-
     for file_path in files:
-        time_info = file_path.stem
+        time_info = sys.intern(file_path.stem)
 
         titles_by_id, file_id_to_name = parse_file_titles(file_path)
 
@@ -564,81 +2093,57 @@ def process_source_data(
     all_results: Dict,
     title_info: Dict,
 ) -> None:
-    """處理來源數據，合併重複標題"""
+    """處理來源數據，合併重複標題（all_results 與 title_info 共用同一記錄對象）"""
     if source_id not in all_results:
         all_results[source_id] = title_data
 
         if source_id not in title_info:
             title_info[source_id] = {}
 
-        for title, data in title_data.items():
-            ranks = data.get("ranks", [])
-            url = data.get("url", "")
-            mobile_url = data.get("mobileUrl", "")
-
-            title_info[source_id][title] = {
-                "first_time": time_info,
-                "last_time": time_info,
-                "count": 1,
-                "ranks": ranks,
-                "url": url,
-                "mobileUrl": mobile_url,
-            }
+        for title, record in title_data.items():
+            record.first_time = time_info
+            record.last_time = time_info
+            record.count = 1
+            record.last_rank = min(record.ranks) if record.ranks else None
+            title_info[source_id][title] = record
     else:
-        for title, data in title_data.items():
-            ranks = data.get("ranks", [])
-            url = data.get("url", "")
-            mobile_url = data.get("mobileUrl", "")
-
-            if title not in all_results[source_id]:
-                all_results[source_id][title] = {
-                    "ranks": ranks,
-                    "url": url,
-                    "mobileUrl": mobile_url,
-                }
-                title_info[source_id][title] = {
-                    "first_time": time_info,
-                    "last_time": time_info,
-                    "count": 1,
-                    "ranks": ranks,
-                    "url": url,
-                    "mobileUrl": mobile_url,
-                }
+        source_results = all_results[source_id]
+        source_info = title_info[source_id]
+
+        for title, record in title_data.items():
+            if title not in source_results:
+                record.first_time = time_info
+                record.last_time = time_info
+                record.count = 1
+                record.last_rank = min(record.ranks) if record.ranks else None
+                source_results[title] = record
+                source_info[title] = record
             else:
-                existing_data = all_results[source_id][title]
-                existing_ranks = existing_data.get("ranks", [])
-                existing_url = existing_data.get("url", "")
-                existing_mobile_url = existing_data.get("mobileUrl", "")
+                existing = source_results[title]
 
-                merged_ranks = existing_ranks.copy()
-                for rank in ranks:
+                merged_ranks = existing.ranks
+                for rank in record.ranks:
                     if rank not in merged_ranks:
                         merged_ranks.append(rank)
 
-                all_results[source_id][title] = {
-                    "ranks": merged_ranks,
-                    "url": existing_url or url,
-                    "mobileUrl": existing_mobile_url or mobile_url,
-                }
-
-                title_info[source_id][title]["last_time"] = time_info
-                title_info[source_id][title]["ranks"] = merged_ranks
-                title_info[source_id][title]["count"] += 1
-                if not title_info[source_id][title].get("url"):
-                    title_info[source_id][title]["url"] = url
-                if not title_info[source_id][title].get("mobileUrl"):
-                    title_info[source_id][title]["mobileUrl"] = mobile_url
-
+                existing.last_time = time_info
+                existing.count += 1
+                if record.ranks:
+                    existing.last_rank = min(record.ranks)
+                if not existing.url:
+                    existing.url = record.url
+                if not existing.mobile_url:
+                    existing.mobile_url = record.mobile_url
 
-def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -> Dict:
-    """檢測當日最新批次的新增標題，支持按當前監控平台過濾"""
-    date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
 
-    if not txt_dir.exists():
-        return {}
-
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
+def detect_latest_new_titles(
+    current_platform_ids: Optional[List[str]] = None,
+    date_folder: Optional[str] = None,
+    output_root: str = "output",
+) -> Dict:
+    """檢測當日（或指定日期）最新批次的新增標題，支持按當前監控平台過濾"""
+    date_folder = date_folder or format_date_folder()
+    files = list_snapshot_files(date_folder, output_root)
     if len(files) < 2:
         return {}
 
@@ -654,7 +2159,8 @@ def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -
                 filtered_latest_titles[source_id] = title_data
         latest_titles = filtered_latest_titles
 
-    # 匯總歷史標題（按平台過濾）
+    # 匯總歷史標題 ID（按平台過濾）
+    get_id = get_title_dictionary(date_folder, output_root).get_id
     historical_titles = {}
     for file_path in files[:-1]:
         historical_data, _ = parse_file_titles(file_path)
@@ -670,8 +2176,7 @@ def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -
         for source_id, titles_data in historical_data.items():
             if source_id not in historical_titles:
                 historical_titles[source_id] = set()
-            for title in titles_data.keys():
-                historical_titles[source_id].add(title)
+            historical_titles[source_id].update(map(get_id, titles_data))
 
     # 找出新增標題
     new_titles = {}
@@ -680,7 +2185,7 @@ def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -
         source_new_titles = {}
 
         for title, title_data in latest_source_titles.items():
-            if title not in historical_set:
+            if get_id(title) not in historical_set:
                 source_new_titles[title] = title_data
 
         if source_new_titles:
@@ -691,14 +2196,14 @@ def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -
 
 # === 統計和分析 ===
 def calculate_news_weight(
-    title_data: Dict, rank_threshold: int = CONFIG["RANK_THRESHOLD"]
+    title_data: ReportTitle, rank_threshold: int = CONFIG["RANK_THRESHOLD"]
 ) -> float:
     """計算新聞權重，用於排序"""
-    ranks = title_data.get("ranks", [])
+    ranks = title_data.ranks
     if not ranks:
         return 0.0
 
-    count = title_data.get("count", len(ranks))
+    count = title_data.count
     weight_config = CONFIG["WEIGHT_CONFIG"]
 
     # 排名權重：Σ(11 - min(rank, 10)) / 出現次數
@@ -729,41 +2234,39 @@ def calculate_news_weight(
 def matches_word_groups(
     title: str, word_groups: List[Dict], filter_words: List[str]
 ) -> bool:
-    """檢查標題是否匹配詞組規則"""
-    # 如果沒有配置詞組，則匹配所有標題（支持顯示全部新聞）
+    """檢查標題是否匹配詞組規則（未配置詞組時匹配所有標題）"""
+    return find_matched_group(title, word_groups, filter_words) is not None
+
+
+def find_matched_group(
+    title: str, word_groups: List[Dict], filter_words: List[str]
+) -> Optional[str]:
+    """返回標題匹配的第一個詞組的 group_key，未匹配或被過濾時返回 None"""
     if not word_groups:
-        return True
+        return "全部新聞"
 
     title_lower = title.lower()
 
-    # 過濾詞檢查
     if any(filter_word.lower() in title_lower for filter_word in filter_words):
-        return False
+        return None
 
-    # 詞組匹配檢查
     for group in word_groups:
         required_words = group["required"]
         normal_words = group["normal"]
 
-        # 必須詞檢查
-        if required_words:
-            all_required_present = all(
-                req_word.lower() in title_lower for req_word in required_words
-            )
-            if not all_required_present:
-                continue
+        if required_words and not all(
+            req_word.lower() in title_lower for req_word in required_words
+        ):
+            continue
 
-        # 普通詞檢查
-        if normal_words:
-            any_normal_present = any(
-                normal_word.lower() in title_lower for normal_word in normal_words
-            )
-            if not any_normal_present:
-                continue
+        if normal_words and not any(
+            normal_word.lower() in title_lower for normal_word in normal_words
+        ):
+            continue
 
-        return True
+        return group["group_key"]
 
-    return False
+    return None
 
 
 def format_time_display(first_time: str, last_time: str) -> str:
@@ -825,8 +2328,13 @@ def count_word_frequency(
     rank_threshold: int = CONFIG["RANK_THRESHOLD"],
     new_titles: Optional[Dict] = None,
     mode: str = "daily",
+    is_first_today: Optional[bool] = None,
+    title_dictionary: Optional[TitleDictionary] = None,
 ) -> Tuple[List[Dict], int]:
-    """統計詞頻，支持必須詞、頻率詞、過濾詞，並標記新增標題"""
+    """統計詞頻，支持必須詞、頻率詞、過濾詞，並標記新增標題
+
+    匹配結果按標題 ID 記憶，同一標題在多個平台出現時只匹配一次
+    """
 
     # 如果沒有配置詞組，創建一個包含所有新聞的虛擬詞組
     if not word_groups:
@@ -834,7 +2342,8 @@ def count_word_frequency(
         word_groups = [{"required": [], "normal": [], "group_key": "全部新聞"}]
         filter_words = []  # 清空過濾詞，顯示所有新聞
 
-    is_first_today = is_first_crawl_today()
+    if is_first_today is None:
+        is_first_today = is_first_crawl_today()
 
     # 確定處理的數據源和新增標記邏輯
     if mode == "incremental":
@@ -852,7 +2361,7 @@ def count_word_frequency(
             latest_time = None
             for source_titles in title_info.values():
                 for title_data in source_titles.values():
-                    last_time = title_data.get("last_time", "")
+                    last_time = title_data.last_time
                     if last_time:
                         if latest_time is None or last_time > latest_time:
                             latest_time = last_time
@@ -866,7 +2375,7 @@ def count_word_frequency(
                         for title, title_data in source_titles.items():
                             if title in title_info[source_id]:
                                 info = title_info[source_id][title]
-                                if info.get("last_time") == latest_time:
+                                if info.last_time == latest_time:
                                     filtered_titles[title] = title_data
                         if filtered_titles:
                             results_to_process[source_id] = filtered_titles
@@ -905,6 +2414,10 @@ def count_word_frequency(
         group_key = group["group_key"]
         word_stats[group_key] = {"count": 0, "titles": {}}
 
+    match_title = (title_dictionary or get_title_dictionary()).matcher(
+        word_groups, filter_words
+    )
+
     for source_id, titles_data in results_to_process.items():
         total_titles += len(titles_data)
 
@@ -915,12 +2428,9 @@ def count_word_frequency(
             if title in processed_titles.get(source_id, {}):
                 continue
 
-            # 使用統一的匹配邏輯
-            matches_frequency_words = matches_word_groups(
-                title, word_groups, filter_words
-            )
-
-            if not matches_frequency_words:
+            # 使用統一的匹配邏輯，找到第一個匹配的詞組
+            group_key = match_title(title)
+            if group_key is None:
                 continue
 
             # 如果是增量模式或 current 模式第一次，統計匹配的新增新聞數量
@@ -929,204 +2439,706 @@ def count_word_frequency(
             ):
                 matched_new_count += 1
 
-            source_ranks = title_data.get("ranks", [])
-            source_url = title_data.get("url", "")
-            source_mobile_url = title_data.get("mobileUrl", "")
-
-            # 找到匹配的詞組
-            title_lower = title.lower()
-            for group in word_groups:
-                required_words = group["required"]
-                normal_words = group["normal"]
-
-                # 如果是"全部新聞"模式，所有標題都匹配第一個（唯一的）詞組
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新聞":
-                    group_key = group["group_key"]
-                    word_stats[group_key]["count"] += 1
-                    if source_id not in word_stats[group_key]["titles"]:
-                        word_stats[group_key]["titles"][source_id] = []
-                else:
-                    # 原有的匹配邏輯
-                    if required_words:
-                        all_required_present = all(
-                            req_word.lower() in title_lower
-                            for req_word in required_words
-                        )
-                        if not all_required_present:
-                            continue
+            word_stats[group_key]["count"] += 1
+            if source_id not in word_stats[group_key]["titles"]:
+                word_stats[group_key]["titles"][source_id] = []
+
+            first_time = ""
+            last_time = ""
+            count_info = 1
+            ranks = title_data.ranks if title_data.ranks else []
+            current_rank = min(ranks) if ranks else None
+            url = title_data.url
+            mobile_url = title_data.mobile_url
+
+            # 從歷史統計信息中獲取完整數據
+            if title_info and source_id in title_info and title in title_info[source_id]:
+                info = title_info[source_id][title]
+                first_time = info.first_time
+                last_time = info.last_time
+                count_info = info.count
+                current_rank = info.last_rank
+                if info.ranks:
+                    ranks = info.ranks
+                url = info.url
+                mobile_url = info.mobile_url
+
+            if not ranks:
+                ranks = [99]
+
+            time_display = format_time_display(first_time, last_time)
+
+            source_name = id_to_name.get(source_id, source_id)
+
+            # 判斷是否為新增
+            is_new = False
+            if all_news_are_new:
+                # 增量模式下所有處理的新聞都是新增，或者當天第一次的所有新聞都是新增
+                is_new = True
+            elif new_titles and source_id in new_titles:
+                # 檢查是否在新增列表中
+                new_titles_for_source = new_titles[source_id]
+                is_new = title in new_titles_for_source
+
+            word_stats[group_key]["titles"][source_id].append(
+                ReportTitle(
+                    title,
+                    source_name,
+                    ranks,
+                    rank_threshold,
+                    url=url,
+                    mobile_url=mobile_url,
+                    first_time=first_time,
+                    last_time=last_time,
+                    time_display=time_display,
+                    count=count_info,
+                    is_new=is_new,
+                    current_rank=current_rank,
+                )
+            )
 
-                    if normal_words:
-                        any_normal_present = any(
-                            normal_word.lower() in title_lower
-                            for normal_word in normal_words
-                        )
-                        if not any_normal_present:
-                            continue
+            processed_titles[source_id][title] = True
 
-                    group_key = group["group_key"]
-                    word_stats[group_key]["count"] += 1
-                    if source_id not in word_stats[group_key]["titles"]:
-                        word_stats[group_key]["titles"][source_id] = []
+    # 最後統一打印匯總信息
+    if mode == "incremental":
+        if is_first_today:
+            total_input_news = sum(len(titles) for titles in results.values())
+            filter_status = (
+                "全部顯示"
+                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新聞"
+                else "頻率詞匹配"
+            )
+            print(
+                f"增量模式：當天第一次爬取，{total_input_news} 條新聞中有 {matched_new_count} 條{filter_status}"
+            )
+        else:
+            if new_titles:
+                total_new_count = sum(len(titles) for titles in new_titles.values())
+                filter_status = (
+                    "全部顯示"
+                    if len(word_groups) == 1
+                    and word_groups[0]["group_key"] == "全部新聞"
+                    else "匹配頻率詞"
+                )
+                print(
+                    f"增量模式：{total_new_count} 條新增新聞中，有 {matched_new_count} 條{filter_status}"
+                )
+                if matched_new_count == 0 and len(word_groups) > 1:
+                    print("增量模式：沒有新增新聞匹配頻率詞，將不會發送通知")
+            else:
+                print("增量模式：未檢測到新增新聞")
+    elif mode == "current":
+        total_input_news = sum(len(titles) for titles in results_to_process.values())
+        if is_first_today:
+            filter_status = (
+                "全部顯示"
+                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新聞"
+                else "頻率詞匹配"
+            )
+            print(
+                f"當前榜單模式：當天第一次爬取，{total_input_news} 條當前榜單新聞中有 {matched_new_count} 條{filter_status}"
+            )
+        else:
+            matched_count = sum(stat["count"] for stat in word_stats.values())
+            filter_status = (
+                "全部顯示"
+                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新聞"
+                else "頻率詞匹配"
+            )
+            print(
+                f"當前榜單模式：{total_input_news} 條當前榜單新聞中有 {matched_count} 條{filter_status}"
+            )
+
+    stats = []
+    for group_key, data in word_stats.items():
+        all_titles = []
+        for source_id, title_list in data["titles"].items():
+            all_titles.extend(title_list)
 
-                first_time = ""
-                last_time = ""
-                count_info = 1
-                ranks = source_ranks if source_ranks else []
-                url = source_url
-                mobile_url = source_mobile_url
+        # 按權重排序
+        sorted_titles = sorted(
+            all_titles,
+            key=lambda x: (
+                -calculate_news_weight(x, rank_threshold),
+                min(x.ranks) if x.ranks else 999,
+                -x.count,
+            ),
+        )
 
-                # 對於 current 模式，從歷史統計信息中獲取完整數據
-                if (
-                    mode == "current"
-                    and title_info
-                    and source_id in title_info
-                    and title in title_info[source_id]
-                ):
-                    info = title_info[source_id][title]
-                    first_time = info.get("first_time", "")
-                    last_time = info.get("last_time", "")
-                    count_info = info.get("count", 1)
-                    if "ranks" in info and info["ranks"]:
-                        ranks = info["ranks"]
-                    url = info.get("url", source_url)
-                    mobile_url = info.get("mobileUrl", source_mobile_url)
-                elif (
-                    title_info
-                    and source_id in title_info
-                    and title in title_info[source_id]
-                ):
-                    info = title_info[source_id][title]
-                    first_time = info.get("first_time", "")
-                    last_time = info.get("last_time", "")
-                    count_info = info.get("count", 1)
-                    if "ranks" in info and info["ranks"]:
-                        ranks = info["ranks"]
-                    url = info.get("url", source_url)
-                    mobile_url = info.get("mobileUrl", source_mobile_url)
+        stats.append(
+            {
+                "word": group_key,
+                "count": data["count"],
+                "titles": sorted_titles,
+                "percentage": (
+                    round(data["count"] / total_titles * 100, 2)
+                    if total_titles > 0
+                    else 0
+                ),
+            }
+        )
+
+    stats.sort(key=lambda x: x["count"], reverse=True)
+    return stats, total_titles
+
+
+# === 關鍵詞時間序列索引 ===
+KEYWORD_SERIES_FILE = "keyword_series.json"
+
+
+def snapshot_hour_bucket(date_folder: str, time_info: str) -> str:
+    """快照所屬的小時桶，如 2025-08-08 14"""
+    return f"{date_folder_to_iso(date_folder)} {time_info[:2]}"
+
+
+def load_keyword_series_index(output_root: str = "output") -> Dict:
+    """加載關鍵詞時間序列索引"""
+    index_path = get_state_path(KEYWORD_SERIES_FILE, output_root)
+    if index_path.exists():
+        try:
+            index = read_json_file(index_path)
+            pending = index.get("pending", {})
+            for platforms in pending.get("titles", {}).values():
+                for source_id, titles in platforms.items():
+                    platforms[source_id] = set(titles)
+            return index
+        except Exception as e:
+            print(f"關鍵詞索引讀取失敗，將重新建立: {e}")
+
+    return {"version": 1, "groups": {}, "buckets": {}, "indexed": {}, "pending": {}}
+
+
+def save_keyword_series_index(index: Dict, output_root: str = "output") -> None:
+    """保存關鍵詞時間序列索引"""
+    pending = index.get("pending", {})
+    serializable = dict(index)
+    serializable["pending"] = {
+        "bucket": pending.get("bucket", ""),
+        "titles": {
+            group_key: {
+                source_id: sorted(titles) for source_id, titles in platforms.items()
+            }
+            for group_key, platforms in pending.get("titles", {}).items()
+        },
+    }
+
+    index_path = get_state_path(KEYWORD_SERIES_FILE, output_root)
+    write_json_file(index_path, serializable)
+
+
+def index_snapshot_keywords(
+    index: Dict,
+    date_folder: str,
+    time_info: str,
+    titles_by_id: Dict,
+    word_groups: List[Dict],
+    filter_words: List[str],
+    seen: Dict,
+    title_dictionary: Optional[TitleDictionary] = None,
+) -> int:
+    """把一個快照的匹配結果累加到小時桶，同一小時內同一平台的同一標題只計一次"""
+    bucket = snapshot_hour_bucket(date_folder, time_info)
+    if seen.get("bucket") != bucket:
+        seen["bucket"] = bucket
+        seen["titles"] = {}
+
+    if word_groups:
+        for group in word_groups:
+            index["groups"][group["group_key"]] = group["required"] + group["normal"]
+    else:
+        index["groups"]["全部新聞"] = []
+
+    bucket_counts = index["buckets"].setdefault(bucket, {})
+    added_count = 0
+
+    match_title = (title_dictionary or get_title_dictionary(date_folder)).matcher(
+        word_groups, filter_words
+    )
+
+    for source_id, titles in titles_by_id.items():
+        for title in titles:
+            title = clean_title(title)
+            group_key = match_title(title)
+            if group_key is None:
+                continue
+
+            seen_titles = seen["titles"].setdefault(group_key, {}).setdefault(
+                source_id, set()
+            )
+            if title in seen_titles:
+                continue
+            seen_titles.add(title)
+
+            platform_counts = bucket_counts.setdefault(group_key, {})
+            platform_counts[source_id] = platform_counts.get(source_id, 0) + 1
+            added_count += 1
+
+    if not bucket_counts:
+        del index["buckets"][bucket]
+
+    indexed_times = index["indexed"].setdefault(date_folder, [])
+    if time_info not in indexed_times:
+        indexed_times.append(time_info)
+
+    return added_count
+
+
+def update_keyword_series_index(
+    titles_by_id: Dict,
+    time_info: str,
+    word_groups: List[Dict],
+    filter_words: List[str],
+    date_folder: Optional[str] = None,
+    output_root: str = "output",
+) -> int:
+    """用本次抓取的快照增量更新關鍵詞索引"""
+    date_folder = date_folder or format_date_folder()
+    index = load_keyword_series_index(output_root)
+
+    if time_info in index["indexed"].get(date_folder, []):
+        return 0
+
+    added_count = index_snapshot_keywords(
+        index,
+        date_folder,
+        time_info,
+        titles_by_id,
+        word_groups,
+        filter_words,
+        index["pending"],
+        get_title_dictionary(date_folder, output_root),
+    )
+    save_keyword_series_index(index, output_root)
+    return added_count
+
+
+def backfill_keyword_series_index(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    rebuild: bool = False,
+    output_root: str = "output",
+) -> int:
+    """從歷史快照回填關鍵詞索引，已完整索引的日期會被跳過"""
+    word_groups, filter_words = load_frequency_words()
+    index = load_keyword_series_index(output_root)
+    if rebuild:
+        index = {"version": 1, "groups": {}, "buckets": {}, "indexed": {}, "pending": {}}
+
+    today_folder = format_date_folder()
+    indexed_days = 0
+
+    for date_folder in list_date_folders(start_date, end_date, output_root):
+        files = list_snapshot_files(date_folder, output_root)
+        if not files:
+            continue
+
+        indexed_times = set(index["indexed"].get(date_folder, []))
+        if all(f.stem in indexed_times for f in files):
+            continue
+
+        # 按天重建，避免同一小時內的標題被重複計數
+        day_prefix = date_folder_to_iso(date_folder) + " "
+        for bucket in [b for b in index["buckets"] if b.startswith(day_prefix)]:
+            del index["buckets"][bucket]
+        index["indexed"][date_folder] = []
+
+        seen = {}
+        title_dictionary = get_title_dictionary(date_folder, output_root)
+        for file_path in files:
+            titles_by_id, _ = parse_file_titles(file_path)
+            index_snapshot_keywords(
+                index,
+                date_folder,
+                file_path.stem,
+                titles_by_id,
+                word_groups,
+                filter_words,
+                seen,
+                title_dictionary,
+            )
+        # 歷史日期只在內存中使用字典，不往只讀的歷史目錄寫緩存文件
+        if date_folder == today_folder:
+            title_dictionary.save()
+
+        if date_folder == today_folder:
+            index["pending"] = seen
+        indexed_days += 1
+
+    save_keyword_series_index(index, output_root)
+    print(f"關鍵詞索引回填完成，處理 {indexed_days} 天")
+    return indexed_days
+
+
+def resolve_series_groups(index: Dict, word: str) -> List[str]:
+    """把查詢詞解析為索引中的詞組：完全匹配詞組名或組內某個詞，否則按子串匹配"""
+    word_lower = word.strip().lower()
+    groups = index.get("groups", {})
+
+    matched = [
+        group_key
+        for group_key, words in groups.items()
+        if group_key.lower() == word_lower
+        or any(w.lower() == word_lower for w in words)
+    ]
+    if not matched:
+        matched = [group_key for group_key in groups if word_lower in group_key.lower()]
+    return matched
+
+
+def query_keyword_series(
+    index: Dict,
+    word: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    platforms: Optional[List[str]] = None,
+    granularity: str = "hour",
+) -> List[Dict]:
+    """查詢詞組在時間段內每小時（或每天）各平台的匹配標題數
+
+    日期參數為 YYYY-MM-DD；按天匯總時為各小時計數之和
+    """
+    group_keys = resolve_series_groups(index, word)
+    counts = {}
+
+    for bucket, groups in index.get("buckets", {}).items():
+        bucket_date = bucket[:10]
+        if (start and bucket_date < start) or (end and bucket_date > end):
+            continue
+
+        time_key = bucket if granularity == "hour" else bucket_date
+        for group_key in group_keys:
+            for source_id, count in groups.get(group_key, {}).items():
+                if platforms and source_id not in platforms:
+                    continue
+                key = (time_key, group_key, source_id)
+                counts[key] = counts.get(key, 0) + count
+
+    return [
+        {"time": time_key, "group": group_key, "platform": source_id, "count": count}
+        for (time_key, group_key, source_id), count in sorted(counts.items())
+    ]
+
+
+def export_keyword_series(rows: List[Dict], export_format: str = "csv") -> str:
+    """導出查詢結果為 CSV 或 JSON 文本"""
+    if export_format == "json":
+        return json_dumps(rows, indent=True).decode("utf-8")
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer, fieldnames=["time", "group", "platform", "count"], lineterminator="\n"
+    )
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+# === 標題全文搜索索引 ===
+SEARCH_INDEX_FILE = "search_index.db"
+CJK_PATTERN = re.compile(r"[㐀-鿿豈-﫿]+")
+LATIN_WORD_PATTERN = re.compile(r"[0-9a-z]+")
+
+
+def tokenize_title(text: str) -> List[str]:
+    """分詞：中日韓字符取二元組（單字時取單字），拉丁文字按單詞切分並轉小寫"""
+    text = text.lower()
+    tokens = set()
+
+    for run in CJK_PATTERN.findall(text):
+        if len(run) == 1:
+            tokens.add(run)
+        else:
+            for i in range(len(run) - 1):
+                tokens.add(run[i : i + 2])
+
+    for word in LATIN_WORD_PATTERN.findall(CJK_PATTERN.sub(" ", text)):
+        tokens.add(word)
+
+    return sorted(tokens)
+
+
+def snapshot_timestamp(date_folder: str, time_info: str) -> str:
+    """快照時間轉換為可排序的 YYYY-MM-DD HH:MM"""
+    return f"{date_folder_to_iso(date_folder)} {time_info[:2]}:{time_info[3:5]}"
+
+
+def open_search_index(
+    output_root: str = "output", read_only: bool = False
+) -> sqlite3.Connection:
+    """打開（必要時創建）搜索索引數據庫；只讀模式下不創建，索引不存在時拋出 FileNotFoundError"""
+    index_path = get_state_path(SEARCH_INDEX_FILE, output_root)
+    if read_only:
+        if not index_path.exists():
+            raise FileNotFoundError(f"搜索索引不存在: {index_path}")
+        return sqlite3.connect(index_path.resolve().as_uri() + "?mode=ro", uri=True)
+
+    conn = sqlite3.connect(str(index_path))
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS titles (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS sightings (
+            title_id INTEGER NOT NULL,
+            platform TEXT NOT NULL,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL,
+            best_rank INTEGER NOT NULL,
+            url TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (title_id, platform)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS postings (
+            token TEXT NOT NULL,
+            title_id INTEGER NOT NULL,
+            PRIMARY KEY (token, title_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS platforms (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS indexed_snapshots (
+            date_folder TEXT NOT NULL,
+            time_info TEXT NOT NULL,
+            PRIMARY KEY (date_folder, time_info)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_sightings_last_seen ON sightings (last_seen);
+        """
+    )
+    return conn
+
+
+def index_snapshot_titles(
+    conn: sqlite3.Connection,
+    date_folder: str,
+    time_info: str,
+    titles_by_id: Dict,
+    id_to_name: Optional[Dict] = None,
+) -> int:
+    """把一個快照寫入搜索索引，返回新收錄的標題數；已索引的快照直接跳過"""
+    cursor = conn.execute(
+        "INSERT OR IGNORE INTO indexed_snapshots (date_folder, time_info) VALUES (?, ?)",
+        (date_folder, time_info),
+    )
+    if cursor.rowcount == 0:
+        return 0
 
-                if not ranks:
-                    ranks = [99]
+    seen_at = snapshot_timestamp(date_folder, time_info)
+    new_count = 0
 
-                time_display = format_time_display(first_time, last_time)
+    for source_id, name in (id_to_name or {}).items():
+        conn.execute(
+            "INSERT OR REPLACE INTO platforms (id, name) VALUES (?, ?)",
+            (source_id, name),
+        )
 
-                source_name = id_to_name.get(source_id, source_id)
+    for source_id, titles in titles_by_id.items():
+        for title, record in titles.items():
+            title = clean_title(title)
+            if not title:
+                continue
 
-                # 判斷是否為新增
-                is_new = False
-                if all_news_are_new:
-                    # 增量模式下所有處理的新聞都是新增，或者當天第一次的所有新聞都是新增
-                    is_new = True
-                elif new_titles and source_id in new_titles:
-                    # 檢查是否在新增列表中
-                    new_titles_for_source = new_titles[source_id]
-                    is_new = title in new_titles_for_source
-
-                word_stats[group_key]["titles"][source_id].append(
-                    {
-                        "title": title,
-                        "source_name": source_name,
-                        "first_time": first_time,
-                        "last_time": last_time,
-                        "time_display": time_display,
-                        "count": count_info,
-                        "ranks": ranks,
-                        "rank_threshold": rank_threshold,
-                        "url": url,
-                        "mobileUrl": mobile_url,
-                        "is_new": is_new,
-                    }
+            row = conn.execute(
+                "SELECT id FROM titles WHERE title = ?", (title,)
+            ).fetchone()
+            if row:
+                title_id = row[0]
+            else:
+                title_id = conn.execute(
+                    "INSERT INTO titles (title) VALUES (?)", (title,)
+                ).lastrowid
+                conn.executemany(
+                    "INSERT OR IGNORE INTO postings (token, title_id) VALUES (?, ?)",
+                    [(token, title_id) for token in tokenize_title(title)],
                 )
+                new_count += 1
+
+            best_rank = min(record.ranks) if record.ranks else 99
+            conn.execute(
+                """
+                INSERT INTO sightings (title_id, platform, first_seen, last_seen, best_rank, url)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (title_id, platform) DO UPDATE SET
+                    first_seen = MIN(first_seen, excluded.first_seen),
+                    last_seen = MAX(last_seen, excluded.last_seen),
+                    best_rank = MIN(best_rank, excluded.best_rank),
+                    url = CASE WHEN url = '' THEN excluded.url ELSE url END
+                """,
+                (
+                    title_id,
+                    source_id,
+                    seen_at,
+                    seen_at,
+                    best_rank,
+                    record.mobile_url or record.url,
+                ),
+            )
 
-                if source_id not in processed_titles:
-                    processed_titles[source_id] = {}
-                processed_titles[source_id][title] = True
+    return new_count
 
-                break
 
-    # 最後統一打印匯總信息
-    if mode == "incremental":
-        if is_first_today:
-            total_input_news = sum(len(titles) for titles in results.values())
-            filter_status = (
-                "全部顯示"
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新聞"
-                else "頻率詞匹配"
-            )
-            print(
-                f"增量模式：當天第一次爬取，{total_input_news} 條新聞中有 {matched_new_count} 條{filter_status}"
+def update_search_index(
+    titles_by_id: Dict,
+    id_to_name: Dict,
+    time_info: str,
+    date_folder: Optional[str] = None,
+    output_root: str = "output",
+) -> int:
+    """用本次抓取的快照增量更新搜索索引"""
+    date_folder = date_folder or format_date_folder()
+    conn = open_search_index(output_root)
+    try:
+        with conn:
+            return index_snapshot_titles(
+                conn, date_folder, time_info, titles_by_id, id_to_name
             )
-        else:
-            if new_titles:
-                total_new_count = sum(len(titles) for titles in new_titles.values())
-                filter_status = (
-                    "全部顯示"
-                    if len(word_groups) == 1
-                    and word_groups[0]["group_key"] == "全部新聞"
-                    else "匹配頻率詞"
-                )
-                print(
-                    f"增量模式：{total_new_count} 條新增新聞中，有 {matched_new_count} 條{filter_status}"
+    finally:
+        conn.close()
+
+
+def backfill_search_index(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    output_root: str = "output",
+) -> int:
+    """從歷史快照回填搜索索引，已索引的快照會被跳過"""
+    conn = open_search_index(output_root)
+    new_count = 0
+    try:
+        for date_folder in list_date_folders(start_date, end_date, output_root):
+            indexed_times = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT time_info FROM indexed_snapshots WHERE date_folder = ?",
+                    (date_folder,),
                 )
-                if matched_new_count == 0 and len(word_groups) > 1:
-                    print("增量模式：沒有新增新聞匹配頻率詞，將不會發送通知")
-            else:
-                print("增量模式：未檢測到新增新聞")
-    elif mode == "current":
-        total_input_news = sum(len(titles) for titles in results_to_process.values())
-        if is_first_today:
-            filter_status = (
-                "全部顯示"
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新聞"
-                else "頻率詞匹配"
-            )
-            print(
-                f"當前榜單模式：當天第一次爬取，{total_input_news} 條當前榜單新聞中有 {matched_new_count} 條{filter_status}"
-            )
+            }
+            with conn:
+                for file_path in list_snapshot_files(date_folder, output_root):
+                    if file_path.stem in indexed_times:
+                        continue
+                    titles_by_id, id_to_name = parse_file_titles(file_path)
+                    new_count += index_snapshot_titles(
+                        conn, date_folder, file_path.stem, titles_by_id, id_to_name
+                    )
+    finally:
+        conn.close()
+
+    if new_count:
+        print(f"搜索索引回填完成，新收錄 {new_count} 條標題")
+    return new_count
+
+
+def search_titles(
+    query: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    platforms: Optional[List[str]] = None,
+    limit: int = 50,
+    output_root: str = "output",
+    read_only: bool = False,
+) -> List[Dict]:
+    """搜索歷史標題，返回標題、出現平台、首次/最後出現時間和最高排名
+
+    日期參數為 YYYY-MM-DD，按標題最後出現時間過濾
+    """
+    tokens = tokenize_title(query)
+    terms = [term for term in query.lower().split() if term]
+    if not tokens or not terms:
+        return []
+
+    # 單個漢字在標題中通常屬於更長的字串，只被索引為二元組，不能用倒排表查找
+    single_chars = [
+        token for token in tokens if len(token) == 1 and CJK_PATTERN.fullmatch(token)
+    ]
+    tokens = [token for token in tokens if token not in single_chars]
+
+    conn = open_search_index(output_root, read_only)
+    try:
+        if tokens:
+            placeholders = ",".join("?" * len(tokens))
+            candidate_rows = conn.execute(
+                f"""
+                SELECT t.id, t.title FROM titles t
+                JOIN (
+                    SELECT title_id FROM postings WHERE token IN ({placeholders})
+                    GROUP BY title_id HAVING COUNT(*) = ?
+                ) p ON p.title_id = t.id
+                """,
+                (*tokens, len(tokens)),
+            ).fetchall()
         else:
-            matched_count = sum(stat["count"] for stat in word_stats.values())
-            filter_status = (
-                "全部顯示"
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新聞"
-                else "頻率詞匹配"
-            )
-            print(
-                f"當前榜單模式：{total_input_news} 條當前榜單新聞中有 {matched_count} 條{filter_status}"
-            )
-
-    stats = []
-    for group_key, data in word_stats.items():
-        all_titles = []
-        for source_id, title_list in data["titles"].items():
-            all_titles.extend(title_list)
+            # 只有單字時退化為掃描標題表
+            candidate_rows = conn.execute(
+                "SELECT id, title FROM titles WHERE instr(title, ?) > 0",
+                (single_chars[0],),
+            ).fetchall()
+
+        # 二元組只保證字符相鄰對都出現，再用原始查詢詞確認
+        matched = {
+            title_id: title
+            for title_id, title in candidate_rows
+            if all(term in title.lower() for term in terms)
+        }
+        if not matched:
+            return []
 
-        # 按權重排序
-        sorted_titles = sorted(
-            all_titles,
-            key=lambda x: (
-                -calculate_news_weight(x, rank_threshold),
-                min(x["ranks"]) if x["ranks"] else 999,
-                -x["count"],
-            ),
-        )
+        platform_names = dict(conn.execute("SELECT id, name FROM platforms"))
 
-        stats.append(
-            {
-                "word": group_key,
-                "count": data["count"],
-                "titles": sorted_titles,
-                "percentage": (
-                    round(data["count"] / total_titles * 100, 2)
-                    if total_titles > 0
-                    else 0
-                ),
-            }
-        )
+        results = {}
+        id_placeholders = ",".join("?" * len(matched))
+        for title_id, platform, first_seen, last_seen, best_rank, url in conn.execute(
+            f"""
+            SELECT title_id, platform, first_seen, last_seen, best_rank, url
+            FROM sightings WHERE title_id IN ({id_placeholders})
+            """,
+            tuple(matched),
+        ):
+            if platforms and platform not in platforms:
+                continue
 
-    stats.sort(key=lambda x: x["count"], reverse=True)
-    return stats, total_titles
+            entry = results.setdefault(
+                title_id,
+                {
+                    "title": matched[title_id],
+                    "platforms": [],
+                    "first_seen": first_seen,
+                    "last_seen": last_seen,
+                    "best_rank": best_rank,
+                    "url": url,
+                },
+            )
+            entry["platforms"].append(
+                {
+                    "id": platform,
+                    "name": platform_names.get(platform, platform),
+                    "first_seen": first_seen,
+                    "last_seen": last_seen,
+                    "best_rank": best_rank,
+                }
+            )
+            entry["first_seen"] = min(entry["first_seen"], first_seen)
+            entry["last_seen"] = max(entry["last_seen"], last_seen)
+            if best_rank < entry["best_rank"]:
+                entry["best_rank"] = best_rank
+                entry["url"] = url or entry["url"]
+    finally:
+        conn.close()
+
+    filtered = [
+        entry
+        for entry in results.values()
+        if (not start or entry["last_seen"][:10] >= start)
+        and (not end or entry["first_seen"][:10] <= end)
+    ]
+    filtered.sort(key=lambda x: (x["last_seen"], -x["best_rank"]), reverse=True)
+    return filtered[:limit]
 
 
 # === 報告生成 ===
+REPORT_DATA_CACHE = {}
+
+
 def prepare_report_data(
     stats: List[Dict],
     failed_ids: Optional[List] = None,
@@ -1134,7 +3146,19 @@ def prepare_report_data(
     id_to_name: Optional[Dict] = None,
     mode: str = "daily",
 ) -> Dict:
-    """準備報告數據"""
+    """準備報告數據，同一批統計結果重複調用時（HTML 與推送）直接返回上次結果"""
+    cached = REPORT_DATA_CACHE.get("last")
+    if (
+        cached
+        and cached["stats"] is stats
+        and cached["new_titles"] is new_titles
+        and cached["id_to_name"] == id_to_name
+        and cached["failed_ids"] == (failed_ids or [])
+        and cached["mode"] == mode
+        and cached["word_groups"] is load_frequency_words()[0]
+    ):
+        return cached["report_data"]
+
     processed_new_titles = []
 
     # 在增量模式下隱藏新增新聞區域
@@ -1159,22 +3183,20 @@ def prepare_report_data(
                 source_titles = []
 
                 for title, title_data in titles_data.items():
-                    url = title_data.get("url", "")
-                    mobile_url = title_data.get("mobileUrl", "")
-                    ranks = title_data.get("ranks", [])
-
-                    processed_title = {
-                        "title": title,
-                        "source_name": source_name,
-                        "time_display": "",
-                        "count": 1,
-                        "ranks": ranks,
-                        "rank_threshold": CONFIG["RANK_THRESHOLD"],
-                        "url": url,
-                        "mobile_url": mobile_url,
-                        "is_new": True,
-                    }
-                    source_titles.append(processed_title)
+                    source_titles.append(
+                        ReportTitle(
+                            title,
+                            source_name,
+                            title_data.ranks,
+                            CONFIG["RANK_THRESHOLD"],
+                            url=title_data.url,
+                            mobile_url=title_data.mobile_url,
+                            is_new=True,
+                            current_rank=min(title_data.ranks)
+                            if title_data.ranks
+                            else None,
+                        )
+                    )
 
                 if source_titles:
                     processed_new_titles.append(
@@ -1190,31 +3212,16 @@ def prepare_report_data(
         if stat["count"] <= 0:
             continue
 
-        processed_titles = []
-        for title_data in stat["titles"]:
-            processed_title = {
-                "title": title_data["title"],
-                "source_name": title_data["source_name"],
-                "time_display": title_data["time_display"],
-                "count": title_data["count"],
-                "ranks": title_data["ranks"],
-                "rank_threshold": title_data["rank_threshold"],
-                "url": title_data.get("url", ""),
-                "mobile_url": title_data.get("mobileUrl", ""),
-                "is_new": title_data.get("is_new", False),
-            }
-            processed_titles.append(processed_title)
-
         processed_stats.append(
             {
                 "word": stat["word"],
                 "count": stat["count"],
                 "percentage": stat.get("percentage", 0),
-                "titles": processed_titles,
+                "titles": stat["titles"],
             }
         )
 
-    return {
+    report_data = {
         "stats": processed_stats,
         "new_titles": processed_new_titles,
         "failed_ids": failed_ids or [],
@@ -1223,18 +3230,53 @@ def prepare_report_data(
         ),
     }
 
+    REPORT_DATA_CACHE["last"] = {
+        "stats": stats,
+        "new_titles": new_titles,
+        "id_to_name": id_to_name,
+        "failed_ids": failed_ids or [],
+        "mode": mode,
+        "word_groups": load_frequency_words()[0],
+        "report_data": report_data,
+    }
+    return report_data
+
+
+FORMATTED_TITLE_CACHE = {}
+FORMATTED_TITLE_CACHE_LIMIT = 20000
+
 
 def format_title_for_platform(
-    platform: str, title_data: Dict, show_source: bool = True
+    platform: str, title_data: ReportTitle, show_source: bool = True
+) -> str:
+    """統一的標題格式化方法，同一標題同一格式只格式化一次"""
+    cache_key = (
+        platform,
+        show_source,
+        title_data.is_new,
+        html_fragment_key(title_data),
+    )
+    formatted = FORMATTED_TITLE_CACHE.get(cache_key)
+    if formatted is None:
+        if len(FORMATTED_TITLE_CACHE) >= FORMATTED_TITLE_CACHE_LIMIT:
+            FORMATTED_TITLE_CACHE.clear()
+        formatted = FORMATTED_TITLE_CACHE[cache_key] = build_title_for_platform(
+            platform, title_data, show_source
+        )
+    return formatted
+
+
+def build_title_for_platform(
+    platform: str, title_data: ReportTitle, show_source: bool = True
 ) -> str:
-    """統一的標題格式化方法"""
+    """按平台格式化單條標題"""
     rank_display = format_rank_display(
-        title_data["ranks"], title_data["rank_threshold"], platform
+        title_data.ranks, title_data.rank_threshold, platform
     )
 
-    link_url = title_data["mobile_url"] or title_data["url"]
+    link_url = title_data.mobile_url or title_data.url
 
-    cleaned_title = clean_title(title_data["title"])
+    cleaned_title = clean_title(title_data.title)
 
     if platform == "feishu":
         if link_url:
@@ -1242,19 +3284,19 @@ def format_title_for_platform(
         else:
             formatted_title = cleaned_title
 
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
+        title_prefix = "🆕 " if title_data.is_new else ""
 
         if show_source:
-            result = f"<font color='grey'>[{title_data['source_name']}]</font> {title_prefix}{formatted_title}"
+            result = f"<font color='grey'>[{title_data.source_name}]</font> {title_prefix}{formatted_title}"
         else:
             result = f"{title_prefix}{formatted_title}"
 
         if rank_display:
             result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" <font color='grey'>- {title_data['time_display']}</font>"
-        if title_data["count"] > 1:
-            result += f" <font color='green'>({title_data['count']}次)</font>"
+        if title_data.time_display:
+            result += f" <font color='grey'>- {title_data.time_display}</font>"
+        if title_data.count > 1:
+            result += f" <font color='green'>({title_data.count}次)</font>"
 
         return result
 
@@ -1264,19 +3306,19 @@ def format_title_for_platform(
         else:
             formatted_title = cleaned_title
 
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
+        title_prefix = "🆕 " if title_data.is_new else ""
 
         if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
+            result = f"[{title_data.source_name}] {title_prefix}{formatted_title}"
         else:
             result = f"{title_prefix}{formatted_title}"
 
         if rank_display:
             result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" - {title_data['time_display']}"
-        if title_data["count"] > 1:
-            result += f" ({title_data['count']}次)"
+        if title_data.time_display:
+            result += f" - {title_data.time_display}"
+        if title_data.count > 1:
+            result += f" ({title_data.count}次)"
 
         return result
 
@@ -1286,19 +3328,19 @@ def format_title_for_platform(
         else:
             formatted_title = cleaned_title
 
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
+        title_prefix = "🆕 " if title_data.is_new else ""
 
         if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
+            result = f"[{title_data.source_name}] {title_prefix}{formatted_title}"
         else:
             result = f"{title_prefix}{formatted_title}"
 
         if rank_display:
             result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" - {title_data['time_display']}"
-        if title_data["count"] > 1:
-            result += f" ({title_data['count']}次)"
+        if title_data.time_display:
+            result += f" - {title_data.time_display}"
+        if title_data.count > 1:
+            result += f" ({title_data.count}次)"
 
         return result
 
@@ -1308,31 +3350,31 @@ def format_title_for_platform(
         else:
             formatted_title = cleaned_title
 
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
+        title_prefix = "🆕 " if title_data.is_new else ""
 
         if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
+            result = f"[{title_data.source_name}] {title_prefix}{formatted_title}"
         else:
             result = f"{title_prefix}{formatted_title}"
 
         if rank_display:
             result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" <code>- {title_data['time_display']}</code>"
-        if title_data["count"] > 1:
-            result += f" <code>({title_data['count']}次)</code>"
+        if title_data.time_display:
+            result += f" <code>- {title_data.time_display}</code>"
+        if title_data.count > 1:
+            result += f" <code>({title_data.count}次)</code>"
 
         return result
 
     elif platform == "html":
         rank_display = format_rank_display(
-            title_data["ranks"], title_data["rank_threshold"], "html"
+            title_data.ranks, title_data.rank_threshold, "html"
         )
 
-        link_url = title_data["mobile_url"] or title_data["url"]
+        link_url = title_data.mobile_url or title_data.url
 
         escaped_title = html_escape(cleaned_title)
-        escaped_source_name = html_escape(title_data["source_name"])
+        escaped_source_name = html_escape(title_data.source_name)
 
         if link_url:
             escaped_url = html_escape(link_url)
@@ -1344,13 +3386,13 @@ def format_title_for_platform(
 
         if rank_display:
             formatted_title += f" {rank_display}"
-        if title_data["time_display"]:
-            escaped_time = html_escape(title_data["time_display"])
+        if title_data.time_display:
+            escaped_time = html_escape(title_data.time_display)
             formatted_title += f" <font color='grey'>- {escaped_time}</font>"
-        if title_data["count"] > 1:
-            formatted_title += f" <font color='green'>({title_data['count']}次)</font>"
+        if title_data.count > 1:
+            formatted_title += f" <font color='green'>({title_data.count}次)</font>"
 
-        if title_data.get("is_new"):
+        if title_data.is_new:
             formatted_title = f"<div class='new-title'>🆕 {formatted_title}</div>"
 
         return formatted_title
@@ -1359,6 +3401,63 @@ def format_title_for_platform(
         return cleaned_title
 
 
+REPORT_LEDGER_FILE = "report_ledger.json"
+
+
+def get_report_data_fingerprint(report_data: Dict) -> str:
+    """報告數據的內容指紋，首次計算後保存在 report_data 中"""
+    fingerprint = report_data.get("fingerprint")
+    if fingerprint is None:
+        payload = json.dumps(
+            report_data,
+            ensure_ascii=False,
+            sort_keys=True,
+            default=lambda obj: obj.to_dict(),
+        )
+        fingerprint = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        report_data["fingerprint"] = fingerprint
+    return fingerprint
+
+
+def compute_report_fingerprint(
+    report_data: Dict,
+    total_titles: int,
+    mode: str,
+    is_daily_summary: bool,
+    file_suffix: str = ".html",
+) -> str:
+    """計算報告內容指紋（不含生成時間），內容不變則指紋不變"""
+    payload = json.dumps(
+        [
+            VERSION,
+            file_suffix,
+            mode,
+            is_daily_summary,
+            total_titles,
+            get_report_data_fingerprint(report_data),
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def load_report_ledger(output_root: str = "output") -> Dict:
+    """加載報告指紋記錄"""
+    ledger_path = get_state_path(REPORT_LEDGER_FILE, output_root)
+    if ledger_path.exists():
+        try:
+            return read_json_file(ledger_path)
+        except Exception as e:
+            print(f"報告指紋記錄讀取失敗，將重新建立: {e}")
+    return {"reports": {}}
+
+
+def save_report_ledger(ledger: Dict, output_root: str = "output") -> None:
+    """保存報告指紋記錄"""
+    ledger_path = get_state_path(REPORT_LEDGER_FILE, output_root)
+    write_json_file(ledger_path, ledger, indent=True)
+
+
 def generate_html_report(
     stats: List[Dict],
     total_titles: int,
@@ -1367,45 +3466,238 @@ def generate_html_report(
     id_to_name: Optional[Dict] = None,
     mode: str = "daily",
     is_daily_summary: bool = False,
+    date_folder: Optional[str] = None,
+    output_root: str = "output",
+    update_index: bool = True,
+    skip_unchanged: bool = True,
 ) -> str:
-    """生成HTML報告"""
+    """生成報告（HTML 或 JSON），內容與上次相同時跳過渲染和寫入，返回上次的文件路徑"""
     if is_daily_summary:
         if mode == "current":
-            filename = "當前榜單匯總.html"
+            report_name = "當前榜單匯總"
         elif mode == "incremental":
-            filename = "當日增量.html"
+            report_name = "當日增量"
         else:
-            filename = "當日匯總.html"
+            report_name = "當日匯總"
+    else:
+        report_name = format_time_filename()
+
+    report_format = CONFIG["REPORT_FORMAT"]
+    if report_format == "json":
+        filename = report_name + get_json_report_suffix()
     else:
-        filename = f"{format_time_filename()}.html"
+        filename = f"{report_name}.html"
 
-    file_path = get_output_path("html", filename)
+    file_path = get_output_path(report_format, filename, date_folder, output_root)
 
     report_data = prepare_report_data(stats, failed_ids, new_titles, id_to_name, mode)
 
-    html_content = render_html_content(
-        report_data, total_titles, is_daily_summary, mode
-    )
+    if skip_unchanged:
+        # 實時報告每次文件名不同，按模式比較；匯總報告按文件比較
+        report_key = "/".join(
+            [
+                date_folder or format_date_folder(),
+                filename if is_daily_summary else f"實時報告-{mode}",
+            ]
+        )
+        fingerprint = compute_report_fingerprint(
+            report_data,
+            total_titles,
+            mode,
+            is_daily_summary,
+            filename[len(report_name) :],
+        )
+        ledger = load_report_ledger(output_root)
+        last_report = ledger["reports"].get(report_key, {})
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+        if (
+            last_report.get("fingerprint") == fingerprint
+            and Path(last_report.get("file", "")).exists()
+            and (
+                not (is_daily_summary and update_index)
+                or ledger.get("index_fingerprint") == fingerprint
+                and Path("index.html").exists()
+            )
+        ):
+            # 生成/跳過次數記在每輪都會寫入的運行統計中，跳過時不改寫報告指紋記錄
+            run_stats = update_run_stats(output_root, reports_skipped=1)
+            skipped = run_stats["reports_skipped"]
+            total_runs = run_stats["reports_rendered"] + skipped
+            print(
+                f"報告內容未變化，跳過生成: {last_report['file']}"
+                f"（累計跳過 {skipped}/{total_runs}，"
+                f"{skipped / total_runs * 100:.1f}%）"
+            )
+            return last_report["file"]
 
-    if is_daily_summary:
-        root_file_path = Path("index.html")
-        with open(root_file_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+    if report_format == "json":
+        write_json_report(
+            file_path,
+            report_data,
+            total_titles,
+            mode,
+            is_daily_summary,
+            update_index=is_daily_summary and update_index,
+        )
+    else:
+        write_html_report(
+            file_path,
+            report_data,
+            total_titles,
+            mode,
+            is_daily_summary,
+            update_index=is_daily_summary and update_index,
+        )
+
+    if skip_unchanged:
+        # 只保留當天的記錄，避免文件無限增長
+        current_prefix = report_key.split("/")[0] + "/"
+        ledger["reports"] = {
+            key: value
+            for key, value in ledger["reports"].items()
+            if key.startswith(current_prefix)
+        }
+        ledger["reports"][report_key] = {
+            "fingerprint": fingerprint,
+            "file": file_path,
+        }
+        if is_daily_summary and update_index:
+            ledger["index_fingerprint"] = fingerprint
+        # 舊版本記錄中的計數字段不再保存
+        ledger.pop("rendered", None)
+        ledger.pop("skipped", None)
+        save_report_ledger(ledger, output_root)
+        update_run_stats(output_root, reports_rendered=1)
 
     return file_path
 
 
-def render_html_content(
+def write_html_report(
+    file_path: str,
     report_data: Dict,
     total_titles: int,
-    is_daily_summary: bool = False,
-    mode: str = "daily",
-) -> str:
-    """渲染HTML內容"""
-    html = """
+    mode: str,
+    is_daily_summary: bool,
+    update_index: bool = False,
+) -> None:
+    """逐段寫入HTML報告，需要時同時寫入根目錄 index.html，無需重複渲染"""
+    with ExitStack() as stack:
+        outputs = [stack.enter_context(atomic_write(file_path))]
+        if update_index:
+            outputs.append(stack.enter_context(atomic_write("index.html")))
+
+        for chunk in iter_html_content(
+            report_data, total_titles, is_daily_summary, mode
+        ):
+            for output in outputs:
+                output.write(chunk)
+
+
+def get_json_report_suffix() -> str:
+    """JSON 報告文件後綴，按壓縮方式區分"""
+    compression = CONFIG["REPORT_COMPRESSION"]
+    if compression == "gzip":
+        return ".json.gz"
+    return ".json"
+
+
+def get_report_type_label(mode: str, is_daily_summary: bool) -> str:
+    """報告類型顯示文本"""
+    if not is_daily_summary:
+        return "實時分析"
+    if mode == "current":
+        return "當前榜單"
+    if mode == "incremental":
+        return "增量模式"
+    return "當日匯總"
+
+
+def serialize_report_title(title_data: ReportTitle) -> Dict:
+    """報告標題的緊湊 JSON 結構，省略空值字段"""
+    item = {"title": title_data.title, "source": title_data.source_name}
+    if title_data.ranks:
+        item["ranks"] = title_data.ranks
+    if title_data.time_display:
+        item["time"] = title_data.time_display
+    if title_data.count > 1:
+        item["count"] = title_data.count
+    link_url = title_data.mobile_url or title_data.url
+    if link_url:
+        item["url"] = link_url
+    if title_data.is_new:
+        item["new"] = 1
+    return item
+
+
+def serialize_report_data(
+    report_data: Dict, total_titles: int, mode: str, is_daily_summary: bool
+) -> Dict:
+    """將報告數據轉換為瀏覽器端渲染所需的 JSON 結構"""
+    return {
+        "version": VERSION,
+        "report_type": get_report_type_label(mode, is_daily_summary),
+        "generated_at": get_beijing_time().strftime("%m-%d %H:%M"),
+        "total_titles": total_titles,
+        "rank_threshold": CONFIG["RANK_THRESHOLD"],
+        "failed_ids": report_data["failed_ids"],
+        "stats": [
+            {
+                "word": stat["word"],
+                "count": stat["count"],
+                "titles": [serialize_report_title(t) for t in stat["titles"]],
+            }
+            for stat in report_data["stats"]
+        ],
+        "new_titles": [
+            {
+                "source_name": source_data["source_name"],
+                "titles": [serialize_report_title(t) for t in source_data["titles"]],
+            }
+            for source_data in report_data["new_titles"]
+        ],
+        "total_new_count": report_data["total_new_count"],
+    }
+
+
+def encode_json_report(data: Dict, file_path: str) -> bytes:
+    """序列化並按文件後綴壓縮"""
+    body = json_dumps(data)
+    if file_path.endswith(".gz"):
+        return gzip.compress(body, mtime=0)
+    return body
+
+
+def write_json_report(
+    file_path: str,
+    report_data: Dict,
+    total_titles: int,
+    mode: str,
+    is_daily_summary: bool,
+    update_index: bool = False,
+) -> None:
+    """寫入JSON報告，需要時同時更新根目錄的數據文件和查看頁"""
+    data = serialize_report_data(report_data, total_titles, mode, is_daily_summary)
+    payload = encode_json_report(data, file_path)
+
+    with atomic_write(file_path, "wb") as f:
+        f.write(payload)
+
+    if update_index:
+        root_data_path = "report" + get_json_report_suffix()
+        with atomic_write(root_data_path, "wb") as f:
+            f.write(payload)
+
+        viewer = render_json_viewer(root_data_path)
+        viewer_path = Path("index.html")
+        if (
+            not viewer_path.exists()
+            or viewer_path.read_text(encoding="utf-8") != viewer
+        ):
+            with atomic_write(viewer_path) as f:
+                f.write(viewer)
+
+
+HTML_REPORT_HEAD = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -1762,229 +4054,430 @@ def render_html_content(
                         <span class="info-label">報告類型</span>
                         <span class="info-value">"""
 
+HTML_STREAM_CHUNK_ITEMS = 400
+
+HTML_REPORT_FOOT = """
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+
+def render_html_rank(ranks: List[int], rank_threshold: int) -> Tuple[str, str]:
+    """計算排名樣式和顯示文本"""
+    min_rank = min(ranks)
+    max_rank = max(ranks)
+
+    # 確定排名等級
+    if min_rank <= 3:
+        rank_class = "top"
+    elif min_rank <= rank_threshold:
+        rank_class = "high"
+    else:
+        rank_class = ""
+
+    if min_rank == max_rank:
+        rank_text = str(min_rank)
+    else:
+        rank_text = f"{min_rank}-{max_rank}"
+    return rank_class, rank_text
+
+
+def render_html_title_link(title_data: ReportTitle) -> str:
+    """渲染標題和鏈接"""
+    escaped_title = html_escape(title_data.title)
+    link_url = title_data.mobile_url or title_data.url
+
+    if link_url:
+        escaped_url = html_escape(link_url)
+        return f'<a href="{escaped_url}" target="_blank" class="news-link">{escaped_title}</a>'
+    return escaped_title
+
+
+def render_html_news_item(title_data: ReportTitle) -> str:
+    """渲染詞組下單條新聞（不含序號部分）"""
+    parts = [
+        '<span class="source-name">',
+        html_escape(title_data.source_name),
+        "</span>",
+    ]
+
+    # 處理排名顯示
+    if title_data.ranks:
+        rank_class, rank_text = render_html_rank(
+            title_data.ranks, title_data.rank_threshold
+        )
+        parts.append(f'<span class="rank-num {rank_class}">{rank_text}</span>')
+
+    # 處理時間顯示
+    time_display = title_data.time_display
+    if time_display:
+        # 簡化時間顯示格式，將波浪線替換為~
+        simplified_time = time_display.replace(" ~ ", "~").replace("[", "").replace("]", "")
+        parts.append(f'<span class="time-info">{html_escape(simplified_time)}</span>')
+
+    # 處理出現次數
+    if title_data.count > 1:
+        parts.append(f'<span class="count-info">{title_data.count}次</span>')
+
+    parts.append("""
+                            </div>
+                            <div class="news-title">""")
+    parts.append(render_html_title_link(title_data))
+    parts.append("""
+                            </div>
+                        </div>
+                    </div>""")
+    return "".join(parts)
+
+
+def render_html_new_item(title_data: ReportTitle) -> str:
+    """渲染新增新聞區域的單條新聞（不含序號部分）"""
+    ranks = title_data.ranks
+
+    # 處理新增新聞的排名顯示
+    if ranks:
+        rank_class, rank_text = render_html_rank(ranks, title_data.rank_threshold)
+    else:
+        rank_class, rank_text = "", "?"
+
+    return f"""
+                            <div class="new-item-rank {rank_class}">{rank_text}</div>
+                            <div class="new-item-content">
+                                <div class="new-item-title">{render_html_title_link(title_data)}
+                                </div>
+                            </div>
+                        </div>"""
+
+
+def html_fragment_key(title_data: ReportTitle) -> Tuple:
+    """片段緩存鍵：影響渲染結果的全部字段"""
+    return (
+        title_data.title,
+        title_data.source_name,
+        tuple(title_data.ranks),
+        title_data.rank_threshold,
+        title_data.time_display,
+        title_data.count,
+        title_data.url,
+        title_data.mobile_url,
+    )
+
+
+def iter_html_content(
+    report_data: Dict,
+    total_titles: int,
+    is_daily_summary: bool = False,
+    mode: str = "daily",
+) -> Iterator[str]:
+    """逐段渲染HTML內容，每個詞組輸出一段，內存佔用與報告大小無關"""
+    parts = [HTML_REPORT_HEAD]
+
     # 處理報告類型顯示
     if is_daily_summary:
         if mode == "current":
-            html += "當前榜單"
+            parts.append("當前榜單")
         elif mode == "incremental":
-            html += "增量模式"
+            parts.append("增量模式")
         else:
-            html += "當日匯總"
+            parts.append("當日匯總")
     else:
-        html += "實時分析"
+        parts.append("實時分析")
+
+    # 計算篩選後的熱點新聞數量
+    hot_news_count = sum(len(stat["titles"]) for stat in report_data["stats"])
+    now = get_beijing_time()
 
-    html += """</span>
+    parts.append(f"""</span>
                     </div>
                     <div class="info-item">
                         <span class="info-label">新聞總數</span>
-                        <span class="info-value">"""
-    
-    html += f"{total_titles} 條"
-    
-    # 計算篩選後的熱點新聞數量
-    hot_news_count = sum(len(stat["titles"]) for stat in report_data["stats"])
-    
-    html += """</span>
+                        <span class="info-value">{total_titles} 條</span>
                     </div>
                     <div class="info-item">
                         <span class="info-label">熱點新聞</span>
-                        <span class="info-value">"""
-    
-    html += f"{hot_news_count} 條"
-
-    html += """</span>
+                        <span class="info-value">{hot_news_count} 條</span>
                     </div>
                     <div class="info-item">
                         <span class="info-label">生成時間</span>
-                        <span class="info-value">"""
-
-    now = get_beijing_time()
-    html += now.strftime('%m-%d %H:%M')
-
-    html += """</span>
+                        <span class="info-value">{now.strftime('%m-%d %H:%M')}</span>
                     </div>
                 </div>
             </div>
             
-            <div class="content">"""
+            <div class="content">""")
 
     # 處理失敗ID錯誤信息
     if report_data["failed_ids"]:
-        html += """
+        parts.append("""
                 <div class="error-section">
                     <div class="error-title">⚠️ 請求失敗的平台</div>
-                    <ul class="error-list">"""
+                    <ul class="error-list">""")
         for id_value in report_data["failed_ids"]:
-            html += f'<li class="error-item">{html_escape(id_value)}</li>'
-        html += """
+            parts.append(f'<li class="error-item">{html_escape(id_value)}</li>')
+        parts.append("""
                     </ul>
-                </div>"""
+                </div>""")
+
+    yield "".join(parts)
+
+    # 同一條新聞可能出現在多個詞組中，只緩存重複出現的片段
+    key_counts = Counter(
+        html_fragment_key(title_data)
+        for stat in report_data["stats"]
+        for title_data in stat["titles"]
+    )
+    fragment_cache = {}
 
     # 處理主要統計數據
-    if report_data["stats"]:
-        total_count = len(report_data["stats"])
-        
-        for i, stat in enumerate(report_data["stats"], 1):
-            count = stat["count"]
-            
-            # 確定熱度等級
-            if count >= 10:
-                count_class = "hot"
-            elif count >= 5:
-                count_class = "warm"
-            else:
-                count_class = ""
+    total_count = len(report_data["stats"])
+    for i, stat in enumerate(report_data["stats"], 1):
+        count = stat["count"]
 
-            escaped_word = html_escape(stat["word"])
-            
-            html += f"""
+        # 確定熱度等級
+        if count >= 10:
+            count_class = "hot"
+        elif count >= 5:
+            count_class = "warm"
+        else:
+            count_class = ""
+
+        parts = [f"""
                 <div class="word-group">
                     <div class="word-header">
                         <div class="word-info">
-                            <div class="word-name">{escaped_word}</div>
+                            <div class="word-name">{html_escape(stat["word"])}</div>
                             <div class="word-count {count_class}">{count} 條</div>
                         </div>
                         <div class="word-index">{i}/{total_count}</div>
-                    </div>"""
+                    </div>"""]
 
-            # 處理每個詞組下的新聞標題，給每條新聞標上序號
-            for j, title_data in enumerate(stat["titles"], 1):
-                is_new = title_data.get("is_new", False)
-                new_class = "new" if is_new else ""
-                
-                html += f"""
+        # 處理每個詞組下的新聞標題，給每條新聞標上序號
+        for j, title_data in enumerate(stat["titles"], 1):
+            key = html_fragment_key(title_data)
+            fragment = fragment_cache.get(key)
+            if fragment is None:
+                fragment = render_html_news_item(title_data)
+                if key_counts[key] > 1:
+                    fragment_cache[key] = fragment
+
+            new_class = "new" if title_data.is_new else ""
+            parts.append(f"""
                     <div class="news-item {new_class}">
                         <div class="news-number">{j}</div>
                         <div class="news-content">
                             <div class="news-header">
-                                <span class="source-name">{html_escape(title_data["source_name"])}</span>"""
-                
-                # 處理排名顯示
-                ranks = title_data.get("ranks", [])
-                if ranks:
-                    min_rank = min(ranks)
-                    max_rank = max(ranks)
-                    rank_threshold = title_data.get("rank_threshold", 10)
-                    
-                    # 確定排名等級
-                    if min_rank <= 3:
-                        rank_class = "top"
-                    elif min_rank <= rank_threshold:
-                        rank_class = "high" 
-                    else:
-                        rank_class = ""
-                    
-                    if min_rank == max_rank:
-                        rank_text = str(min_rank)
-                    else:
-                        rank_text = f"{min_rank}-{max_rank}"
-                        
-                    html += f'<span class="rank-num {rank_class}">{rank_text}</span>'
-                
-                # 處理時間顯示
-                time_display = title_data.get("time_display", "")
-                if time_display:
-                    # 簡化時間顯示格式，將波浪線替換為~
-                    simplified_time = time_display.replace(" ~ ", "~").replace("[", "").replace("]", "")
-                    html += f'<span class="time-info">{html_escape(simplified_time)}</span>'
-                
-                # 處理出現次數
-                count_info = title_data.get("count", 1)
-                if count_info > 1:
-                    html += f'<span class="count-info">{count_info}次</span>'
-                
-                html += """
-                            </div>
-                            <div class="news-title">"""
-                
-                # 處理標題和鏈接
-                escaped_title = html_escape(title_data["title"])
-                link_url = title_data.get("mobile_url") or title_data.get("url", "")
-                
-                if link_url:
-                    escaped_url = html_escape(link_url)
-                    html += f'<a href="{escaped_url}" target="_blank" class="news-link">{escaped_title}</a>'
-                else:
-                    html += escaped_title
-                
-                html += """
-                            </div>
-                        </div>
-                    </div>"""
+                                """)
+            parts.append(fragment)
 
-            html += """
-                </div>"""
+            # 「全部新聞」模式只有一個詞組，組內也分段輸出
+            if len(parts) >= HTML_STREAM_CHUNK_ITEMS:
+                yield "".join(parts)
+                parts = []
+
+        parts.append("""
+                </div>""")
+        yield "".join(parts)
 
     # 處理新增新聞區域
     if report_data["new_titles"]:
-        html += f"""
+        new_fragment_cache = {}
+        yield f"""
                 <div class="new-section">
                     <div class="new-section-title">本次新增熱點 (共 {report_data['total_new_count']} 條)</div>"""
 
         for source_data in report_data["new_titles"]:
-            escaped_source = html_escape(source_data["source_name"])
-            titles_count = len(source_data["titles"])
-            
-            html += f"""
+            parts = [f"""
                     <div class="new-source-group">
-                        <div class="new-source-title">{escaped_source} · {titles_count}條</div>"""
+                        <div class="new-source-title">{html_escape(source_data["source_name"])} · {len(source_data["titles"])}條</div>"""]
 
             # 為新增新聞也添加序號
             for idx, title_data in enumerate(source_data["titles"], 1):
-                ranks = title_data.get("ranks", [])
-                
-                # 處理新增新聞的排名顯示
-                rank_class = ""
-                if ranks:
-                    min_rank = min(ranks)
-                    if min_rank <= 3:
-                        rank_class = "top"
-                    elif min_rank <= title_data.get("rank_threshold", 10):
-                        rank_class = "high"
-                    
-                    if len(ranks) == 1:
-                        rank_text = str(ranks[0])
-                    else:
-                        rank_text = f"{min(ranks)}-{max(ranks)}"
-                else:
-                    rank_text = "?"
+                key = html_fragment_key(title_data)
+                fragment = new_fragment_cache.get(key)
+                if fragment is None:
+                    fragment = new_fragment_cache[key] = render_html_new_item(
+                        title_data
+                    )
 
-                html += f"""
+                parts.append(f"""
                         <div class="new-item">
-                            <div class="new-item-number">{idx}</div>
-                            <div class="new-item-rank {rank_class}">{rank_text}</div>
-                            <div class="new-item-content">
-                                <div class="new-item-title">"""
-                
-                # 處理新增新聞的鏈接
-                escaped_title = html_escape(title_data["title"])
-                link_url = title_data.get("mobile_url") or title_data.get("url", "")
-                
-                if link_url:
-                    escaped_url = html_escape(link_url)
-                    html += f'<a href="{escaped_url}" target="_blank" class="news-link">{escaped_title}</a>'
-                else:
-                    html += escaped_title
-                
-                html += """
-                                </div>
-                            </div>
-                        </div>"""
+                            <div class="new-item-number">{idx}</div>""")
+                parts.append(fragment)
 
-            html += """
-                    </div>"""
+            parts.append("""
+                    </div>""")
+            yield "".join(parts)
 
-        html += """
+        yield """
                 </div>"""
 
-    html += """
+    yield HTML_REPORT_FOOT
+
+
+def render_html_content(
+    report_data: Dict,
+    total_titles: int,
+    is_daily_summary: bool = False,
+    mode: str = "daily",
+) -> str:
+    """渲染HTML內容"""
+    return "".join(
+        iter_html_content(report_data, total_titles, is_daily_summary, mode)
+    )
+
+
+JSON_VIEWER_BODY = """
+    <body>
+        <div class="container">
+            <div class="header">
+                <div class="header-title">熱點新聞分析</div>
+                <div class="header-info">
+                    <div class="info-item">
+                        <span class="info-label">報告類型</span>
+                        <span class="info-value" id="report-type">-</span>
+                    </div>
+                    <div class="info-item">
+                        <span class="info-label">新聞總數</span>
+                        <span class="info-value" id="total-titles">-</span>
+                    </div>
+                    <div class="info-item">
+                        <span class="info-label">熱點新聞</span>
+                        <span class="info-value" id="hot-news-count">-</span>
+                    </div>
+                    <div class="info-item">
+                        <span class="info-label">生成時間</span>
+                        <span class="info-value" id="generated-at">-</span>
+                    </div>
+                </div>
             </div>
+            <div class="content" id="content"></div>
         </div>
+        <script>
+            const DEFAULT_DATA_PATH = "__DATA_PATH__";
+
+            function escapeHtml(text) {
+                return String(text)
+                    .replace(/&/g, "&amp;")
+                    .replace(/</g, "&lt;")
+                    .replace(/>/g, "&gt;")
+                    .replace(/"/g, "&quot;")
+                    .replace(/'/g, "&#x27;");
+            }
+
+            function rankInfo(ranks, threshold, single) {
+                const minRank = Math.min(...ranks);
+                const maxRank = Math.max(...ranks);
+                const rankClass = minRank <= 3 ? "top" : (minRank <= threshold ? "high" : "");
+                const rankText = (single ? ranks.length === 1 : minRank === maxRank)
+                    ? String(single ? ranks[0] : minRank)
+                    : minRank + "-" + maxRank;
+                return [rankClass, rankText];
+            }
+
+            function titleLink(item) {
+                const title = escapeHtml(item.title);
+                return item.url
+                    ? '<a href="' + escapeHtml(item.url) + '" target="_blank" class="news-link">' + title + '</a>'
+                    : title;
+            }
+
+            function renderNewsItem(item, index, threshold) {
+                let header = '<span class="source-name">' + escapeHtml(item.source) + '</span>';
+                if (item.ranks) {
+                    const [rankClass, rankText] = rankInfo(item.ranks, threshold, false);
+                    header += '<span class="rank-num ' + rankClass + '">' + rankText + '</span>';
+                }
+                if (item.time) {
+                    const time = item.time.split(" ~ ").join("~").split("[").join("").split("]").join("");
+                    header += '<span class="time-info">' + escapeHtml(time) + '</span>';
+                }
+                if (item.count) {
+                    header += '<span class="count-info">' + item.count + '次</span>';
+                }
+                return '<div class="news-item ' + (item.new ? "new" : "") + '">'
+                    + '<div class="news-number">' + index + '</div>'
+                    + '<div class="news-content"><div class="news-header">' + header + '</div>'
+                    + '<div class="news-title">' + titleLink(item) + '</div></div></div>';
+            }
+
+            function renderNewItem(item, index, threshold) {
+                const [rankClass, rankText] = item.ranks ? rankInfo(item.ranks, threshold, true) : ["", "?"];
+                return '<div class="new-item">'
+                    + '<div class="new-item-number">' + index + '</div>'
+                    + '<div class="new-item-rank ' + rankClass + '">' + rankText + '</div>'
+                    + '<div class="new-item-content"><div class="new-item-title">' + titleLink(item) + '</div></div></div>';
+            }
+
+            function renderReport(data) {
+                const threshold = data.rank_threshold;
+                const parts = [];
+
+                if (data.failed_ids.length) {
+                    parts.push('<div class="error-section"><div class="error-title">⚠️ 請求失敗的平台</div><ul class="error-list">');
+                    data.failed_ids.forEach(id => parts.push('<li class="error-item">' + escapeHtml(id) + '</li>'));
+                    parts.push('</ul></div>');
+                }
+
+                data.stats.forEach((stat, i) => {
+                    const countClass = stat.count >= 10 ? "hot" : (stat.count >= 5 ? "warm" : "");
+                    parts.push('<div class="word-group"><div class="word-header"><div class="word-info">'
+                        + '<div class="word-name">' + escapeHtml(stat.word) + '</div>'
+                        + '<div class="word-count ' + countClass + '">' + stat.count + ' 條</div></div>'
+                        + '<div class="word-index">' + (i + 1) + '/' + data.stats.length + '</div></div>');
+                    stat.titles.forEach((item, j) => parts.push(renderNewsItem(item, j + 1, threshold)));
+                    parts.push('</div>');
+                });
+
+                if (data.new_titles.length) {
+                    parts.push('<div class="new-section"><div class="new-section-title">本次新增熱點 (共 ' + data.total_new_count + ' 條)</div>');
+                    data.new_titles.forEach(source => {
+                        parts.push('<div class="new-source-group"><div class="new-source-title">'
+                            + escapeHtml(source.source_name) + ' · ' + source.titles.length + '條</div>');
+                        source.titles.forEach((item, idx) => parts.push(renderNewItem(item, idx + 1, threshold)));
+                        parts.push('</div>');
+                    });
+                    parts.push('</div>');
+                }
+
+                document.getElementById("report-type").textContent = data.report_type;
+                document.getElementById("total-titles").textContent = data.total_titles + " 條";
+                document.getElementById("hot-news-count").textContent =
+                    data.stats.reduce((sum, stat) => sum + stat.titles.length, 0) + " 條";
+                document.getElementById("generated-at").textContent = data.generated_at;
+                document.getElementById("content").innerHTML = parts.join("");
+            }
+
+            async function loadReport(path) {
+                const response = await fetch(path);
+                if (!response.ok) {
+                    throw new Error("HTTP " + response.status);
+                }
+                // 預壓縮文件由瀏覽器解壓；服務器已按 Content-Encoding 解壓時直接解析
+                if (path.endsWith(".gz") && response.headers.get("Content-Encoding") !== "gzip") {
+                    const stream = response.body.pipeThrough(new DecompressionStream("gzip"));
+                    return JSON.parse(await new Response(stream).text());
+                }
+                return response.json();
+            }
+
+            const dataPath = new URLSearchParams(location.search).get("data") || DEFAULT_DATA_PATH;
+            loadReport(dataPath).then(renderReport).catch(error => {
+                document.getElementById("content").innerHTML =
+                    '<div class="error-section"><div class="error-title">⚠️ 報告數據加載失敗</div><ul class="error-list">'
+                    + '<li class="error-item">' + escapeHtml(dataPath + ": " + error.message) + '</li></ul></div>';
+            });
+        </script>
     </body>
     </html>
     """
 
-    return html
+
+def render_json_viewer(data_path: str) -> str:
+    """生成 JSON 報告查看頁，樣式與 HTML 報告一致，默認加載 data_path"""
+    head = HTML_REPORT_HEAD[: HTML_REPORT_HEAD.index("    <body>")]
+    return head + JSON_VIEWER_BODY.replace("__DATA_PATH__", data_path)
 
 
 def render_feishu_content(
@@ -2046,8 +4539,7 @@ def render_feishu_content(
             )
 
             for j, title_data in enumerate(source_data["titles"], 1):
-                title_data_copy = title_data.copy()
-                title_data_copy["is_new"] = False
+                title_data_copy = title_data.copy(is_new=False)
                 formatted_title = format_title_for_platform(
                     "feishu", title_data_copy, show_source=False
                 )
@@ -2142,8 +4634,7 @@ def render_dingtalk_content(
             text_content += f"**{source_data['source_name']}** ({len(source_data['titles'])} 條):\n\n"
 
             for j, title_data in enumerate(source_data["titles"], 1):
-                title_data_copy = title_data.copy()
-                title_data_copy["is_new"] = False
+                title_data_copy = title_data.copy(is_new=False)
                 formatted_title = format_title_for_platform(
                     "dingtalk", title_data_copy, show_source=False
                 )
@@ -2282,7 +4773,7 @@ def split_content_into_batches(
                         "telegram", first_title_data, show_source=True
                     )
                 else:
-                    formatted_title = f"{first_title_data['title']}"
+                    formatted_title = f"{first_title_data.title}"
 
                 first_news_line = f"  1. {formatted_title}\n"
                 if len(stat["titles"]) > 1:
@@ -2319,7 +4810,7 @@ def split_content_into_batches(
                         "telegram", title_data, show_source=True
                     )
                 else:
-                    formatted_title = f"{title_data['title']}"
+                    formatted_title = f"{title_data.title}"
 
                 news_line = f"  {j + 1}. {formatted_title}\n"
                 if j < len(stat["titles"]) - 1:
@@ -2388,8 +4879,7 @@ def split_content_into_batches(
             first_news_line = ""
             if source_data["titles"]:
                 first_title_data = source_data["titles"][0]
-                title_data_copy = first_title_data.copy()
-                title_data_copy["is_new"] = False
+                title_data_copy = first_title_data.copy(is_new=False)
 
                 if format_type == "wework":
                     formatted_title = format_title_for_platform(
@@ -2400,7 +4890,7 @@ def split_content_into_batches(
                         "telegram", title_data_copy, show_source=False
                     )
                 else:
-                    formatted_title = f"{title_data_copy['title']}"
+                    formatted_title = f"{title_data_copy.title}"
 
                 first_news_line = f"  1. {formatted_title}\n"
 
@@ -2425,8 +4915,7 @@ def split_content_into_batches(
             # 處理剩餘新增新聞
             for j in range(start_index, len(source_data["titles"])):
                 title_data = source_data["titles"][j]
-                title_data_copy = title_data.copy()
-                title_data_copy["is_new"] = False
+                title_data_copy = title_data.copy(is_new=False)
 
                 if format_type == "wework":
                     formatted_title = format_title_for_platform(
@@ -2437,7 +4926,7 @@ def split_content_into_batches(
                         "telegram", title_data_copy, show_source=False
                     )
                 else:
-                    formatted_title = f"{title_data_copy['title']}"
+                    formatted_title = f"{title_data_copy.title}"
 
                 news_line = f"  {j + 1}. {formatted_title}\n"
 
@@ -2498,6 +4987,283 @@ def split_content_into_batches(
     return batches
 
 
+NOTIFICATION_RENDER_CACHE = {"fingerprint": None, "contents": {}}
+
+
+def render_notification_content(
+    report_data: Dict,
+    format_type: str,
+    update_info: Optional[Dict] = None,
+    mode: str = "daily",
+) -> Union[str, List[str]]:
+    """渲染推送內容，同一報告同一格式只渲染一次；飛書、釘釘返回文本，其餘返回分批列表"""
+    fingerprint = get_report_data_fingerprint(report_data)
+    if NOTIFICATION_RENDER_CACHE["fingerprint"] != fingerprint:
+        NOTIFICATION_RENDER_CACHE["fingerprint"] = fingerprint
+        NOTIFICATION_RENDER_CACHE["contents"] = {}
+
+    cache_key = (format_type, mode, json.dumps(update_info, sort_keys=True))
+    contents = NOTIFICATION_RENDER_CACHE["contents"]
+    if cache_key not in contents:
+        if format_type == "feishu":
+            contents[cache_key] = render_feishu_content(report_data, update_info, mode)
+        elif format_type == "dingtalk":
+            contents[cache_key] = render_dingtalk_content(
+                report_data, update_info, mode
+            )
+        else:
+            contents[cache_key] = split_content_into_batches(
+                report_data, format_type, update_info, mode=mode
+            )
+    return contents[cache_key]
+
+
+def reset_run_caches() -> None:
+    """清空只在一輪運行內有效的緩存：推送內容含生成時間，跨輪複用會帶上舊時間"""
+    REPORT_DATA_CACHE.clear()
+    NOTIFICATION_RENDER_CACHE["fingerprint"] = None
+    NOTIFICATION_RENDER_CACHE["contents"] = {}
+
+
+# === 推送限流 ===
+# 各平台官方文檔的頻率限制：每分鐘條數、允許連續發送的條數
+DEFAULT_WEBHOOK_RATE_LIMITS = {
+    "feishu": {"per_minute": 100, "burst": 5},
+    "dingtalk": {"per_minute": 20, "burst": 20},
+    "wework": {"per_minute": 20, "burst": 20},
+    "telegram": {"per_minute": 60, "burst": 1},
+}
+
+# 各平台表示「發送過快」的錯誤碼
+RATE_LIMIT_ERROR_CODES = {
+    "feishu": {9499, 11232},
+    "dingtalk": {130101},
+    "wework": {45009},
+    "telegram": set(),
+}
+
+
+class RateLimiter:
+    """令牌桶限流器：有令牌時立即發送，否則等待到下一個令牌"""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.rate = per_minute / 60
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取一個令牌，返回等待的秒數"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+
+            wait = max(0.0, self.blocked_until - now)
+            shortage = 1 - (self.tokens + wait * self.rate)
+            if shortage > 0:
+                wait += shortage / self.rate
+
+            # 預留令牌，並發調用會依次排隊
+            self.tokens += wait * self.rate - 1
+            self.updated_at = now + wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, delay: float) -> None:
+        """觸發平台限流後清空令牌並暫停發送"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = 0.0
+            self.updated_at = max(self.updated_at, now)
+            self.blocked_until = max(self.blocked_until, now + delay)
+
+
+RATE_LIMITERS = {}
+
+
+def get_rate_limiter(channel: str) -> RateLimiter:
+    """獲取渠道的限流器（進程內共享）"""
+    if channel not in RATE_LIMITERS:
+        limits = dict(DEFAULT_WEBHOOK_RATE_LIMITS[channel])
+        limits.update(CONFIG["WEBHOOK_RATE_LIMITS"].get(channel) or {})
+        RATE_LIMITERS[channel] = RateLimiter(limits["per_minute"], limits["burst"])
+    return RATE_LIMITERS[channel]
+
+
+def get_rate_limit_delay(
+    channel: str, response: requests.Response, attempt: int
+) -> Optional[float]:
+    """響應為限流錯誤時返回重試前等待的秒數，否則返回 None"""
+    try:
+        result = json_loads(response.content)
+    except ValueError:
+        result = {}
+    if not isinstance(result, dict):
+        result = {}
+
+    error_code = result.get("errcode", result.get("code"))
+    if response.status_code != 429 and error_code not in RATE_LIMIT_ERROR_CODES[channel]:
+        return None
+
+    retry_after = (result.get("parameters") or {}).get(
+        "retry_after"
+    ) or response.headers.get("Retry-After")
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        # 未給出等待時間時按令牌間隔指數退避
+        return min(60.0, 2**attempt / get_rate_limiter(channel).rate)
+
+
+def post_webhook(
+    channel: str,
+    url: str,
+    payload: Dict,
+    proxies: Optional[Dict] = None,
+    max_retries: int = 3,
+) -> requests.Response:
+    """按渠道限流發送請求，遇到限流錯誤退避後重試"""
+    limiter = get_rate_limiter(channel)
+    headers = {"Content-Type": "application/json"}
+
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        response = requests.post(
+            url, headers=headers, json=payload, proxies=proxies, timeout=30
+        )
+        delay = get_rate_limit_delay(channel, response, attempt)
+        if delay is None or attempt == max_retries:
+            return response
+
+        print(f"{channel} 觸發發送頻率限制，{delay:.1f} 秒後重試")
+        limiter.penalize(delay)
+
+    return response
+
+
+# === 推送去重 ===
+PUSH_LEDGER_FILE = "push_ledger.json"
+
+
+def get_title_fingerprint(title_data: ReportTitle) -> str:
+    """標題指紋：來源 + 標題"""
+    return hashlib.sha1(
+        f"{title_data.source_name}\n{title_data.title}".encode("utf-8")
+    ).hexdigest()[:16]
+
+
+def load_push_ledger(output_root: str = "output") -> Dict:
+    """加載各渠道已推送記錄 {channel: {fingerprint: {"rank", "time"}}}"""
+    ledger_path = get_state_path(PUSH_LEDGER_FILE, output_root)
+    if ledger_path.exists():
+        try:
+            return read_json_file(ledger_path)
+        except Exception as e:
+            print(f"推送記錄讀取失敗，將重新建立: {e}")
+    return {}
+
+
+def save_push_ledger(ledger: Dict, output_root: str = "output") -> None:
+    """保存推送記錄，清理已超出去重窗口的條目"""
+    expire_before = (
+        get_beijing_time().timestamp() - CONFIG["PUSH_DEDUP"]["WINDOW_MINUTES"] * 60
+    )
+    for channel, entries in ledger.items():
+        ledger[channel] = {
+            fingerprint: entry
+            for fingerprint, entry in entries.items()
+            if entry["time"] >= expire_before
+        }
+
+    ledger_path = get_state_path(PUSH_LEDGER_FILE, output_root)
+    write_json_file(ledger_path, ledger)
+
+
+def get_current_rank(title_data: ReportTitle) -> Optional[int]:
+    """最新快照中的排名，缺失時退回當天最好排名"""
+    if title_data.current_rank is not None:
+        return title_data.current_rank
+    return min(title_data.ranks) if title_data.ranks else None
+
+
+def is_recently_pushed(title_data: ReportTitle, entries: Dict, now: float) -> bool:
+    """去重窗口內已推送過且當前排名沒有明顯上升"""
+    entry = entries.get(get_title_fingerprint(title_data))
+    if not entry:
+        return False
+    if now - entry["time"] >= CONFIG["PUSH_DEDUP"]["WINDOW_MINUTES"] * 60:
+        return False
+    current_rank = get_current_rank(title_data)
+    if current_rank is not None and entry["rank"] is not None:
+        improvement = entry["rank"] - current_rank
+        if improvement >= CONFIG["PUSH_DEDUP"]["RANK_IMPROVEMENT"]:
+            return False
+    return True
+
+
+def filter_pushed_titles(report_data: Dict, entries: Dict) -> Tuple[Dict, int]:
+    """從報告數據中去掉該渠道近期已推送的新聞，返回(新報告數據, 去掉的條數)"""
+    now = get_beijing_time().timestamp()
+    suppressed = 0
+
+    filtered_stats = []
+    for stat in report_data["stats"]:
+        titles = [t for t in stat["titles"] if not is_recently_pushed(t, entries, now)]
+        suppressed += len(stat["titles"]) - len(titles)
+        if titles:
+            # 佔比按原分母換算，與列出的條數保持一致
+            percentage = (
+                round(stat.get("percentage", 0) * len(titles) / stat["count"], 2)
+                if stat["count"]
+                else 0
+            )
+            filtered_stats.append(
+                {
+                    **stat,
+                    "count": len(titles),
+                    "percentage": percentage,
+                    "titles": titles,
+                }
+            )
+
+    filtered_new_titles = []
+    for source_data in report_data["new_titles"]:
+        titles = [
+            t for t in source_data["titles"] if not is_recently_pushed(t, entries, now)
+        ]
+        suppressed += len(source_data["titles"]) - len(titles)
+        if titles:
+            filtered_new_titles.append({**source_data, "titles": titles})
+
+    if not suppressed:
+        return report_data, 0
+
+    return {
+        "stats": filtered_stats,
+        "new_titles": filtered_new_titles,
+        "failed_ids": report_data["failed_ids"],
+        "total_new_count": sum(len(s["titles"]) for s in filtered_new_titles),
+    }, suppressed
+
+
+def record_pushed_titles(report_data: Dict, entries: Dict) -> None:
+    """記錄本次推送的新聞及其排名"""
+    now = get_beijing_time().timestamp()
+    for group in report_data["stats"] + report_data["new_titles"]:
+        for title_data in group["titles"]:
+            entries[get_title_fingerprint(title_data)] = {
+                "rank": get_current_rank(title_data),
+                "time": now,
+            }
+
+
 def send_to_webhooks(
     stats: List[Dict],
     failed_ids: Optional[List] = None,
@@ -2521,37 +5287,80 @@ def send_to_webhooks(
 
     update_info_to_send = update_info if CONFIG["SHOW_VERSION_UPDATE"] else None
 
+    senders = []
+
     # 發送到飛書
     if feishu_url:
-        results["feishu"] = send_to_feishu(
-            feishu_url, report_data, report_type, update_info_to_send, proxy_url, mode
+        senders.append(
+            (
+                "feishu",
+                lambda data: send_to_feishu(
+                    feishu_url, data, report_type, update_info_to_send, proxy_url, mode
+                ),
+            )
         )
 
     # 發送到釘釘
     if dingtalk_url:
-        results["dingtalk"] = send_to_dingtalk(
-            dingtalk_url, report_data, report_type, update_info_to_send, proxy_url, mode
+        senders.append(
+            (
+                "dingtalk",
+                lambda data: send_to_dingtalk(
+                    dingtalk_url, data, report_type, update_info_to_send, proxy_url, mode
+                ),
+            )
         )
 
     # 發送到企業微信
     if wework_url:
-        results["wework"] = send_to_wework(
-            wework_url, report_data, report_type, update_info_to_send, proxy_url, mode
+        senders.append(
+            (
+                "wework",
+                lambda data: send_to_wework(
+                    wework_url, data, report_type, update_info_to_send, proxy_url, mode
+                ),
+            )
         )
 
     # 發送到 Telegram
     if telegram_token and telegram_chat_id:
-        results["telegram"] = send_to_telegram(
-            telegram_token,
-            telegram_chat_id,
-            report_data,
-            report_type,
-            update_info_to_send,
-            proxy_url,
-            mode,
+        senders.append(
+            (
+                "telegram",
+                lambda data: send_to_telegram(
+                    telegram_token,
+                    telegram_chat_id,
+                    data,
+                    report_type,
+                    update_info_to_send,
+                    proxy_url,
+                    mode,
+                ),
+            )
         )
 
-    if not results:
+    push_ledger = load_push_ledger() if CONFIG["PUSH_DEDUP"]["ENABLED"] else None
+
+    for channel, sender in senders:
+        channel_data = report_data
+        if push_ledger is not None:
+            entries = push_ledger.setdefault(channel, {})
+            channel_data, suppressed = filter_pushed_titles(report_data, entries)
+            if suppressed:
+                print(f"{channel} 去重：跳過 {suppressed} 條近期已推送的新聞")
+            if not channel_data["stats"] and not channel_data["new_titles"]:
+                print(f"{channel} 沒有新的內容需要推送，跳過 [{report_type}]")
+                continue
+
+        results[channel] = sender(channel_data)
+
+        if push_ledger is not None and results[channel]:
+            record_pushed_titles(channel_data, push_ledger[channel])
+
+    if push_ledger is not None:
+        save_push_ledger(push_ledger)
+
+    if not senders:
         print("未配置任何webhook URL，跳過通知發送")
 
     return results
@@ -2566,9 +5375,9 @@ def send_to_feishu(
     mode: str = "daily",
 ) -> bool:
     """發送到飛書"""
-    headers = {"Content-Type": "application/json"}
-
-    text_content = render_feishu_content(report_data, update_info, mode)
+    text_content = render_notification_content(
+        report_data, "feishu", update_info, mode
+    )
     total_titles = sum(
         len(stat["titles"]) for stat in report_data["stats"] if stat["count"] > 0
     )
@@ -2589,9 +5398,7 @@ def send_to_feishu(
         proxies = {"http": proxy_url, "https": proxy_url}
 
     try:
-        response = requests.post(
-            webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
-        )
+        response = post_webhook("feishu", webhook_url, payload, proxies)
         if response.status_code == 200:
             print(f"飛書通知發送成功 [{report_type}]")
             return True
@@ -2612,9 +5419,9 @@ def send_to_dingtalk(
     mode: str = "daily",
 ) -> bool:
     """發送到釘釘"""
-    headers = {"Content-Type": "application/json"}
-
-    text_content = render_dingtalk_content(report_data, update_info, mode)
+    text_content = render_notification_content(
+        report_data, "dingtalk", update_info, mode
+    )
 
     payload = {
         "msgtype": "markdown",
@@ -2629,11 +5436,9 @@ def send_to_dingtalk(
         proxies = {"http": proxy_url, "https": proxy_url}
 
     try:
-        response = requests.post(
-            webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
-        )
+        response = post_webhook("dingtalk", webhook_url, payload, proxies)
         if response.status_code == 200:
-            result = response.json()
+            result = json_loads(response.content)
             if result.get("errcode") == 0:
                 print(f"釘釘通知發送成功 [{report_type}]")
                 return True
@@ -2657,13 +5462,12 @@ def send_to_wework(
     mode: str = "daily",
 ) -> bool:
     """發送到企業微信（支持分批發送）"""
-    headers = {"Content-Type": "application/json"}
     proxies = None
     if proxy_url:
         proxies = {"http": proxy_url, "https": proxy_url}
 
     # 獲取分批內容
-    batches = split_content_into_batches(report_data, "wework", update_info, mode=mode)
+    batches = render_notification_content(report_data, "wework", update_info, mode)
 
     print(f"企業微信消息分為 {len(batches)} 批次發送 [{report_type}]")
 
@@ -2682,16 +5486,11 @@ def send_to_wework(
         payload = {"msgtype": "markdown", "markdown": {"content": batch_content}}
 
         try:
-            response = requests.post(
-                webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
-            )
+            response = post_webhook("wework", webhook_url, payload, proxies)
             if response.status_code == 200:
-                result = response.json()
+                result = json_loads(response.content)
                 if result.get("errcode") == 0:
                     print(f"企業微信第 {i}/{len(batches)} 批次發送成功 [{report_type}]")
-                    # 批次間間隔
-                    if i < len(batches):
-                        time.sleep(CONFIG["BATCH_SEND_INTERVAL"])
                 else:
                     print(
                         f"企業微信第 {i}/{len(batches)} 批次發送失敗 [{report_type}]，錯誤：{result.get('errmsg')}"
@@ -2720,7 +5519,6 @@ def send_to_telegram(
     mode: str = "daily",
 ) -> bool:
     """發送到Telegram（支持分批發送）"""
-    headers = {"Content-Type": "application/json"}
     url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
 
     proxies = None
@@ -2728,9 +5526,7 @@ def send_to_telegram(
         proxies = {"http": proxy_url, "https": proxy_url}
 
     # 獲取分批內容
-    batches = split_content_into_batches(
-        report_data, "telegram", update_info, mode=mode
-    )
+    batches = render_notification_content(report_data, "telegram", update_info, mode)
 
     print(f"Telegram消息分為 {len(batches)} 批次發送 [{report_type}]")
 
@@ -2754,16 +5550,11 @@ def send_to_telegram(
         }
 
         try:
-            response = requests.post(
-                url, headers=headers, json=payload, proxies=proxies, timeout=30
-            )
+            response = post_webhook("telegram", url, payload, proxies)
             if response.status_code == 200:
-                result = response.json()
+                result = json_loads(response.content)
                 if result.get("ok"):
                     print(f"Telegram第 {i}/{len(batches)} 批次發送成功 [{report_type}]")
-                    # 批次間間隔
-                    if i < len(batches):
-                        time.sleep(CONFIG["BATCH_SEND_INTERVAL"])
                 else:
                     print(
                         f"Telegram第 {i}/{len(batches)} 批次發送失敗 [{report_type}]，錯誤：{result.get('description')}"
@@ -2773,13 +5564,238 @@ def send_to_telegram(
                 print(
                     f"Telegram第 {i}/{len(batches)} 批次發送失敗 [{report_type}]，狀態碼：{response.status_code}"
                 )
-                return False
-        except Exception as e:
-            print(f"Telegram第 {i}/{len(batches)} 批次發送出錯 [{report_type}]：{e}")
-            return False
+                return False
+        except Exception as e:
+            print(f"Telegram第 {i}/{len(batches)} 批次發送出錯 [{report_type}]：{e}")
+            return False
+
+    print(f"Telegram所有 {len(batches)} 批次發送完成 [{report_type}]")
+    return True
+
+
+# === 運行鎖 ===
+RUN_LOCK_FILE = "run.lock"
+RUN_QUEUE_FILE = "run.queue"
+RUN_STATS_FILE = "run_stats.json"
+RUN_STATS_LOCK_FILE = "run_stats.lock"
+RUN_STATS_LOCK_TIMEOUT = 10
+
+
+def is_process_alive(pid: int) -> bool:
+    """檢測本機進程是否存在（非 POSIX 系統無法判斷，視為存在）"""
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class FileLock:
+    """基於 O_EXCL 創建的鎖文件，記錄持有者並識別崩潰遺留的過期鎖"""
+
+    def __init__(self, lock_path: Path, stale_seconds: float):
+        self.lock_path = lock_path
+        self.stale_seconds = stale_seconds
+        self.owner = None
+
+    def read_owner(self) -> Optional[Dict]:
+        try:
+            return read_json_file(self.lock_path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # 持有者剛創建文件還未寫完，或內容損壞
+            return {}
+
+    def is_stale(self, owner: Dict) -> bool:
+        """持有者進程已退出或持有時間過長則視為過期"""
+        started_at = owner.get("started_at")
+        if started_at is None:
+            # 內容不完整時按文件修改時間判斷
+            try:
+                started_at = self.lock_path.stat().st_mtime
+            except FileNotFoundError:
+                return False
+        if time.time() - started_at > self.stale_seconds:
+            return True
+        return (
+            owner.get("host") == socket.gethostname()
+            and "pid" in owner
+            and not is_process_alive(owner["pid"])
+        )
+
+    def try_acquire(self) -> bool:
+        """嘗試獲取鎖，遇到過期鎖時清除後重試一次"""
+        for _ in range(2):
+            try:
+                fd = os.open(
+                    str(self.lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644
+                )
+            except FileExistsError:
+                owner = self.read_owner()
+                if owner is None:
+                    # 持有者恰好已釋放
+                    continue
+                if not self.is_stale(owner) or not self.break_stale(owner):
+                    return False
+                continue
+
+            self.owner = {
+                "pid": os.getpid(),
+                "host": socket.gethostname(),
+                "started_at": time.time(),
+            }
+            with os.fdopen(fd, "wb") as f:
+                f.write(json_dumps(self.owner))
+            return True
+        return False
+
+    def break_stale(self, owner: Dict) -> bool:
+        """移走過期鎖；移走後發現內容已變（他人剛清除並重新加鎖）則放回"""
+        stale_path = self.lock_path.with_name(
+            f"{self.lock_path.name}.stale.{os.getpid()}"
+        )
+        try:
+            os.rename(self.lock_path, stale_path)
+        except FileNotFoundError:
+            return True
+        try:
+            moved_owner = read_json_file(stale_path)
+        except Exception:
+            moved_owner = {}
+        if moved_owner != owner:
+            os.replace(stale_path, self.lock_path)
+            return False
+        os.remove(stale_path)
+        print(f"已清除過期的鎖文件 {self.lock_path}（持有者: {owner}）")
+        return True
+
+    def release(self) -> None:
+        """釋放鎖，只刪除自己持有的鎖"""
+        if self.owner is not None and self.read_owner() == self.owner:
+            try:
+                self.lock_path.unlink()
+            except FileNotFoundError:
+                pass
+        self.owner = None
+
+
+def load_run_stats(output_root: str = "output") -> Dict:
+    """加載運行統計"""
+    stats_path = get_state_path(RUN_STATS_FILE, output_root)
+    stats = {
+        "ticks": 0,
+        "overruns": 0,
+        "skipped": 0,
+        "waited": 0,
+        "wait_seconds": 0,
+        "reports_rendered": 0,
+        "reports_skipped": 0,
+    }
+    if stats_path.exists():
+        try:
+            stats.update(read_json_file(stats_path))
+        except Exception as e:
+            print(f"運行統計讀取失敗，將重新建立: {e}")
+    return stats
+
+
+def update_run_stats(output_root: str = "output", **increments) -> Dict:
+    """累加運行統計，跳過的運行不持有運行鎖，用單獨的短鎖串行化讀改寫"""
+    stats_lock = FileLock(
+        get_state_path(RUN_STATS_LOCK_FILE, output_root), RUN_STATS_LOCK_TIMEOUT * 6
+    )
+    deadline = time.monotonic() + RUN_STATS_LOCK_TIMEOUT
+    while not stats_lock.try_acquire():
+        if time.monotonic() >= deadline:
+            print("運行統計鎖等待超時，直接更新")
+            break
+        time.sleep(0.05)
+
+    try:
+        stats = load_run_stats(output_root)
+        for key, value in increments.items():
+            stats[key] = stats.get(key, 0) + value
+        write_json_file(
+            get_state_path(RUN_STATS_FILE, output_root), stats, indent=True
+        )
+    finally:
+        stats_lock.release()
+    return stats
+
+
+def try_acquire_output_lock(output_root: str = "output") -> Optional[FileLock]:
+    """命令行子命令寫入輸出目錄前獲取運行鎖，不等待"""
+    run_lock = FileLock(
+        get_state_path(RUN_LOCK_FILE, output_root),
+        CONFIG["RUN_LOCK"]["STALE_MINUTES"] * 60,
+    )
+    if not run_lock.try_acquire():
+        return None
+    return run_lock
+
+
+def acquire_run_lock(output_root: str = "output") -> Optional[FileLock]:
+    """獲取輸出目錄的單寫者鎖，上一輪仍在運行時按配置策略處理
+
+    skip: 直接跳過本輪；wait: 等待上一輪結束（超時跳過）；
+    queue: 最多一個運行排隊等待，已有排隊時跳過
+    """
+    lock_config = CONFIG["RUN_LOCK"]
+    stale_seconds = lock_config["STALE_MINUTES"] * 60
+    run_lock = FileLock(get_state_path(RUN_LOCK_FILE, output_root), stale_seconds)
+
+    if run_lock.try_acquire():
+        update_run_stats(output_root, ticks=1)
+        return run_lock
+
+    owner = run_lock.read_owner() or {}
+    policy = lock_config["POLICY"]
+    stats = update_run_stats(output_root, ticks=1, overruns=1)
+    print(
+        f"上一輪運行尚未結束（持有者 pid {owner.get('pid', '未知')}），"
+        f"累計重疊 {stats['overruns']}/{stats['ticks']} 次"
+        f"（{stats['overruns'] / stats['ticks']:.0%}），處理策略: {policy}"
+    )
+
+    queue_lock = None
+    if policy == "queue":
+        queue_lock = FileLock(
+            get_state_path(RUN_QUEUE_FILE, output_root),
+            stale_seconds + lock_config["WAIT_TIMEOUT"],
+        )
+        if not queue_lock.try_acquire():
+            print("已有運行在排隊，跳過本輪")
+            update_run_stats(output_root, skipped=1)
+            return None
+    elif policy != "wait":
+        print("跳過本輪運行")
+        update_run_stats(output_root, skipped=1)
+        return None
+
+    try:
+        started_at = time.monotonic()
+        deadline = started_at + lock_config["WAIT_TIMEOUT"]
+        while time.monotonic() < deadline:
+            time.sleep(min(1, max(0.1, deadline - time.monotonic())))
+            if run_lock.try_acquire():
+                waited = time.monotonic() - started_at
+                print(f"等待 {waited:.1f} 秒後獲得運行鎖")
+                update_run_stats(
+                    output_root, waited=1, wait_seconds=round(waited, 1)
+                )
+                return run_lock
+    finally:
+        if queue_lock:
+            queue_lock.release()
 
-    print(f"Telegram所有 {len(batches)} 批次發送完成 [{report_type}]")
-    return True
+    print(f"等待超過 {lock_config['WAIT_TIMEOUT']} 秒仍未獲得運行鎖，跳過本輪")
+    update_run_stats(output_root, skipped=1)
+    return None
 
 
 # === 主分析器 ===
@@ -2817,14 +5833,17 @@ class NewsAnalyzer:
         },
     }
 
-    def __init__(self):
+    def __init__(self, open_browser: bool = True):
         self.request_interval = CONFIG["REQUEST_INTERVAL"]
+        # 常駐服務每輪都會生成報告，不應反覆打開瀏覽器
+        self.open_browser = open_browser
         self.report_mode = CONFIG["REPORT_MODE"]
         self.rank_threshold = CONFIG["RANK_THRESHOLD"]
         self.is_github_actions = os.environ.get("GITHUB_ACTIONS") == "true"
         self.is_docker_container = self._detect_docker_environment()
         self.update_info = None
         self.proxy_url = None
+        self.latest_analysis = {}
         self._setup_proxy()
         self.data_fetcher = DataFetcher(self.proxy_url)
 
@@ -2846,7 +5865,13 @@ class NewsAnalyzer:
 
     def _should_open_browser(self) -> bool:
         """判斷是否應該打開瀏覽器"""
-        return not self.is_github_actions and not self.is_docker_container
+        # JSON 報告需通過 HTTP 訪問查看頁，本地文件無法直接打開
+        return (
+            self.open_browser
+            and not self.is_github_actions
+            and not self.is_docker_container
+            and CONFIG["REPORT_FORMAT"] == "html"
+        )
 
     def _setup_proxy(self) -> None:
         """設置代理配置"""
@@ -2932,6 +5957,9 @@ class NewsAnalyzer:
             new_titles = detect_latest_new_titles(current_platform_ids)
             word_groups, filter_words = load_frequency_words()
 
+            self.latest_analysis["aggregate"] = (all_results, id_to_name)
+            self.latest_analysis["new_titles"] = (new_titles, id_to_name)
+
             return (
                 all_results,
                 id_to_name,
@@ -2950,18 +5978,13 @@ class NewsAnalyzer:
         for source_id, titles_data in results.items():
             title_info[source_id] = {}
             for title, title_data in titles_data.items():
-                ranks = title_data.get("ranks", [])
-                url = title_data.get("url", "")
-                mobile_url = title_data.get("mobileUrl", "")
-
-                title_info[source_id][title] = {
-                    "first_time": time_info,
-                    "last_time": time_info,
-                    "count": 1,
-                    "ranks": ranks,
-                    "url": url,
-                    "mobileUrl": mobile_url,
-                }
+                title_info[source_id][title] = TitleRecord(
+                    title_data.ranks,
+                    title_data.url,
+                    title_data.mobile_url,
+                    first_time=time_info,
+                    last_time=time_info,
+                )
         return title_info
 
     def _run_analysis_pipeline(
@@ -3001,6 +6024,15 @@ class NewsAnalyzer:
             is_daily_summary=is_daily_summary,
         )
 
+        self.latest_analysis["stats"] = {
+            "mode": mode,
+            "total_titles": total_titles,
+            "stats": stats,
+        }
+        self.latest_analysis["updated_at"] = get_beijing_time().strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+
         return stats, html_file
 
     def _send_notification_if_needed(
@@ -3143,8 +6175,8 @@ class NewsAnalyzer:
         print(f"報告模式: {self.report_mode}")
         print(f"運行模式: {mode_strategy['description']}")
 
-    def _crawl_data(self) -> Tuple[Dict, Dict, List]:
-        """執行數據爬取"""
+    def _crawl_data(self) -> Tuple[Dict, Dict, List, str]:
+        """執行數據爬取，邊爬取邊寫入快照，返回的最後一項為快照時間"""
         ids = []
         for platform in CONFIG["PLATFORMS"]:
             if "name" in platform:
@@ -3157,25 +6189,122 @@ class NewsAnalyzer:
         )
         print(f"開始爬取數據，請求間隔 {self.request_interval} 毫秒")
         ensure_directory_exists("output")
+        recover_partial_snapshots()
 
-        results, id_to_name, failed_ids = self.data_fetcher.crawl_websites(
-            ids, self.request_interval
+        time_info = format_time_filename()
+        writer_class = (
+            DeltaSnapshotWriter
+            if CONFIG["SNAPSHOT_FORMAT"] == "delta"
+            else SnapshotWriter
         )
+        snapshot_writer = writer_class(get_output_path("txt", f"{time_info}.txt"))
+        if CONFIG["ADAPTIVE_SCHEDULE"]["ENABLED"]:
+            results, id_to_name, failed_ids = self._crawl_due_platforms(
+                ids, snapshot_writer
+            )
+        else:
+            results, id_to_name, failed_ids = self.data_fetcher.crawl_websites(
+                ids, self.request_interval, snapshot_writer
+            )
 
-        title_file = save_titles_to_file(results, id_to_name, failed_ids)
+        title_file = snapshot_writer.finalize(failed_ids)
         print(f"標題已保存到: {title_file}")
 
+        return results, id_to_name, failed_ids, time_info
+
+    def _crawl_due_platforms(
+        self,
+        ids: List[Union[str, Tuple[str, str]]],
+        snapshot_writer: Optional[SnapshotWriter] = None,
+    ) -> Tuple[Dict, Dict, List]:
+        """只爬取到期的平台，未到期平台沿用當天最新快照中的列表"""
+        scheduler = CrawlScheduler(CONFIG["PLATFORMS"])
+        previous_results, _ = read_latest_snapshot_titles()
+        now = time.time()
+
+        due_ids = []
+        carried_ids = []
+        for id_info in ids:
+            id_value = id_info[0] if isinstance(id_info, tuple) else id_info
+            if id_value in previous_results and not scheduler.is_due(id_value, now):
+                carried_ids.append(id_value)
+            else:
+                due_ids.append(id_info)
+
+        if carried_ids:
+            print(f"未到爬取時間，沿用上次快照: {carried_ids}")
+
+        carried_names = {}
+        for id_info in ids:
+            id_value = id_info[0] if isinstance(id_info, tuple) else id_info
+            if id_value in carried_ids:
+                carried_names[id_value] = (
+                    id_info[1] if isinstance(id_info, tuple) else id_value
+                )
+                if snapshot_writer:
+                    snapshot_writer.write_section(
+                        id_value, carried_names[id_value], previous_results[id_value]
+                    )
+
+        fetched, id_to_name, failed_ids = self.data_fetcher.crawl_websites(
+            due_ids, self.request_interval, snapshot_writer
+        )
+
+        for id_value, titles in fetched.items():
+            scheduler.record(id_value, previous_results.get(id_value), titles, now)
+        scheduler.save()
+
+        # 按配置順序合併本次爬取和沿用的數據
+        results = {}
+        for id_info in ids:
+            id_value = id_info[0] if isinstance(id_info, tuple) else id_info
+            if id_value in fetched:
+                results[id_value] = fetched[id_value]
+            elif id_value in carried_ids:
+                results[id_value] = previous_results[id_value]
+                id_to_name[id_value] = carried_names[id_value]
+
         return results, id_to_name, failed_ids
 
+    def _update_keyword_series(
+        self,
+        results: Dict,
+        time_info: str,
+        word_groups: List[Dict],
+        filter_words: List[str],
+    ) -> None:
+        """用本次快照增量更新關鍵詞時間序列索引"""
+        try:
+            added_count = update_keyword_series_index(
+                results, time_info, word_groups, filter_words
+            )
+            print(f"關鍵詞索引已更新，新增 {added_count} 條匹配記錄")
+        except Exception as e:
+            print(f"關鍵詞索引更新失敗: {e}")
+
+    def _update_search_index(
+        self, results: Dict, id_to_name: Dict, time_info: str
+    ) -> None:
+        """用本次快照增量更新標題搜索索引"""
+        try:
+            new_count = update_search_index(results, id_to_name, time_info)
+            print(f"搜索索引已更新，新收錄 {new_count} 條標題")
+        except Exception as e:
+            print(f"搜索索引更新失敗: {e}")
+
     def _execute_mode_strategy(
-        self, mode_strategy: Dict, results: Dict, id_to_name: Dict, failed_ids: List
+        self,
+        mode_strategy: Dict,
+        results: Dict,
+        id_to_name: Dict,
+        failed_ids: List,
+        time_info: str,
     ) -> Optional[str]:
         """執行模式特定邏輯"""
         # 獲取當前監控平台ID列表
         current_platform_ids = [platform["id"] for platform in CONFIG["PLATFORMS"]]
 
         new_titles = detect_latest_new_titles(current_platform_ids)
-        time_info = Path(save_titles_to_file(results, id_to_name, failed_ids)).stem
         word_groups, filter_words = load_frequency_words()
 
         # current模式下，實時推送需要使用完整的歷史數據來保證統計信息的完整性
@@ -3251,6 +6380,11 @@ class NewsAnalyzer:
                     id_to_name=id_to_name,
                 )
 
+        if CONFIG["ENABLE_KEYWORD_SERIES"]:
+            self._update_keyword_series(results, time_info, word_groups, filter_words)
+        if CONFIG["ENABLE_SEARCH_INDEX"]:
+            self._update_search_index(results, id_to_name, time_info)
+
         # 生成匯總報告（如果需要）
         summary_html = None
         if mode_strategy["should_generate_summary"]:
@@ -3282,23 +6416,1089 @@ class NewsAnalyzer:
         return summary_html
 
     def run(self) -> None:
-        """執行分析流程"""
+        """執行分析流程，同一輸出目錄同時只允許一個運行寫入"""
+        reset_run_caches()
+        run_lock = acquire_run_lock()
+        if run_lock is None:
+            return
+
         try:
             self._initialize_and_check_config()
 
+            if CONFIG["COMPACTION"]["ENABLED"]:
+                # 跨天後的首次運行壓縮此前的日期
+                compact_finished_days(
+                    drop_run_reports=CONFIG["COMPACTION"]["DROP_RUN_REPORTS"],
+                    archive_format=CONFIG["COMPACTION"]["FORMAT"],
+                    write_aggregate=CONFIG["COMPACTION"]["AGGREGATE"],
+                )
+
             mode_strategy = self._get_mode_strategy()
 
-            results, id_to_name, failed_ids = self._crawl_data()
+            results, id_to_name, failed_ids, time_info = self._crawl_data()
 
-            self._execute_mode_strategy(mode_strategy, results, id_to_name, failed_ids)
+            self._execute_mode_strategy(
+                mode_strategy, results, id_to_name, failed_ids, time_info
+            )
+            title_dictionary = get_title_dictionary()
+            title_dictionary.save()
+            prune_title_dictionaries()
+            if title_dictionary.match_hits or title_dictionary.match_misses:
+                print(
+                    f"標題匹配緩存：命中 {title_dictionary.match_hits} 次，"
+                    f"新匹配 {title_dictionary.match_misses} 次"
+                )
+                # 常駐運行時每輪單獨統計
+                title_dictionary.match_hits = title_dictionary.match_misses = 0
 
         except Exception as e:
             print(f"分析流程執行出錯: {e}")
             raise
+        finally:
+            run_lock.release()
+
+
+# === 本地查詢 API ===
+def serialize_aggregate(all_results: Dict, id_to_name: Dict) -> Dict:
+    """當日聚合數據轉換為 JSON 結構"""
+    return {
+        "platforms": [
+            {
+                "id": source_id,
+                "name": id_to_name.get(source_id, source_id),
+                "titles": [
+                    {"title": title, **record.to_dict()}
+                    for title, record in titles.items()
+                ],
+            }
+            for source_id, titles in all_results.items()
+        ]
+    }
+
+
+def serialize_stats(stats: List[Dict]) -> List[Dict]:
+    """詞頻統計結果轉換為 JSON 結構"""
+    return [
+        {
+            "word": stat["word"],
+            "count": stat["count"],
+            "percentage": stat.get("percentage", 0),
+            "titles": [title_data.to_dict() for title_data in stat["titles"]],
+        }
+        for stat in stats
+    ]
+
+
+class ApiState:
+    """HTTP API 的內存數據，分析完成後整體替換，請求時直接返回已序列化的內容"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._payloads = {}
+        self.series_index = {}
+
+    @staticmethod
+    def encode(data) -> Tuple[bytes, str]:
+        """序列化並計算 ETag"""
+        body = json_dumps(data)
+        return body, '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    def publish(self, name: str, data) -> None:
+        payload = self.encode(data)
+        with self._lock:
+            self._payloads[name] = payload
+
+    def get(self, name: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            return self._payloads.get(name)
+
+    def publish_analysis(self, latest_analysis: Dict) -> None:
+        """發布最近一次分析的結果"""
+        updated_at = latest_analysis.get("updated_at", "")
+
+        if "aggregate" in latest_analysis:
+            all_results, id_to_name = latest_analysis["aggregate"]
+            self.publish(
+                "aggregate",
+                {
+                    "date": format_date_folder(),
+                    "updated_at": updated_at,
+                    **serialize_aggregate(all_results, id_to_name),
+                },
+            )
+
+        if "stats" in latest_analysis:
+            stats_info = latest_analysis["stats"]
+            self.publish(
+                "stats",
+                {
+                    "updated_at": updated_at,
+                    "mode": stats_info["mode"],
+                    "total_titles": stats_info["total_titles"],
+                    "stats": serialize_stats(stats_info["stats"]),
+                },
+            )
+
+        if "new_titles" in latest_analysis:
+            new_titles, id_to_name = latest_analysis["new_titles"]
+            self.publish(
+                "new",
+                {
+                    "updated_at": updated_at,
+                    **serialize_aggregate(new_titles, id_to_name),
+                },
+            )
+
+        self.publish(
+            "health",
+            {"status": "ok", "updated_at": updated_at, "runs": load_run_stats()},
+        )
+
+        if CONFIG["ENABLE_KEYWORD_SERIES"]:
+            self.series_index = load_keyword_series_index()
+
+
+class ApiUnavailableError(Exception):
+    """查詢所需的索引未開啟或尚未建立"""
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """只讀 JSON 接口，支持 ETag / If-None-Match"""
+
+    api_state: ApiState = None
+    static_routes = {
+        "/api/aggregate": "aggregate",
+        "/api/stats": "stats",
+        "/api/new": "new",
+        "/api/health": "health",
+    }
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+
+        try:
+            if parsed.path in self.static_routes:
+                payload = self.api_state.get(self.static_routes[parsed.path])
+                if payload is None:
+                    self._send_json(*ApiState.encode({"error": "數據尚未就緒"}), 503)
+                    return
+            elif parsed.path == "/api/series":
+                payload = ApiState.encode(self._query_series(params))
+            elif parsed.path == "/api/search":
+                payload = ApiState.encode(self._query_search(params))
+            else:
+                self._send_json(*ApiState.encode({"error": "未知接口"}), 404)
+                return
+        except ValueError as e:
+            self._send_json(*ApiState.encode({"error": str(e)}), 400)
+            return
+        except ApiUnavailableError as e:
+            self._send_json(*ApiState.encode({"error": str(e)}), 503)
+            return
+        except Exception as e:
+            print(f"接口 {parsed.path} 處理出錯: {e}")
+            self._send_json(*ApiState.encode({"error": "服務器內部錯誤"}), 500)
+            return
+
+        self._send_json(*payload)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def _query_series(self, params: Dict) -> List[Dict]:
+        word = params.get("word", [""])[0]
+        if not word:
+            raise ValueError("缺少參數 word")
+        if not CONFIG["ENABLE_KEYWORD_SERIES"]:
+            raise ApiUnavailableError("關鍵詞索引未開啟（index.enable_keyword_series）")
+        return query_keyword_series(
+            self.api_state.series_index,
+            word,
+            start=params.get("start", [None])[0],
+            end=params.get("end", [None])[0],
+            platforms=params.get("platform"),
+            granularity=params.get("granularity", ["hour"])[0],
+        )
+
+    def _query_search(self, params: Dict) -> List[Dict]:
+        query = params.get("q", [""])[0]
+        if not query:
+            raise ValueError("缺少參數 q")
+        if not CONFIG["ENABLE_SEARCH_INDEX"]:
+            # 未開啟時索引不隨運行更新，結果可能缺失或過期
+            raise ApiUnavailableError("搜索索引未開啟（index.enable_search）")
+        try:
+            return search_titles(
+                query,
+                start=params.get("start", [None])[0],
+                end=params.get("end", [None])[0],
+                platforms=params.get("platform"),
+                limit=int(params.get("limit", ["50"])[0]),
+                read_only=True,
+            )
+        except FileNotFoundError as e:
+            raise ApiUnavailableError(str(e))
+
+    def _send_json(self, body: bytes, etag: str, status: int = 200) -> None:
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_api(host: str, port: int, interval_minutes: float) -> None:
+    """常駐運行：按間隔執行爬取分析，並在後台線程提供只讀 HTTP 查詢接口"""
+    api_state = ApiState()
+    if CONFIG["ENABLE_KEYWORD_SERIES"]:
+        api_state.series_index = load_keyword_series_index()
+    handler = type("BoundApiRequestHandler", (ApiRequestHandler,), {"api_state": api_state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"HTTP 查詢接口已啟動: http://{host}:{port}/api/stats")
+
+    analyzer = NewsAnalyzer(open_browser=False)
+    try:
+        while True:
+            try:
+                analyzer.run()
+                api_state.publish_analysis(analyzer.latest_analysis)
+            except Exception as e:
+                print(f"本輪運行失敗，等待下一輪: {e}")
+
+            if interval_minutes <= 0:
+                # 不定時爬取，僅提供本輪結果的查詢
+                threading.Event().wait()
+            print(f"下一輪將在 {interval_minutes} 分鐘後運行")
+            time.sleep(interval_minutes * 60)
+    except KeyboardInterrupt:
+        print("\n已停止")
+    finally:
+        server.shutdown()
+
+
+# === 歷史數據壓縮 ===
+# 每輪運行生成的報告（按時間命名），匯總報告不在此列
+RUN_REPORT_PATTERN = re.compile(r"^\d{2}時\d{2}分\.(html|json)")
+
+
+def compact_day_folder(
+    date_folder: str,
+    output_root: str = "output",
+    drop_run_reports: bool = False,
+    archive_format: str = "zip",
+) -> Tuple[int, int]:
+    """把某天的 txt 快照打包進 txt.zip 或轉換為增量日誌，返回(歸檔的快照數, 刪除的單輪報告數)
+
+    歸檔先完整寫入臨時文件再替換，成功後才刪除原文件；中途中斷時原文件仍在，讀取時以原文件為準
+    """
+    day_dir = Path(output_root) / date_folder
+    txt_dir = day_dir / "txt"
+    loose_files = (
+        sorted(f for f in txt_dir.iterdir() if f.suffix == ".txt")
+        if txt_dir.exists()
+        else []
+    )
+    zip_path = day_dir / SNAPSHOT_ARCHIVE_FILE
+
+    if archive_format == "delta" and (loose_files or zip_path.exists()):
+        # 按時間順序重新編碼當天全部快照（含已有的增量日誌和 zip 歸檔）
+        snapshots = list_snapshot_files(date_folder, output_root)
+        log = DeltaLog()
+        for snapshot in snapshots:
+            titles_by_id, id_to_name = parse_file_titles(snapshot)
+            state, names = build_snapshot_state(titles_by_id, id_to_name)
+            log.encode(
+                snapshot.stem,
+                state,
+                names,
+                parse_failed_ids(snapshot),
+                CONFIG["DELTA_KEYFRAME_INTERVAL"],
+            )
+        log.write(day_dir / DELTA_LOG_FILE)
+
+        archived = len(snapshots)
+        for file_path in loose_files:
+            file_path.unlink()
+        if zip_path.exists():
+            zip_path.unlink()
+        try:
+            txt_dir.rmdir()
+        except OSError:
+            pass
+        loose_files = []
+    else:
+        archived = len(loose_files)
+
+    if loose_files:
+        archive_path = day_dir / SNAPSHOT_ARCHIVE_FILE
+        loose_names = {f.name for f in loose_files}
+        with atomic_write(archive_path, "wb") as f:
+            with zipfile.ZipFile(
+                f, "w", zipfile.ZIP_DEFLATED, compresslevel=9
+            ) as new_archive:
+                if archive_path.exists():
+                    with zipfile.ZipFile(archive_path) as old_archive:
+                        for info in old_archive.infolist():
+                            if info.filename not in loose_names:
+                                new_archive.writestr(info, old_archive.read(info))
+                for file_path in loose_files:
+                    new_archive.write(file_path, file_path.name)
+
+        for file_path in loose_files:
+            file_path.unlink()
+        try:
+            txt_dir.rmdir()
+        except OSError:
+            pass
+
+    removed_reports = 0
+    if drop_run_reports:
+        for subfolder in ("html", "json"):
+            report_dir = day_dir / subfolder
+            if not report_dir.exists():
+                continue
+            for file_path in report_dir.iterdir():
+                if RUN_REPORT_PATTERN.match(file_path.name):
+                    file_path.unlink()
+                    removed_reports += 1
+
+    return archived, removed_reports
+
+
+def compact_finished_days(
+    output_root: str = "output",
+    drop_run_reports: bool = False,
+    archive_format: str = "zip",
+    write_aggregate: bool = True,
+) -> int:
+    """壓縮今天以前所有仍有未歸檔快照的日期並生成聚合側車文件，返回處理的天數"""
+    today_folder = format_date_folder()
+    compacted_days = 0
+
+    for date_folder in list_date_folders(output_root=output_root):
+        if date_folder >= today_folder:
+            continue
+        day_dir = Path(output_root) / date_folder
+        pending = (day_dir / "txt").exists() or (
+            archive_format == "delta" and (day_dir / SNAPSHOT_ARCHIVE_FILE).exists()
+        )
+        aggregate_missing = write_aggregate and not (
+            pending or is_day_aggregate_current(day_dir / DAY_AGGREGATE_FILE)
+        )
+        if not pending and not drop_run_reports and not aggregate_missing:
+            continue
+
+        try:
+            archived, removed = compact_day_folder(
+                date_folder, output_root, drop_run_reports, archive_format
+            )
+            if write_aggregate and (archived or aggregate_missing):
+                write_day_aggregate(date_folder, output_root)
+        except Exception as e:
+            print(f"壓縮 {date_folder} 失敗: {e}")
+            continue
+
+        if archived or removed:
+            compacted_days += 1
+            archive_path = day_dir / (
+                DELTA_LOG_FILE if archive_format == "delta" else SNAPSHOT_ARCHIVE_FILE
+            )
+            print(
+                f"已壓縮 {date_folder}: 歸檔 {archived} 個快照"
+                f"（{archive_path.stat().st_size / 1024:.1f} KB）"
+                + (f"，刪除 {removed} 個單輪報告" if removed else "")
+            )
+        elif aggregate_missing:
+            compacted_days += 1
+            print(f"已生成 {date_folder} 的聚合文件")
+
+    return compacted_days
+
+
+# === 當日聚合側車文件 ===
+# 佈局：文件頭 | 時間表 | 平台表 | 定長標題記錄表 | 排名數組 | UTF-8 字符串堆
+# 所有字符串以 (堆內偏移, 字節長度) 引用，讀取時通過 mmap 按需訪問，無需反序列化整天數據
+DAY_AGGREGATE_FILE = "aggregate.bin"
+DAY_AGGREGATE_MAGIC = b"TRAG"
+DAY_AGGREGATE_VERSION = 2
+# magic, 版本, 平台數, 時間數, 記錄數, 排名數, 字符串堆大小
+AGGREGATE_HEADER = struct.Struct("<4sIIIIII")
+# 字符串偏移, 長度
+AGGREGATE_TIME = struct.Struct("<II")
+# id 偏移, id 長度, 名稱偏移, 名稱長度, 首條記錄序號, 記錄數
+# 名稱長度為 AGGREGATE_ABSENT 表示沒有名稱，首條記錄序號為 AGGREGATE_ABSENT 表示只有名稱沒有標題數據
+AGGREGATE_PLATFORM = struct.Struct("<IIIIII")
+AGGREGATE_ABSENT = 0xFFFFFFFF
+# 標題/鏈接/移動鏈接的偏移和長度, 排名起始, 出現次數, 排名個數, 首次/最後出現時間序號, 最後排名（0 表示無）
+AGGREGATE_RECORD = struct.Struct("<IIIIIIIIHHHH")
+AGGREGATE_RANK = struct.Struct("<H")
+
+
+def write_day_aggregate(
+    date_folder: str, output_root: str = "output"
+) -> Optional[Path]:
+    """把某天的聚合結果寫入可 mmap 讀取的側車文件"""
+    all_results, id_to_name, _ = read_all_today_titles(None, date_folder, output_root)
+    if not all_results:
+        return None
+
+    heap = bytearray()
+    heap_offsets = {}
+
+    def add_string(text: str) -> Tuple[int, int]:
+        location = heap_offsets.get(text)
+        if location is None:
+            data = text.encode("utf-8")
+            location = heap_offsets[text] = (len(heap), len(data))
+            heap.extend(data)
+        return location
+
+    times = sorted(
+        {record.first_time for titles in all_results.values() for record in titles.values()}
+        | {record.last_time for titles in all_results.values() for record in titles.values()}
+    )
+    time_index = {time_info: i for i, time_info in enumerate(times)}
+
+    time_table = b"".join(AGGREGATE_TIME.pack(*add_string(t)) for t in times)
+    platform_table = bytearray()
+    record_table = bytearray()
+    rank_table = bytearray()
+    record_count = 0
+    rank_count = 0
+
+    def pack_name(id_value: str) -> Tuple[int, int]:
+        if id_value not in id_to_name:
+            return 0, AGGREGATE_ABSENT
+        return add_string(id_to_name[id_value])
+
+    # 與讀取快照的結果一致：有名稱但沒有標題數據的平台也要保留
+    name_only_ids = [id_value for id_value in id_to_name if id_value not in all_results]
+    for id_value in name_only_ids:
+        platform_table += AGGREGATE_PLATFORM.pack(
+            *add_string(id_value), *pack_name(id_value), AGGREGATE_ABSENT, 0
+        )
+
+    for id_value, titles in all_results.items():
+        platform_table += AGGREGATE_PLATFORM.pack(
+            *add_string(id_value),
+            *pack_name(id_value),
+            record_count,
+            len(titles),
+        )
+        for title, record in titles.items():
+            record_table += AGGREGATE_RECORD.pack(
+                *add_string(title),
+                *add_string(record.url),
+                *add_string(record.mobile_url),
+                rank_count,
+                record.count,
+                len(record.ranks),
+                time_index[record.first_time],
+                time_index[record.last_time],
+                record.last_rank or 0,
+            )
+            for rank in record.ranks:
+                rank_table += AGGREGATE_RANK.pack(rank)
+            rank_count += len(record.ranks)
+            record_count += 1
+
+    aggregate_path = Path(output_root) / date_folder / DAY_AGGREGATE_FILE
+    with atomic_write(aggregate_path, "wb") as f:
+        f.write(
+            AGGREGATE_HEADER.pack(
+                DAY_AGGREGATE_MAGIC,
+                DAY_AGGREGATE_VERSION,
+                len(name_only_ids) + len(all_results),
+                len(times),
+                record_count,
+                rank_count,
+                len(heap),
+            )
+        )
+        for table in (time_table, platform_table, record_table, rank_table, heap):
+            f.write(table)
+    return aggregate_path
+
+
+class DayAggregate:
+    """以 mmap 打開的當天聚合側車文件，只讀取用到的平台和記錄"""
+
+    def __init__(self, aggregate_path: Path):
+        with open(aggregate_path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+
+        (
+            magic,
+            version,
+            self.platform_count,
+            self.time_count,
+            self.record_count,
+            rank_count,
+            heap_size,
+        ) = AGGREGATE_HEADER.unpack_from(self.mm, 0)
+        if magic != DAY_AGGREGATE_MAGIC or version != DAY_AGGREGATE_VERSION:
+            self.close()
+            raise ValueError(f"不支持的聚合文件: {aggregate_path}")
+
+        self.time_offset = AGGREGATE_HEADER.size
+        self.platform_offset = self.time_offset + self.time_count * AGGREGATE_TIME.size
+        self.record_offset = (
+            self.platform_offset + self.platform_count * AGGREGATE_PLATFORM.size
+        )
+        self.rank_offset = self.record_offset + self.record_count * AGGREGATE_RECORD.size
+        self.heap_offset = self.rank_offset + rank_count * AGGREGATE_RANK.size
+        if self.heap_offset + heap_size != len(self.mm):
+            self.close()
+            raise ValueError(f"聚合文件大小不符: {aggregate_path}")
+
+        self.times = [
+            self.string(*AGGREGATE_TIME.unpack_from(self.mm, self.time_offset + i * AGGREGATE_TIME.size))
+            for i in range(self.time_count)
+        ]
+
+    def __enter__(self) -> "DayAggregate":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.view.release()
+        self.mm.close()
+
+    def string_view(self, offset: int, length: int) -> memoryview:
+        """字符串堆中的原始字節（零拷貝）"""
+        start = self.heap_offset + offset
+        return self.view[start : start + length]
+
+    def string(self, offset: int, length: int) -> str:
+        return sys.intern(str(self.string_view(offset, length), "utf-8"))
+
+    def platforms(self) -> List[Tuple[str, Optional[str], Optional[int], int]]:
+        """平台列表 [(id, 名稱, 首條記錄序號, 記錄數)]，名稱或標題數據不存在時為 None"""
+        result = []
+        for i in range(self.platform_count):
+            id_offset, id_length, name_offset, name_length, first, count = (
+                AGGREGATE_PLATFORM.unpack_from(
+                    self.mm, self.platform_offset + i * AGGREGATE_PLATFORM.size
+                )
+            )
+            result.append(
+                (
+                    self.string(id_offset, id_length),
+                    None
+                    if name_length == AGGREGATE_ABSENT
+                    else str(self.string_view(name_offset, name_length), "utf-8"),
+                    None if first == AGGREGATE_ABSENT else first,
+                    count,
+                )
+            )
+        return result
+
+    def title_view(self, index: int) -> memoryview:
+        """第 index 條記錄的標題字節（零拷貝），用於不需要解碼的比較和查找"""
+        title_offset, title_length = AGGREGATE_RECORD.unpack_from(
+            self.mm, self.record_offset + index * AGGREGATE_RECORD.size
+        )[:2]
+        return self.string_view(title_offset, title_length)
+
+    def record(self, index: int) -> Tuple[str, TitleRecord]:
+        """解碼第 index 條記錄"""
+        (
+            title_offset,
+            title_length,
+            url_offset,
+            url_length,
+            mobile_offset,
+            mobile_length,
+            rank_start,
+            count,
+            rank_length,
+            first_time,
+            last_time,
+            last_rank,
+        ) = AGGREGATE_RECORD.unpack_from(
+            self.mm, self.record_offset + index * AGGREGATE_RECORD.size
+        )
+        rank_position = self.rank_offset + rank_start * AGGREGATE_RANK.size
+        ranks = list(
+            struct.unpack_from(f"<{rank_length}H", self.mm, rank_position)
+        )
+        return self.string(title_offset, title_length), TitleRecord(
+            ranks,
+            self.string(url_offset, url_length),
+            self.string(mobile_offset, mobile_length),
+            self.times[first_time],
+            self.times[last_time],
+            count,
+            last_rank or None,
+        )
+
+    def load(
+        self, current_platform_ids: Optional[List[str]] = None
+    ) -> Tuple[Dict, Dict, Dict]:
+        """還原為 read_all_today_titles 的返回結構，只解碼需要的平台"""
+        all_results = {}
+        id_to_name = {}
+        title_info = {}
+        for id_value, name, first, count in self.platforms():
+            if current_platform_ids is not None and id_value not in current_platform_ids:
+                continue
+            if name is not None:
+                id_to_name[id_value] = name
+            if first is None:
+                continue
+            titles = dict(self.record(index) for index in range(first, first + count))
+            all_results[id_value] = titles
+            title_info[id_value] = dict(titles)
+        return all_results, id_to_name, title_info
+
+
+def is_day_aggregate_current(aggregate_path: Path) -> bool:
+    """聚合文件存在且為當前格式版本"""
+    try:
+        with open(aggregate_path, "rb") as f:
+            header = f.read(AGGREGATE_HEADER.size)
+    except FileNotFoundError:
+        return False
+    if len(header) < AGGREGATE_HEADER.size:
+        return False
+    magic, version = AGGREGATE_HEADER.unpack(header)[:2]
+    return magic == DAY_AGGREGATE_MAGIC and version == DAY_AGGREGATE_VERSION
+
+
+def open_day_aggregate(
+    date_folder: str, output_root: str = "output"
+) -> Optional[DayAggregate]:
+    """打開某天的聚合側車文件；不存在、已過期（快照在其後有更新）或損壞時返回 None"""
+    day_dir = Path(output_root) / date_folder
+    aggregate_path = day_dir / DAY_AGGREGATE_FILE
+    try:
+        aggregate_mtime = aggregate_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    for source in ("txt", SNAPSHOT_ARCHIVE_FILE, DELTA_LOG_FILE):
+        source_path = day_dir / source
+        if source_path.exists() and source_path.stat().st_mtime_ns > aggregate_mtime:
+            return None
+
+    if not is_day_aggregate_current(aggregate_path):
+        # 舊版本格式，等待下次壓縮時重新生成
+        return None
+
+    try:
+        return DayAggregate(aggregate_path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"聚合文件讀取失敗，改為讀取快照: {e}")
+        return None
+
+
+# === 歷史回溯分析 ===
+def parse_date_arg(date_str: str) -> datetime:
+    """解析命令行日期參數（YYYY-MM-DD）"""
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式應為 YYYY-MM-DD: {date_str}")
+
+
+def list_date_folders(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    output_root: str = "output",
+) -> List[str]:
+    """列出日期範圍內存在快照數據的日期文件夾，未指定範圍時列出全部"""
+    root = Path(output_root)
+    if start_date is None or end_date is None:
+        if not root.exists():
+            return []
+        candidates = []
+        for path in root.iterdir():
+            try:
+                folder_date = datetime.strptime(path.name, "%Y年%m月%d日")
+            except ValueError:
+                continue
+            if (start_date is None or folder_date >= start_date) and (
+                end_date is None or folder_date <= end_date
+            ):
+                candidates.append((folder_date, path.name))
+        candidates.sort()
+        return [name for _, name in candidates if has_snapshot_data(root / name)]
+
+    date_folders = []
+    current = start_date
+    while current <= end_date:
+        date_folder = current.strftime("%Y年%m月%d日")
+        if has_snapshot_data(root / date_folder):
+            date_folders.append(date_folder)
+        current += timedelta(days=1)
+    return date_folders
+
+
+def reanalyze_day(
+    date_folder: str,
+    source_root: str,
+    target_root: str,
+    mode: str,
+    platform_ids: Optional[List[str]],
+    word_groups: List[Dict],
+    filter_words: List[str],
+) -> Tuple[str, Optional[str], int, int]:
+    """用當前頻率詞重新分析某一天的快照，返回(日期, 報告路徑, 標題數, 匹配數)"""
+    all_results, id_to_name, title_info = read_all_today_titles(
+        platform_ids, date_folder, source_root
+    )
+    if not all_results:
+        return date_folder, None, 0, 0
+
+    new_titles = detect_latest_new_titles(platform_ids, date_folder, source_root)
+    stats, total_titles = count_word_frequency(
+        all_results,
+        word_groups,
+        filter_words,
+        id_to_name,
+        title_info,
+        CONFIG["RANK_THRESHOLD"],
+        new_titles,
+        mode=mode,
+        is_first_today=is_first_crawl_today(date_folder, source_root),
+        # 原始數據目錄只讀，字典不保存
+        title_dictionary=get_title_dictionary(date_folder, source_root),
+    )
+    html_file = generate_html_report(
+        stats,
+        total_titles,
+        new_titles=new_titles,
+        id_to_name=id_to_name,
+        mode=mode,
+        is_daily_summary=True,
+        date_folder=date_folder,
+        output_root=target_root,
+        update_index=False,
+        skip_unchanged=False,
+    )
+    matched_count = sum(stat["count"] for stat in stats)
+    return date_folder, html_file, total_titles, matched_count
+
+
+def reanalyze_history(
+    start_date: datetime,
+    end_date: datetime,
+    target_root: str,
+    source_root: str = "output",
+    mode: str = "daily",
+    workers: Optional[int] = None,
+    all_platforms: bool = False,
+) -> List[Tuple[str, Optional[str], int, int]]:
+    """按日期範圍並行重新分析歷史快照，結果寫入獨立的輸出目錄"""
+    if Path(target_root).resolve() == Path(source_root).resolve():
+        raise ValueError("重新分析的輸出目錄不能與原始數據目錄相同")
+
+    date_folders = list_date_folders(start_date, end_date, source_root)
+    if not date_folders:
+        print("指定日期範圍內沒有找到快照數據")
+        return []
+
+    word_groups, filter_words = load_frequency_words()
+    platform_ids = (
+        None if all_platforms else [platform["id"] for platform in CONFIG["PLATFORMS"]]
+    )
+    workers = workers or os.cpu_count() or 1
+
+    print(
+        f"開始重新分析 {len(date_folders)} 天的數據，模式：{mode}，進程數：{workers}，輸出目錄：{target_root}"
+    )
+    start_time = time.monotonic()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                reanalyze_day,
+                date_folder,
+                source_root,
+                target_root,
+                mode,
+                platform_ids,
+                word_groups,
+                filter_words,
+            ): date_folder
+            for date_folder in date_folders
+        }
+        for future in as_completed(futures):
+            date_folder = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"重新分析 {date_folder} 失敗: {e}")
+                results.append((date_folder, None, 0, 0))
+
+    results.sort(key=lambda x: x[0])
+    elapsed = time.monotonic() - start_time
+    for date_folder, html_file, total_titles, matched_count in results:
+        if html_file:
+            print(
+                f"  {date_folder}: {total_titles} 條標題，匹配 {matched_count} 條 → {html_file}"
+            )
+        else:
+            print(f"  {date_folder}: 無數據")
+    # 耗時低於計時精度時避免除零
+    rate = len(results) / max(elapsed, 1e-9)
+    print(f"重新分析完成，耗時 {elapsed:.2f} 秒（{rate:.2f} 天/秒）")
+    return results
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """構建命令行參數解析器"""
+    parser = argparse.ArgumentParser(description=f"TrendRadar v{VERSION}")
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("run", help="爬取並分析（默認命令）")
+
+    reanalyze_parser = subparsers.add_parser(
+        "reanalyze", help="用當前頻率詞重新分析歷史數據"
+    )
+    reanalyze_parser.add_argument(
+        "--start", type=parse_date_arg, required=True, help="開始日期 YYYY-MM-DD"
+    )
+    reanalyze_parser.add_argument(
+        "--end", type=parse_date_arg, help="結束日期 YYYY-MM-DD，默認與開始日期相同"
+    )
+    reanalyze_parser.add_argument(
+        "--output-root", default="output_reanalyze", help="結果輸出目錄"
+    )
+    reanalyze_parser.add_argument(
+        "--source-root", default="output", help="歷史快照所在目錄"
+    )
+    reanalyze_parser.add_argument(
+        "--mode",
+        choices=["daily", "current", "incremental"],
+        default="daily",
+        help="報告模式",
+    )
+    reanalyze_parser.add_argument(
+        "--workers", type=int, default=None, help="進程數，默認為 CPU 核數"
+    )
+    reanalyze_parser.add_argument(
+        "--all-platforms",
+        action="store_true",
+        help="分析快照中的所有平台，而不僅是當前配置的監控平台",
+    )
+
+    series_parser = subparsers.add_parser(
+        "series", help="查詢或回填關鍵詞時間序列索引"
+    )
+    series_parser.add_argument("--word", help="查詢詞（詞組名或組內任一詞）")
+    series_parser.add_argument("--start", type=parse_date_arg, help="開始日期 YYYY-MM-DD")
+    series_parser.add_argument("--end", type=parse_date_arg, help="結束日期 YYYY-MM-DD")
+    series_parser.add_argument(
+        "--platform", action="append", help="只統計指定平台，可重複指定"
+    )
+    series_parser.add_argument(
+        "--granularity", choices=["hour", "day"], default="hour", help="時間粒度"
+    )
+    series_parser.add_argument(
+        "--format", choices=["csv", "json"], default="csv", help="導出格式"
+    )
+    series_parser.add_argument("--export", help="導出文件路徑，默認輸出到終端")
+    series_parser.add_argument(
+        "--backfill", action="store_true", help="從歷史快照回填索引"
+    )
+    series_parser.add_argument(
+        "--rebuild", action="store_true", help="清空索引後按當前頻率詞全部重建"
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="常駐運行，定時爬取並提供只讀 HTTP 查詢接口"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="監聽地址")
+    serve_parser.add_argument("--port", type=int, default=8080, help="監聽端口")
+    serve_parser.add_argument(
+        "--interval",
+        type=float,
+        default=30,
+        help="爬取間隔（分鐘），0 表示只運行一次後保持服務",
+    )
+
+    compact_parser = subparsers.add_parser(
+        "compact", help="把今天以前的快照打包為每天一個 txt.zip"
+    )
+    compact_parser.add_argument(
+        "--drop-run-reports",
+        action="store_true",
+        help="同時刪除按時間命名的單輪報告，只保留匯總報告",
+    )
+    compact_parser.add_argument(
+        "--format",
+        choices=["zip", "delta"],
+        default=None,
+        help="歸檔格式：zip 壓縮包或增量日誌，默認按配置",
+    )
+    compact_parser.add_argument("--output-root", default="output", help="輸出目錄")
+
+    search_parser = subparsers.add_parser("search", help="搜索歷史標題")
+    search_parser.add_argument("query", nargs="*", help="搜索詞，多個詞時須全部出現")
+    search_parser.add_argument(
+        "--days", type=int, help="只看最近 N 天內出現過的標題"
+    )
+    search_parser.add_argument("--start", type=parse_date_arg, help="開始日期 YYYY-MM-DD")
+    search_parser.add_argument("--end", type=parse_date_arg, help="結束日期 YYYY-MM-DD")
+    search_parser.add_argument(
+        "--platform", action="append", help="只看指定平台，可重複指定"
+    )
+    search_parser.add_argument("--limit", type=int, default=50, help="最多返回條數")
+    search_parser.add_argument("--json", action="store_true", help="以 JSON 輸出")
+    search_parser.add_argument(
+        "--no-update", action="store_true", help="跳過查詢前的索引增量補齊"
+    )
+
+    return parser
+
+
+def run_compact_command(args: argparse.Namespace) -> None:
+    """執行 compact 子命令，與爬取運行互斥"""
+    run_lock = try_acquire_output_lock(args.output_root)
+    if run_lock is None:
+        print("有運行正在寫入輸出目錄，請稍後再試")
+        return
+
+    try:
+        start_time = time.time()
+        compacted_days = compact_finished_days(
+            args.output_root,
+            args.drop_run_reports,
+            args.format or CONFIG["COMPACTION"]["FORMAT"],
+            CONFIG["COMPACTION"]["AGGREGATE"],
+        )
+        print(f"共壓縮 {compacted_days} 天，耗時 {time.time() - start_time:.1f} 秒")
+    finally:
+        run_lock.release()
+
+
+def run_search_command(args: argparse.Namespace) -> None:
+    """執行 search 子命令"""
+    # 查詢前先補齊尚未索引的快照，已索引的快照會被快速跳過
+    if not args.no_update:
+        run_lock = try_acquire_output_lock()
+        if run_lock is None:
+            print("有運行正在寫入輸出目錄，跳過索引更新，使用現有索引查詢")
+        else:
+            try:
+                backfill_search_index()
+            finally:
+                run_lock.release()
+
+    query = " ".join(args.query)
+    if not query:
+        return
+
+    start = args.start.strftime("%Y-%m-%d") if args.start else None
+    if args.days:
+        start = (get_beijing_time() - timedelta(days=args.days)).strftime("%Y-%m-%d")
+    end = args.end.strftime("%Y-%m-%d") if args.end else None
+
+    start_time = time.time()
+    results = search_titles(
+        query, start=start, end=end, platforms=args.platform, limit=args.limit
+    )
+    elapsed_ms = (time.time() - start_time) * 1000
+
+    if args.json:
+        print(json_dumps(results, indent=True).decode("utf-8"))
+        return
+
+    for i, entry in enumerate(results, 1):
+        platform_names = "、".join(p["name"] for p in entry["platforms"])
+        print(f"{i}. [{entry['best_rank']}] {entry['title']}")
+        print(
+            f"   {platform_names} | {entry['first_seen']} ~ {entry['last_seen']}"
+            + (f" | {entry['url']}" if entry["url"] else "")
+        )
+    print(f"共 {len(results)} 條結果，耗時 {elapsed_ms:.1f} 毫秒")
+
+
+def run_series_command(args: argparse.Namespace) -> None:
+    """執行 series 子命令"""
+    if args.backfill or args.rebuild:
+        run_lock = try_acquire_output_lock()
+        if run_lock is None:
+            print("有運行正在寫入輸出目錄，請稍後再回填")
+            return
+        try:
+            backfill_keyword_series_index(args.start, args.end, rebuild=args.rebuild)
+        finally:
+            run_lock.release()
+
+    if not args.word:
+        return
+
+    start_time = time.time()
+    index = load_keyword_series_index()
+    rows = query_keyword_series(
+        index,
+        args.word,
+        start=args.start.strftime("%Y-%m-%d") if args.start else None,
+        end=args.end.strftime("%Y-%m-%d") if args.end else None,
+        platforms=args.platform,
+        granularity=args.granularity,
+    )
+    content = export_keyword_series(rows, args.format)
+    elapsed_ms = (time.time() - start_time) * 1000
+
+    if args.export:
+        with atomic_write(args.export, newline="") as f:
+            f.write(content)
+        print(f"已導出 {len(rows)} 行到 {args.export}（耗時 {elapsed_ms:.1f} 毫秒）")
+    else:
+        print(content, end="")
+        print(f"共 {len(rows)} 行，耗時 {elapsed_ms:.1f} 毫秒", file=sys.stderr)
 
 
 def main():
+    args = build_arg_parser().parse_args()
     try:
+        if args.command == "reanalyze":
+            reanalyze_history(
+                args.start,
+                args.end or args.start,
+                args.output_root,
+                source_root=args.source_root,
+                mode=args.mode,
+                workers=args.workers,
+                all_platforms=args.all_platforms,
+            )
+            return
+        if args.command == "series":
+            run_series_command(args)
+            return
+        if args.command == "search":
+            run_search_command(args)
+            return
+        if args.command == "compact":
+            run_compact_command(args)
+            return
+        if args.command == "serve":
+            serve_api(args.host, args.port, args.interval)
+            return
+
         analyzer = NewsAnalyzer()
         analyzer.run()
     except FileNotFoundError as e:
@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parent.parent
+os.environ.setdefault("CONFIG_PATH", str(ROOT / "config" / "config.yaml"))
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+
+
+def make_title(title, ranks, current_rank):
+    return main.ReportTitle(
+        title=title,
+        source_name="測試平台",
+        ranks=ranks,
+        rank_threshold=5,
+        current_rank=current_rank,
+    )
+
+
+class FilterPushedTitlesTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(
+            main.CONFIG,
+            {
+                "PUSH_DEDUP": {
+                    "ENABLED": True,
+                    "WINDOW_MINUTES": 60,
+                    "RANK_IMPROVEMENT": 3,
+                }
+            },
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.now = main.get_beijing_time().timestamp()
+
+    def ledger_for(self, *titles, rank):
+        return {
+            main.get_title_fingerprint(t): {"rank": rank, "time": self.now}
+            for t in titles
+        }
+
+    def test_rank_improvement_uses_current_rank(self):
+        # 當天曾到過第 1，但當前已跌到第 8，相比推送時的第 6 沒有上升
+        dropped = make_title("跌落", [1, 6, 8], 8)
+        # 當天最好第 6，當前升到第 2，相比推送時的第 6 明顯上升
+        climbed = make_title("上升", [6, 2], 2)
+        entries = {
+            **self.ledger_for(dropped, rank=6),
+            **self.ledger_for(climbed, rank=6),
+        }
+        self.assertTrue(main.is_recently_pushed(dropped, entries, self.now))
+        self.assertFalse(main.is_recently_pushed(climbed, entries, self.now))
+
+    def test_count_and_percentage_recomputed(self):
+        kept = make_title("保留", [1], 1)
+        pushed = [make_title(f"已推送{i}", [4], 4) for i in range(3)]
+        report_data = {
+            "stats": [
+                {
+                    "word": "測試",
+                    "count": 4,
+                    "percentage": 40.0,
+                    "titles": [kept] + pushed,
+                }
+            ],
+            "new_titles": [],
+            "failed_ids": [],
+            "total_new_count": 0,
+        }
+        filtered, suppressed = main.filter_pushed_titles(
+            report_data, self.ledger_for(*pushed, rank=4)
+        )
+        self.assertEqual(suppressed, 3)
+        stat = filtered["stats"][0]
+        self.assertEqual(stat["count"], 1)
+        self.assertEqual(stat["percentage"], 10.0)
+        self.assertEqual(stat["titles"], [kept])
+
+
+if __name__ == "__main__":
+    unittest.main()
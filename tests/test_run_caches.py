@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import pytz
+
+ROOT = Path(__file__).resolve().parent.parent
+os.environ.setdefault("CONFIG_PATH", str(ROOT / "config" / "config.yaml"))
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+
+TIMEZONE = pytz.timezone("Asia/Shanghai")
+
+
+class RunScopedCacheTest(unittest.TestCase):
+    def setUp(self):
+        main.reset_run_caches()
+
+    def tearDown(self):
+        main.reset_run_caches()
+
+    def build_report_data(self):
+        # 每輪重新統計，stats 為新對象但內容相同
+        stats = [{"word": "測試", "count": 0, "position": 0, "titles": [], "percentage": 0}]
+        return main.prepare_report_data(stats, [], {}, {}, "daily")
+
+    def run_once(self, now, format_type):
+        """模擬一輪運行：運行開始（拿不到運行鎖直接返回）後渲染推送內容"""
+        with mock.patch.object(main, "acquire_run_lock", return_value=None):
+            main.NewsAnalyzer.run(None)
+        with mock.patch.object(main, "get_beijing_time", return_value=now):
+            return main.render_notification_content(
+                self.build_report_data(), format_type
+            )
+
+    def test_each_run_gets_its_own_timestamp(self):
+        first = TIMEZONE.localize(datetime(2025, 8, 8, 9, 0, 0))
+        second = TIMEZONE.localize(datetime(2025, 8, 8, 10, 0, 0))
+        for format_type in ("feishu", "dingtalk", "wework", "telegram"):
+            with self.subTest(format_type=format_type):
+                first_content = str(self.run_once(first, format_type))
+                second_content = str(self.run_once(second, format_type))
+                self.assertIn("2025-08-08 09:00:00", first_content)
+                self.assertIn("2025-08-08 10:00:00", second_content)
+                self.assertNotIn("2025-08-08 09:00:00", second_content)
+
+    def test_same_run_reuses_rendered_content(self):
+        report_data = self.build_report_data()
+        self.assertIs(
+            main.render_notification_content(report_data, "telegram"),
+            main.render_notification_content(report_data, "telegram"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+os.environ.setdefault("CONFIG_PATH", str(ROOT / "config" / "config.yaml"))
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+
+
+class TitleDictionaryTornTailTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_root = self.tmp.name
+        self.date_folder = "2025年08月08日"
+        self.dictionary_path = main.get_title_dictionary_path(
+            self.date_folder, self.output_root
+        )
+        self.dictionary_path.parent.mkdir(parents=True)
+        # 第三行寫到一半
+        self.dictionary_path.write_bytes("標題一\n標題二\n標題".encode("utf-8"))
+        main.TITLE_DICTIONARIES.clear()
+
+    def tearDown(self):
+        main.TITLE_DICTIONARIES.clear()
+        self.tmp.cleanup()
+
+    def get_dictionary(self):
+        return main.get_title_dictionary(self.date_folder, self.output_root)
+
+    def test_torn_line_is_dropped(self):
+        dictionary = self.get_dictionary()
+        self.assertEqual(dictionary.titles, ["標題一", "標題二"])
+        self.assertEqual(dictionary.get_id("標題二"), 1)
+
+    def test_instance_is_reused_after_torn_tail(self):
+        dictionary = self.get_dictionary()
+        dictionary.get_id("標題三")
+        self.assertIs(self.get_dictionary(), dictionary)
+
+    def test_save_repairs_torn_tail(self):
+        dictionary = self.get_dictionary()
+        dictionary.save()
+        self.assertEqual(
+            self.dictionary_path.read_bytes(), "標題一\n標題二\n".encode("utf-8")
+        )
+
+        dictionary.get_id("標題三")
+        dictionary.save()
+        self.assertIs(self.get_dictionary(), dictionary)
+        reloaded = main.TitleDictionary(self.dictionary_path)
+        self.assertEqual(reloaded.titles, ["標題一", "標題二", "標題三"])
+
+    def test_match_cache_written_after_torn_tail(self):
+        word_groups = [
+            {"required": [], "normal": ["標題三"], "group_key": "標題三"}
+        ]
+        match = self.get_dictionary().matcher(word_groups, [])
+        self.assertEqual(match("標題三"), "標題三")
+        self.get_dictionary().save()
+        self.assertTrue(
+            self.dictionary_path.with_suffix(main.TITLE_MATCH_CACHE_SUFFIX).exists()
+        )
+
+
+class TitleMatchCacheTest(unittest.TestCase):
+    word_groups = [{"required": [], "normal": ["甲"], "group_key": "甲"}]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dictionary_path = Path(self.tmp.name) / "2025年08月08日.dict"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build_cache(self):
+        dictionary = main.TitleDictionary(self.dictionary_path)
+        match = dictionary.matcher(self.word_groups, [])
+        self.assertEqual(match("甲新聞"), "甲")
+        self.assertIsNone(match("乙新聞"))
+        dictionary.save()
+
+    def test_cache_reused_for_same_dictionary(self):
+        self.build_cache()
+        dictionary = main.TitleDictionary(self.dictionary_path)
+        match = dictionary.matcher(self.word_groups, [])
+        self.assertEqual(match("甲新聞"), "甲")
+        self.assertEqual((dictionary.match_hits, dictionary.match_misses), (1, 0))
+
+    def test_cache_dropped_when_dictionary_rewritten(self):
+        self.build_cache()
+        # 其他進程以不同順序重寫了字典
+        self.dictionary_path.write_bytes("乙新聞\n甲新聞\n".encode("utf-8"))
+        dictionary = main.TitleDictionary(self.dictionary_path)
+        match = dictionary.matcher(self.word_groups, [])
+        self.assertIsNone(match("乙新聞"))
+        self.assertEqual(match("甲新聞"), "甲")
+        self.assertEqual(dictionary.match_hits, 0)
+
+    def test_cache_dropped_when_word_list_changes(self):
+        self.build_cache()
+        dictionary = main.TitleDictionary(self.dictionary_path)
+        match = dictionary.matcher(
+            [{"required": [], "normal": ["乙"], "group_key": "乙"}], []
+        )
+        self.assertEqual(match("乙新聞"), "乙")
+        self.assertEqual(dictionary.match_hits, 0)
+
+
+class PruneTitleDictionariesTest(unittest.TestCase):
+    def test_keeps_recent_days_only(self):
+        with tempfile.TemporaryDirectory() as output_root:
+            days = ["2025年08月06日", "2025年08月07日", "2025年08月08日"]
+            for day in days:
+                path = main.get_title_dictionary_path(day, output_root)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(b"")
+                path.with_suffix(main.TITLE_MATCH_CACHE_SUFFIX).write_bytes(b"{}")
+
+            main.prune_title_dictionaries(output_root, keep_days=2)
+            dictionary_dir = main.get_title_dictionary_path(days[0], output_root).parent
+            remaining = sorted(path.name for path in dictionary_dir.iterdir())
+            self.assertEqual(
+                remaining,
+                [
+                    "2025年08月07日.dict",
+                    "2025年08月07日.match.json",
+                    "2025年08月08日.dict",
+                    "2025年08月08日.match.json",
+                ],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()